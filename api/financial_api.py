@@ -1,16 +1,37 @@
 """FastAPI Application for Financial Dashboard Assistant."""
 
 import sys
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from loguru import logger
 from pydantic import BaseModel
 
 sys.path.append(str(Path(__file__).parent.parent))
 from llm.query_llm import query_financial_agent  # Import from existing agent
+from tools.backtest import backtest_portfolio
+from tools.emergency_fund_tools import project_emergency_fund
+from tools.investment_tools import calculate_investment_return_grid
+from tools.monte_carlo import simulate_investment_returns
+from tools.price_refresh import start_price_refresh
+from tools.spending_analytics import get_spending_anomalies, get_spending_trends
+from utils.config_types import ProfilingConfigs
+from utils.logging_client import network_logger_stats
 from utils.logging_setup import setup_logging
+from utils.models import (
+    BacktestInput,
+    EmergencyFundProjectionInput,
+    InvestmentGridInput,
+    MonteCarloInput,
+    SpendingAnomaliesInput,
+    SpendingTrendsInput,
+)
+from utils.profiling import ProfilingMiddleware, RequestProfiler
+from utils.structured_logging import log_event
+from utils.tracing import TRACE_HEADER, current_trace_id, trace
 
 # Constants
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -20,11 +41,22 @@ DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
 logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
 logger.info("Logging initialized for financial_api.py")
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Keep the watchlist prices warm for the lifetime of the app."""
+    price_refresh = start_price_refresh(str(DEFAULT_CONFIG_PATH))
+    yield
+    if price_refresh:
+        price_refresh.stop()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Financial Dashboard API",
     description="API for querying a financial assistant with specialized tools.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
@@ -44,16 +76,48 @@ class QueryResponse(BaseModel):
     details: dict[str, Any] | None = None
 
 
+# Health checks are polled constantly; tracing them would drown the stats.
+UNTRACED_PATHS = {"/health"}
+
+
+@app.middleware("http")
+async def trace_request(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]],
+) -> Response:
+    """Run each request in a trace, continuing the caller's trace if given."""
+    if request.url.path in UNTRACED_PATHS:
+        return await call_next(request)
+    with trace(
+        f"api.{request.url.path.strip('/')}", request.headers.get(TRACE_HEADER),
+    ) as root:
+        response = await call_next(request)
+        if root is not None:
+            root.fields["status_code"] = response.status_code
+        response.headers[TRACE_HEADER] = current_trace_id()
+        return response
+
+
+# Added last so it wraps the tracing middleware and the profile shares the
+# request's trace id. Not mounted at all unless enabled.
+profiling_configs = ProfilingConfigs.load_from_path(str(DEFAULT_CONFIG_PATH))
+if profiling_configs.enabled:
+    app.add_middleware(ProfilingMiddleware, profiler=RequestProfiler(profiling_configs))
+
+
 def raise_http_exception(status_code: int, detail: str) -> None:
     """Raise an HTTPException with the given status code and detail."""
     logger.error(f"Raising HTTPException: {detail}")
     raise HTTPException(status_code=status_code, detail=detail)
 
 @app.get("/health")
-async def health_check() -> dict[str, str]:
+async def health_check() -> dict[str, Any]:
     """Health check endpoint to verify API is running."""
-    logger.info("Health check requested")
-    return {"status": "healthy", "message": "Financial Dashboard API is running"}
+    log_event("api.health")
+    return {
+        "status": "healthy",
+        "message": "Financial Dashboard API is running",
+        "logging": network_logger_stats(),
+    }
 
 
 @app.post("/query")
@@ -78,14 +142,14 @@ async def query_assistant(request: QueryRequest) -> QueryResponse:
         logger.error("Empty prompt received")
         raise_http_exception(400, "Prompt cannot be empty")
 
-    logger.info(f"Received query: {prompt}")
+    log_event("api.query", prompt=prompt)
     try:
         response = query_financial_agent(prompt)
         if "Error processing query" in response:
             logger.error(f"Query failed: {response}")
             raise_http_exception(status_code=500, detail=response)
 
-        logger.info(f"Query successful: {response}")
+        log_event("api.query.completed", response_chars=len(response))
         return QueryResponse(
             response=response,
             status="success",
@@ -97,6 +161,94 @@ async def query_assistant(request: QueryRequest) -> QueryResponse:
         raise HTTPException(status_code=500, detail=error_message) from e
 
 
+@app.post("/spending/trends")
+def spending_trends(request: SpendingTrendsInput) -> dict[str, Any]:
+    """Return monthly spending trends directly, without the assistant.
+
+    Raises:
+        HTTPException: If the data or filters are invalid.
+
+    """
+    try:
+        return get_spending_trends(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@app.post("/spending/anomalies")
+def spending_anomalies(request: SpendingAnomaliesInput) -> dict[str, Any]:
+    """Return unusual spending months directly, without the assistant.
+
+    Raises:
+        HTTPException: If the data or filters are invalid.
+
+    """
+    try:
+        return get_spending_anomalies(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@app.post("/investment/grid")
+def investment_grid(request: InvestmentGridInput) -> dict[str, Any]:
+    """Return final values for every (amount, years, rate) combination.
+
+    The grids are base64-encoded little-endian float32 values, row-major.
+
+    Raises:
+        HTTPException: If the grid cannot be calculated.
+
+    """
+    try:
+        return calculate_investment_return_grid(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@app.post("/investment/monte-carlo")
+def investment_monte_carlo(request: MonteCarloInput) -> dict[str, Any]:
+    """Return simulated percentile bands of an investment's balance.
+
+    Raises:
+        HTTPException: If the simulation cannot run.
+
+    """
+    try:
+        return simulate_investment_returns(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@app.post("/investment/backtest")
+def investment_backtest(request: BacktestInput) -> dict[str, Any]:
+    """Return the historical performance of a portfolio over stored prices.
+
+    Raises:
+        HTTPException: If the price history needed is not stored.
+
+    """
+    try:
+        return backtest_portfolio(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@app.post("/emergency-fund/projection")
+def emergency_fund_projection(
+    request: EmergencyFundProjectionInput,
+) -> dict[str, Any]:
+    """Return an emergency fund target from spending history and savings paths.
+
+    Raises:
+        HTTPException: If there is no spending history to base it on.
+
+    """
+    try:
+        return project_emergency_fund(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -12,7 +12,26 @@ from loguru import logger
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from llm.query_llm import query_financial_agent  # Import from existing agent
+from tools.backtest import backtest_portfolio
+from tools.emergency_fund_tools import project_emergency_fund
+from tools.investment_tools import calculate_investment_return_grid
+from tools.monte_carlo import simulate_investment_returns
+from tools.price_refresh import start_price_refresh
+from tools.spending_analytics import get_spending_anomalies, get_spending_trends
+from utils.config_types import ProfilingConfigs
+from utils.logging_client import network_logger_stats
 from utils.logging_setup import setup_logging  # Import from existing setup
+from utils.models import (
+    BacktestInput,
+    EmergencyFundProjectionInput,
+    InvestmentGridInput,
+    MonteCarloInput,
+    SpendingAnomaliesInput,
+    SpendingTrendsInput,
+)
+from utils.profiling import ProfilingMiddleware, RequestProfiler
+from utils.structured_logging import log_event
+from utils.tracing import current_trace_id, trace
 
 # Set up unified logging
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -26,13 +45,18 @@ class FinancialAssistant:
 
     def __init__(self) -> None:
         """Initialize the financial assistant service."""
+        self.price_refresh = start_price_refresh(str(DEFAULT_CONFIG_PATH))
         logger.info("Financial Assistant service initialized")
 
     @bentoml.api
-    def health_check(self) -> dict[str, str]:
+    def health_check(self) -> dict[str, Any]:
         """Health check endpoint to verify API is running."""
-        logger.info("Health check requested")
-        return {"status": "healthy", "message": "Financial Dashboard API is running"}
+        log_event("api.health")
+        return {
+            "status": "healthy",
+            "message": "Financial Dashboard API is running",
+            "logging": network_logger_stats(),
+        }
 
     @bentoml.api
     def query_assistant(self, prompt: str) -> dict[str, Any]:
@@ -50,24 +74,94 @@ class FinancialAssistant:
             logger.error("Empty prompt received")
             return {"status": "error", "response": "Prompt cannot be empty"}
 
-        logger.info(f"Received query: {prompt}")
         result = None
-        try:
-            response = query_financial_agent(prompt)
-            if "Error processing query" in response:
-                logger.error(f"Query failed: {response}")
-                result = {"status": "error", "response": response}
-            else:
-                logger.info(f"Query successful: {response}")
-                result = {"response": response, "status": "success", "details": None}
-        # Catch specific exceptions that you expect might occur
-        except (requests.RequestException, ValueError, KeyError) as e:
-            error_message = f"Failed to process query: {e!s}"
-            logger.error(error_message)
-            result = {"status": "error", "response": error_message}
+        with trace("api.query"):
+            log_event("api.query", prompt=prompt)
+            try:
+                response = query_financial_agent(prompt)
+                if "Error processing query" in response:
+                    logger.error(f"Query failed: {response}")
+                    result = {"status": "error", "response": response}
+                else:
+                    log_event("api.query.completed", response_chars=len(response))
+                    result = {
+                        "response": response, "status": "success", "details": None,
+                    }
+            # Catch specific exceptions that you expect might occur
+            except (requests.RequestException, ValueError, KeyError) as e:
+                error_message = f"Failed to process query: {e!s}"
+                logger.error(error_message)
+                result = {"status": "error", "response": error_message}
+            result["trace_id"] = current_trace_id()
 
         return result
 
+    @bentoml.api
+    def spending_trends(self, request: SpendingTrendsInput) -> dict[str, Any]:
+        """Return monthly spending trends directly, without the assistant."""
+        try:
+            return {"status": "success", "response": get_spending_trends(request)}
+        except ValueError as e:
+            logger.error(f"Spending trends failed: {e}")
+            return {"status": "error", "response": str(e)}
+
+    @bentoml.api
+    def spending_anomalies(self, request: SpendingAnomaliesInput) -> dict[str, Any]:
+        """Return unusual spending months directly, without the assistant."""
+        try:
+            return {"status": "success", "response": get_spending_anomalies(request)}
+        except ValueError as e:
+            logger.error(f"Spending anomalies failed: {e}")
+            return {"status": "error", "response": str(e)}
+
+    @bentoml.api
+    def emergency_fund_projection(
+        self, request: EmergencyFundProjectionInput,
+    ) -> dict[str, Any]:
+        """Return an emergency fund target from spending history and savings paths."""
+        try:
+            projection = project_emergency_fund(request)
+        except ValueError as e:
+            logger.error(f"Emergency fund projection failed: {e}")
+            return {"status": "error", "response": str(e)}
+        return {"status": "success", "response": projection}
+
+    @bentoml.api
+    def investment_grid(self, request: InvestmentGridInput) -> dict[str, Any]:
+        """Return every (amount, years, rate) final value, base64-encoded float32."""
+        try:
+            grid = calculate_investment_return_grid(request)
+        except ValueError as e:
+            logger.error(f"Investment grid failed: {e}")
+            return {"status": "error", "response": str(e)}
+        return {"status": "success", "response": grid}
+
+    @bentoml.api
+    def investment_monte_carlo(self, request: MonteCarloInput) -> dict[str, Any]:
+        """Return simulated percentile bands of an investment's balance."""
+        try:
+            simulation = simulate_investment_returns(request)
+        except ValueError as e:
+            logger.error(f"Monte Carlo simulation failed: {e}")
+            return {"status": "error", "response": str(e)}
+        return {"status": "success", "response": simulation}
+
+    @bentoml.api
+    def investment_backtest(self, request: BacktestInput) -> dict[str, Any]:
+        """Return the historical performance of a portfolio over stored prices."""
+        try:
+            backtest = backtest_portfolio(request)
+        except ValueError as e:
+            logger.error(f"Backtest failed: {e}")
+            return {"status": "error", "response": str(e)}
+        return {"status": "success", "response": backtest}
+
+profiling_configs = ProfilingConfigs.load_from_path(str(DEFAULT_CONFIG_PATH))
+if profiling_configs.enabled:
+    FinancialAssistant.add_asgi_middleware(
+        ProfilingMiddleware, profiler=RequestProfiler(profiling_configs),
+    )
+
 if __name__ == "__main__":
     # Example usage
     assistant = FinancialAssistant()
@@ -0,0 +1,5 @@
+"""Benchmarks for the Financial Dashboard.
+
+Each module is a runnable script that measures one part of the system and
+prints its results as JSON.
+"""
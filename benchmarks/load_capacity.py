@@ -0,0 +1,413 @@
+"""Load Capacity Benchmark.
+
+This module provides the Locust load shapes that ``locustfile.py`` runs when
+``LOAD_SHAPE`` is set, and compares their results with stored baselines.
+
+Each shape runs the test as a series of stages with a fixed number of users.
+A stage is measured after its first ``warmup_seconds``, from Locust's
+aggregated statistics (so it also works with distributed workers), and
+passes if its p95 response time and error rate are within the targets:
+
+- 'step' adds ``step_users`` users per stage until a stage fails. The
+  highest RPS of a passing stage is the maximum sustainable RPS.
+- 'spike' runs base load, a spike and base load again; it fails if the
+  recovery stage does not meet the targets.
+- 'soak' holds ``soak_users`` users, measured in windows; it fails if any
+  window misses the targets.
+
+At the end of the run the results are written as JSON to ``results_dir`` and
+compared with ``baseline_dir/load-<shape>.json``, if it exists. The run
+fails (Locust exits with 1) if the shape failed or the results regressed:
+the sustainable RPS dropped by more than ``rps_tolerance``, or the p95 of a
+stage found in both rose by more than ``p95_tolerance``.
+
+Example:
+    just load-capacity step --host http://127.0.0.1:8000
+    just load-compare load_results/load-step-20250101-120000.json
+    just load-save-baseline load_results/load-step-20250101-120000.json
+
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, NamedTuple
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.config_types import LoadTestingConfigs
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+
+load_testing_configs = LoadTestingConfigs.load_from_path(str(DEFAULT_CONFIG_PATH))
+
+try:
+    from locust import LoadTestShape
+except ImportError:  # Comparing results does not need Locust.
+    LoadTestShape = ABC
+
+
+class Stage(NamedTuple):
+    """A period of the test with a fixed number of users."""
+
+    name: str
+    users: int
+    seconds: float
+
+
+class StatsSnapshot(NamedTuple):
+    """Cumulative request counters at one moment."""
+
+    time: float
+    requests: int
+    failures: int
+    response_times: Counter
+
+
+def take_snapshot(total: Any) -> StatsSnapshot:  # noqa: ANN401
+    """Copy the cumulative counters of Locust's aggregated stats entry."""
+    return StatsSnapshot(
+        time.monotonic(),
+        total.num_requests,
+        total.num_failures,
+        Counter(total.response_times),
+    )
+
+
+def histogram_percentile(histogram: Counter, percent: float) -> float:
+    """Return a percentile of response times counted per (rounded) value."""
+    count = sum(histogram.values())
+    if not count:
+        return 0.0
+    target = percent * count
+    seen = 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        if seen >= target:
+            return float(value)
+    return float(max(histogram))
+
+
+def measure_stage(
+    stage: Stage, start: StatsSnapshot, end: StatsSnapshot,
+    configs: LoadTestingConfigs,
+) -> dict[str, Any]:
+    """Return a stage's throughput, error rate and latency between two snapshots."""
+    requests = end.requests - start.requests
+    failures = end.failures - start.failures
+    histogram = end.response_times - start.response_times
+    seconds = max(end.time - start.time, 1e-9)
+    error_rate = failures / requests if requests else 0.0
+    p95 = histogram_percentile(histogram, 0.95)
+    reasons = []
+    if requests == 0:
+        reasons.append("no requests")
+    if p95 > configs.p95_target_ms:
+        reasons.append(f"p95 {p95:.0f} ms > {configs.p95_target_ms:.0f} ms")
+    if error_rate > configs.max_error_rate:
+        reasons.append(f"error rate {error_rate:.3f} > {configs.max_error_rate}")
+    return {
+        "name": stage.name,
+        "users": stage.users,
+        "measured_seconds": round(seconds, 1),
+        "requests": requests,
+        "failures": failures,
+        "rps": round(requests / seconds, 2),
+        "error_rate": round(error_rate, 4),
+        "p50_ms": histogram_percentile(histogram, 0.5),
+        "p95_ms": p95,
+        "p99_ms": histogram_percentile(histogram, 0.99),
+        "passed": not reasons,
+        "reasons": reasons,
+    }
+
+
+class CapacityShape(LoadTestShape):
+    """Runs stages of fixed users and measures each one (base class)."""
+
+    abstract = True
+    name = ""
+    # Stop at the first stage that misses the targets.
+    stop_on_failure = False
+
+    def __init__(self) -> None:
+        """Plan the stages."""
+        super().__init__()
+        self.configs = load_testing_configs
+        self.stages = self.plan()
+        self.results: list[dict[str, Any]] = []
+        self.started_at: str | None = None
+        self._index = -1
+        self._stage_started = 0.0
+        self._snapshot: StatsSnapshot | None = None
+
+    @abstractmethod
+    def plan(self) -> list[Stage]:
+        """Return the stages of the test."""
+
+    def verdict(self) -> list[str]:
+        """Return why the shape's own criteria failed (empty if they passed)."""
+        return []
+
+    def tick(self) -> tuple[int, float] | None:
+        """Return the users of the current stage; None when the test is over."""
+        now = self.get_run_time()
+        if self._index < 0:
+            self.started_at = datetime.now().astimezone().isoformat()
+            self._begin(0, now)
+        elapsed = now - self._stage_started
+        if self._snapshot is None and elapsed >= self.configs.warmup_seconds:
+            self._snapshot = take_snapshot(self.runner.stats.total)
+        if elapsed >= self.stages[self._index].seconds:
+            result = self.finish_stage()
+            failed = result is not None and not result["passed"]
+            if (failed and self.stop_on_failure) or self._index + 1 == len(self.stages):
+                return None
+            self._begin(self._index + 1, now)
+        return self.stages[self._index].users, self.configs.spawn_rate
+
+    def finish_stage(self) -> dict[str, Any] | None:
+        """Measure the current stage, if its measurement has started."""
+        if self._snapshot is None:
+            return None
+        result = measure_stage(
+            self.stages[self._index],
+            self._snapshot,
+            take_snapshot(self.runner.stats.total),
+            self.configs,
+        )
+        self.results.append(result)
+        self._snapshot = None
+        return result
+
+    def summary(self) -> dict[str, Any]:
+        """Return the shape's own conclusions from the measured stages."""
+        passing = [result["rps"] for result in self.results if result["passed"]]
+        max_rps = max(passing, default=0.0)
+        return {
+            "max_sustainable_rps": max_rps,
+            "rps_per_worker": round(max_rps / self.configs.api_workers, 2),
+        }
+
+    def report(self, host: str | None) -> dict[str, Any]:
+        """Return the results of the run."""
+        return {
+            "shape": self.name,
+            "host": host,
+            "started_at": self.started_at,
+            "targets": {
+                "p95_target_ms": self.configs.p95_target_ms,
+                "max_error_rate": self.configs.max_error_rate,
+            },
+            "api_workers": self.configs.api_workers,
+            **self.summary(),
+            "stages": self.results,
+            "failures": self.verdict(),
+        }
+
+    def _begin(self, index: int, now: float) -> None:
+        """Start a stage."""
+        self._index = index
+        self._stage_started = now
+        self._snapshot = None
+
+
+class StepShape(CapacityShape):
+    """Adds users step by step until a step misses the targets."""
+
+    name = "step"
+    stop_on_failure = True
+
+    def plan(self) -> list[Stage]:
+        """Return steps from ``step_start_users`` to ``step_max_users``."""
+        configs = self.configs
+        users = range(
+            configs.step_start_users, configs.step_max_users + 1, configs.step_users,
+        )
+        return [Stage(f"step-{count}u", count, configs.step_seconds) for count in users]
+
+    def summary(self) -> dict[str, Any]:
+        """Add the step that saturated the service, if one did."""
+        saturation = next(
+            (result for result in self.results if not result["passed"]), None,
+        )
+        return {
+            **super().summary(),
+            "saturated": saturation is not None,
+            "saturation_stage": saturation["name"] if saturation else None,
+            "saturation_reasons": saturation["reasons"] if saturation else [],
+        }
+
+
+class SpikeShape(CapacityShape):
+    """Runs base load, a spike and base load again."""
+
+    name = "spike"
+
+    def plan(self) -> list[Stage]:
+        """Return the base, spike and recovery stages."""
+        configs = self.configs
+        return [
+            Stage("base", configs.spike_base_users, configs.spike_seconds),
+            Stage("spike", configs.spike_users, configs.spike_seconds),
+            Stage("recovery", configs.spike_base_users, configs.spike_seconds),
+        ]
+
+    def verdict(self) -> list[str]:
+        """Fail if the service did not recover from the spike."""
+        recovery = next(
+            (result for result in self.results if result["name"] == "recovery"), None,
+        )
+        if recovery is None:
+            return ["recovery stage was not measured"]
+        if not recovery["passed"]:
+            return [f"did not recover: {', '.join(recovery['reasons'])}"]
+        return []
+
+
+class SoakShape(CapacityShape):
+    """Holds a constant load for a long time, measured in windows."""
+
+    name = "soak"
+
+    def plan(self) -> list[Stage]:
+        """Return consecutive windows of ``soak_users`` users."""
+        configs = self.configs
+        windows = max(round(configs.soak_seconds / configs.soak_window_seconds), 1)
+        return [
+            Stage(f"window-{number}", configs.soak_users, configs.soak_window_seconds)
+            for number in range(1, windows + 1)
+        ]
+
+    def summary(self) -> dict[str, Any]:
+        """Add how much the p95 drifted from the first window to the last."""
+        drift = None
+        if len(self.results) > 1 and self.results[0]["p95_ms"]:
+            drift = round(self.results[-1]["p95_ms"] / self.results[0]["p95_ms"], 3)
+        return {**super().summary(), "p95_drift": drift}
+
+    def verdict(self) -> list[str]:
+        """Fail if any window missed the targets."""
+        return [
+            f"{result['name']}: {', '.join(result['reasons'])}"
+            for result in self.results
+            if not result["passed"]
+        ]
+
+
+SHAPES: dict[str, type[CapacityShape]] = {
+    shape.name: shape for shape in (StepShape, SpikeShape, SoakShape)
+}
+
+
+def compare_with_baseline(
+    report: dict[str, Any], baseline: dict[str, Any], configs: LoadTestingConfigs,
+) -> list[str]:
+    """Return the regressions of a run against a baseline run of the same shape."""
+    regressions = []
+    baseline_rps = baseline.get("max_sustainable_rps") or 0
+    floor = baseline_rps * (1 - configs.rps_tolerance)
+    if baseline_rps and report["max_sustainable_rps"] < floor:
+        regressions.append(
+            f"max sustainable RPS {report['max_sustainable_rps']} < {floor:.2f} "
+            f"(baseline {baseline_rps})",
+        )
+    baseline_stages = {stage["name"]: stage for stage in baseline.get("stages", [])}
+    for stage in report["stages"]:
+        before = baseline_stages.get(stage["name"])
+        if before is None or not before["p95_ms"]:
+            continue
+        ceiling = before["p95_ms"] * (1 + configs.p95_tolerance)
+        if stage["p95_ms"] > ceiling:
+            regressions.append(
+                f"{stage['name']}: p95 {stage['p95_ms']:.0f} ms > {ceiling:.0f} ms "
+                f"(baseline {before['p95_ms']:.0f} ms)",
+            )
+    return regressions
+
+
+def baseline_path(shape: str, configs: LoadTestingConfigs) -> Path:
+    """Return the baseline file of a shape."""
+    return PROJECT_ROOT / configs.baseline_dir / f"load-{shape}.json"
+
+
+def evaluate(
+    report: dict[str, Any], configs: LoadTestingConfigs, baseline: Path | None = None,
+) -> dict[str, Any]:
+    """Add the baseline comparison and the pass/fail verdict to a report."""
+    baseline = baseline or baseline_path(report["shape"], configs)
+    regressions = []
+    if baseline.exists():
+        regressions = compare_with_baseline(
+            report, json.loads(baseline.read_text()), configs,
+        )
+    return {
+        **report,
+        "baseline": str(baseline) if baseline.exists() else None,
+        "regressions": regressions,
+        "passed": not report["failures"] and not regressions,
+    }
+
+
+def finish_run(environment: Any) -> Path | None:  # noqa: ANN401
+    """Write the results of a shaped run, and fail the run if they fail.
+
+    Meant as a Locust ``test_stop`` listener.
+
+    Returns:
+        Path | None: The results file, or None for a run without a capacity shape.
+
+    """
+    shape = environment.shape_class
+    if not isinstance(shape, CapacityShape):
+        return None
+    shape.finish_stage()
+    results = evaluate(shape.report(environment.host), shape.configs)
+    results_dir = PROJECT_ROOT / shape.configs.results_dir
+    results_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().astimezone().strftime("%Y%m%d-%H%M%S")
+    path = results_dir / f"load-{shape.name}-{stamp}.json"
+    path.write_text(json.dumps(results, indent=2) + "\n")
+    sys.stdout.write(
+        f"Load test {'passed' if results['passed'] else 'FAILED'}: "
+        f"max sustainable RPS {results['max_sustainable_rps']} "
+        f"({results['rps_per_worker']} per worker); results in {path}\n",
+    )
+    if not results["passed"]:
+        environment.process_exit_code = 1
+    return path
+
+
+def main() -> None:
+    """Compare results with a baseline, or make them the baseline."""
+    parser = argparse.ArgumentParser(description="Compare load test results.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compare = commands.add_parser("compare", help="Compare results with a baseline.")
+    compare.add_argument("results", type=Path)
+    compare.add_argument("--baseline", type=Path)
+    save = commands.add_parser("save-baseline", help="Make results the baseline.")
+    save.add_argument("results", type=Path)
+    args = parser.parse_args()
+
+    report = json.loads(args.results.read_text())
+    if args.command == "save-baseline":
+        target = baseline_path(report["shape"], load_testing_configs)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(args.results, target)
+        sys.stdout.write(f"Saved {args.results} as {target}\n")
+        return
+    results = evaluate(report, load_testing_configs, args.baseline)
+    keys = ("baseline", "regressions", "failures", "passed")
+    sys.stdout.write(json.dumps({key: results[key] for key in keys}, indent=2) + "\n")
+    sys.exit(0 if results["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
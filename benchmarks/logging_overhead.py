@@ -0,0 +1,115 @@
+"""Logging Overhead Benchmark.
+
+This benchmark measures what logging costs one ``/query`` request: the log
+calls made by the API, the agent and a spending breakdown tool, published
+through the network client to a socket nobody listens on. It compares the
+structured ``log_event`` calls (msgpack, cut fields, sampling) with the
+eagerly formatted full-payload f-strings they replaced (text transport).
+
+Example:
+    just bench-logging-overhead --requests 2000
+
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import zmq
+from loguru import logger
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.logging_client import NetworkSink
+from utils.logging_setup import DEFAULT_CONFIG_PATH, load_logging_configs
+from utils.models import SpendingBreakdownInput
+from utils.structured_logging import log_event
+
+PROMPT = "What's my emergency fund need if my spending in 2023 was $24,000 total?"
+RESPONSE = "Based on your 2023 spending of $24,000, you spent about $2,000 " * 30
+BREAKDOWN = {f"Category {number}": 1234.56 + number for number in range(40)}
+TOOL_INPUT = SpendingBreakdownInput(year=2023)
+
+
+def legacy_request() -> None:
+    """Log one request the way the hot path used to."""
+    logger.info(f"Received query: {PROMPT}")
+    logger.info(f"Processing query: {PROMPT}")
+    logger.info(f"Generating spending breakdown {TOOL_INPUT.model_dump()}")
+    logger.info(f"Spending breakdown: {BREAKDOWN}, chart at x.png (cached: True)")
+    logger.info(f"Agent response: {RESPONSE}")
+    logger.info(f"Query successful: {RESPONSE}")
+
+
+def structured_request() -> None:
+    """Log one request with structured events."""
+    log_event("api.query", prompt=PROMPT)
+    log_event("agent.query", prompt=PROMPT)
+    log_event("tool.call", tool="get_spending_breakdown", input=TOOL_INPUT)
+    log_event(
+        "tool.result",
+        tool="get_spending_breakdown",
+        categories=len(BREAKDOWN),
+        detail={"breakdown": lambda: BREAKDOWN},
+    )
+    log_event("agent.response", attempt=1, response=RESPONSE)
+    log_event("api.query.completed", response_chars=len(RESPONSE))
+
+
+def measure(
+    request: Callable[[], None], encoding: str, requests: int,
+) -> dict[str, Any]:
+    """Run requests against a fresh network sink and time them.
+
+    Returns:
+        dict: Microseconds per request spent in the log calls and in total
+        (process CPU including any queue thread), and messages sent.
+
+    """
+    configs = load_logging_configs(DEFAULT_CONFIG_PATH.resolve())
+    socket = zmq.Context.instance().socket(zmq.PUB)
+    socket.bind("tcp://127.0.0.1:*")
+    sink = NetworkSink(socket, encoding)
+    logger.remove()
+    logger.add(
+        sink,
+        format="{message}" if encoding == "msgpack" else configs.client_log_format,
+        # The sink the hot path used to have queued every record.
+        enqueue=encoding == "text",
+        level=configs.min_log_level,
+    )
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    for _ in range(requests):
+        request()
+    calls = time.perf_counter() - started
+    logger.complete()
+    cpu = time.process_time() - cpu_started
+    logger.remove()
+    socket.close(linger=0)
+    return {
+        "call_us_per_request": round(calls / requests * 1e6, 1),
+        "cpu_us_per_request": round(cpu / requests * 1e6, 1),
+        "messages_per_request": round(sink.sequence / requests, 2),
+    }
+
+
+def main() -> None:
+    """Run the benchmark from the command line and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    results = {
+        "requests": args.requests,
+        "legacy_text": measure(legacy_request, "text", args.requests),
+        "structured_msgpack": measure(structured_request, "msgpack", args.requests),
+    }
+    sys.stdout.write(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Logging Throughput Benchmark.
+
+This benchmark starts a logging server in a separate process, writing to a
+temporary directory, and logs messages through the regular client (Loguru
+sink, ZMQ PUB socket) as fast as possible. It reports how fast messages are
+handed to the logger, how fast the server receives and writes them, and how
+many were dropped on the way.
+
+Example:
+    just bench-logging --messages 200000
+
+"""
+
+import argparse
+import json
+import multiprocessing
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.config_types import LoggingConfigs
+from utils.logging_client import (
+    network_logger_stats,
+    setup_network_logger_client,
+    shutdown_network_logger_client,
+)
+from utils.logging_server import start_logging_server
+
+STATS_INTERVAL_SECONDS = 0.1
+STARTUP_SECONDS = 1.0
+
+
+def _free_port() -> int:
+    """Return a TCP port that is currently free on localhost."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _server_stats(configs: LoggingConfigs) -> dict[str, int]:
+    """Read the counters the server last wrote."""
+    path = Path(configs.log_file_name).with_suffix(".stats.json")
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def run_benchmark(
+    messages: int, message_bytes: int, timeout_seconds: float,
+) -> dict[str, Any]:
+    """Log messages through a local server and measure the throughput.
+
+    Args:
+        messages: Messages to log.
+        message_bytes: Length of each message text.
+        timeout_seconds: Longest to wait for the server to catch up.
+
+    Returns:
+        dict: Client and server counters and messages per second.
+
+    """
+    log_dir = Path(tempfile.mkdtemp(prefix="logging-bench-"))
+    configs = LoggingConfigs(
+        log_server_port=_free_port(),
+        log_file_name=str(log_dir / "logs.txt"),
+        min_log_level="INFO",
+        stats_interval_seconds=STATS_INTERVAL_SECONDS,
+    )
+    context = multiprocessing.get_context("spawn")
+    stop = context.Event()
+    server = context.Process(target=start_logging_server, args=(configs, stop))
+    server.start()
+    setup_network_logger_client(configs, logger)
+    # Give the subscription time to connect; earlier messages would be lost.
+    time.sleep(STARTUP_SECONDS)
+
+    text = "x" * message_bytes
+    started = time.perf_counter()
+    for number in range(messages):
+        logger.info("benchmark message {} {}", number, text)
+    logged = time.perf_counter() - started
+    logger.complete()
+    published = time.perf_counter() - started
+
+    deadline = time.monotonic() + timeout_seconds
+    while _server_stats(configs).get("received", 0) < messages:
+        if time.monotonic() > deadline:
+            break
+        time.sleep(STATS_INTERVAL_SECONDS)
+    received_after = time.perf_counter() - started
+    client = network_logger_stats()
+    shutdown_network_logger_client(logger)
+    stop.set()
+    server.join()
+    server_stats = _server_stats(configs)
+
+    return {
+        "messages": messages,
+        "message_bytes": message_bytes,
+        "client": client,
+        "server": server_stats,
+        "log_call_seconds": round(logged, 3),
+        "logged_per_second": round(messages / logged),
+        "published_per_second": round(messages / published),
+        "received_per_second": round(server_stats.get("received", 0) / received_after),
+        "log_file_bytes": (log_dir / "logs.txt").stat().st_size,
+    }
+
+
+def main() -> None:
+    """Run the benchmark from the command line and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--message-bytes", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+    results = run_benchmark(args.messages, args.message_bytes, args.timeout)
+    sys.stdout.write(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,609 @@
+"""Micro-Benchmark Suite.
+
+This module times the layers below the HTTP API one by one, so a change in
+the load test numbers can be traced to the layer that caused it:
+
+- 'tools': every agent tool function, against fixture data (the bundled
+  spending CSV, and prices from the market data stand-in loaded into the
+  price cache and a temporary price store, so nothing goes to the network).
+- 'models': validation of every Pydantic model in ``utils/models.py``.
+- 'dispatch': a tool called directly, through a ``StructuredTool`` built like
+  the agent's, and with the agent's tracing callback inside a trace.
+- 'aggregation': spending aggregation (the cube and the direct group-by) for
+  each of ``row_counts`` rows.
+- 'charts': rendering of the pie and line charts.
+- 'logging': structured log events, disabled events, traces and spans
+  within a trace, published through the network sink to a socket nobody
+  listens on. Spans outside a trace are no-ops, so the span benchmark opens
+  a trace too; subtract 'logging.trace' for the span alone.
+
+Each benchmark is timed ``repeat`` times, looping fast ones for at least
+``min_run_seconds``, and reported as the median and minimum microseconds per
+call. Results are written as JSON to ``results_dir`` and compared with the
+baseline file: a benchmark whose median is more than
+``regression_threshold`` slower than the baseline's is a regression, and the
+run exits with 1. The change of each group (geometric mean of its ratios) is
+reported too.
+
+Example:
+    just bench --filter "aggregation.*"
+    just bench-compare bench_results/micro-20250101-120000.json
+    just bench-save-baseline bench_results/micro-20250101-120000.json
+
+"""
+
+import argparse
+import fnmatch
+import inspect
+import json
+import math
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+import pandas as pd
+import zmq
+from langchain_core.tools import StructuredTool
+from loguru import logger
+from pydantic import BaseModel
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from benchmarks.logging_overhead import structured_request
+from standins.market_data_server import FIRST_DAY, price_series
+from tools.backtest import backtest_portfolio
+from tools.chart_cache import chart_cache
+from tools.crypto_tools import get_crypto_data
+from tools.emergency_fund_tools import calculate_emergency_fund, project_emergency_fund
+from tools.investment_tools import (
+    calculate_investment_return_grid,
+    calculate_investment_return_simple,
+    summarize_investment_return_grid,
+)
+from tools.monte_carlo import monte_carlo_engine, simulate_investment_returns
+from tools.price_cache import price_cache
+from tools.price_store import PriceStore
+from tools.spending_analytics import get_spending_anomalies, get_spending_trends
+from tools.spending_cube import MONTH_DTYPE, MONTH_NAMES, SpendingCube
+from tools.spending_tools import get_spending_breakdown
+from tools.stock_tools import get_stock_prices
+from utils import models
+from utils.config_types import BenchmarkConfigs
+from utils.logging_client import NetworkSink, shutdown_network_logger_client
+from utils.logging_setup import load_logging_configs
+from utils.models import (
+    BacktestInput,
+    CryptoInput,
+    EmergencyFundInput,
+    EmergencyFundProjectionInput,
+    InvestmentGridInput,
+    InvestmentReturnInput,
+    MonteCarloInput,
+    SpendingAnomaliesInput,
+    SpendingBreakdownInput,
+    SpendingTrendsInput,
+    StockPriceInput,
+)
+from utils.structured_logging import log_event
+from utils.tracing import TracingCallbackHandler, span, trace
+from utils.visualization import render_line_chart, render_pie_chart
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+# Fixture prices loaded for the price tools, from the market data stand-in.
+FIXTURE_PRICES = {("stock", "AAPL"): "AAPL", ("crypto", "SOL"): "solana"}
+FIXTURE_START = "2020-01-01"
+FIXTURE_END = "2024-12-31"
+FIXTURE_CATEGORIES = [
+    "Education", "Entertainment", "Food", "Healthcare", "Housing", "Insurance",
+    "Personal Care", "Savings", "Shopping", "Transportation", "Travel", "Utilities",
+]
+LINE_CHART_POINTS = 100_000
+# Valid input for each model in utils/models.py.
+MODEL_PAYLOADS: dict[str, dict[str, Any]] = {
+    "EmergencyFundInput": {
+        "monthly_expenses": 2000, "financial_obligations": 300, "current_savings": 5000,
+    },
+    "EmergencyFundProjectionInput": {
+        "year": 2023, "monthly_contributions": [250, 500, 1000], "horizon_months": 60,
+    },
+    "StockPriceInput": {
+        "symbol": "AAPL", "start_date": "2023-01-01", "end_date": "2023-12-31",
+    },
+    "InvestmentReturnInput": {"initial_amount": 10000, "years": 10, "annual_return": 7},
+    "ParameterRange": {"start": 1, "stop": 10, "num": 10},
+    "InvestmentGridInput": {
+        "initial_amounts": [1000, 5000, 10000],
+        "years": {"start": 1, "stop": 30, "num": 30},
+        "annual_returns": {"start": -5, "stop": 15, "num": 21},
+    },
+    "MonteCarloInput": {
+        "initial_amount": 10000, "years": 30, "annual_contribution": 1200,
+        "mean_return": 7, "volatility": 15, "simulations": 10000, "seed": 1,
+    },
+    "BacktestInput": {
+        "allocations": {"AAPL": 60, "crypto:SOL": 40},
+        "initial_amount": 10000,
+        "start_date": "2021-01-01",
+        "end_date": "2024-12-31",
+    },
+    "CryptoInput": {
+        "crypto_id": "solana", "start_date": "2023-01-01", "end_date": "2023-12-31",
+    },
+    "SpendingBreakdownInput": {"year": 2023, "month": "March"},
+    "SpendingTrendsInput": {"category": "Food", "window": 3},
+    "SpendingAnomaliesInput": {"method": "zscore", "limit": 10},
+    "BudgetRule": {
+        "name": "shopping-yoy", "category": "Shopping", "metric": "change_pct",
+        "threshold": 30,
+    },
+}
+
+benchmark_configs = BenchmarkConfigs.load_from_path(str(DEFAULT_CONFIG_PATH))
+
+
+class Benchmark(NamedTuple):
+    """A timed call; ``setup`` prepares its data and returns the call."""
+
+    name: str
+    group: str
+    setup: Callable[[], Callable[[], object]]
+
+
+def time_call(
+    call: Callable[[], object], repeat: int, min_run_seconds: float,
+) -> dict[str, Any]:
+    """Time a call, looping it so each of ``repeat`` runs lasts long enough.
+
+    Returns:
+        dict: Median and minimum microseconds per call, and calls per run.
+
+    """
+    started = time.perf_counter()
+    call()  # Warm up, and estimate the cost of one call.
+    first = time.perf_counter() - started
+    number = max(1, math.ceil(min_run_seconds / first)) if first > 0 else 1000
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            call()
+        timings.append((time.perf_counter() - started) / number)
+    return {
+        "median_us": round(statistics.median(timings) * 1e6, 3),
+        "min_us": round(min(timings) * 1e6, 3),
+        "calls_per_run": number,
+    }
+
+
+def load_fixture_prices(store_dir: Path) -> None:
+    """Point the price cache at a temporary store holding fixture prices."""
+    price_cache.store = PriceStore(store_dir)
+    for (asset_class, symbol), name in FIXTURE_PRICES.items():
+        series = price_series(symbol, asset_class)
+        closes = pd.Series(
+            series, index=pd.date_range(FIRST_DAY, periods=len(series), freq="D"),
+        ).loc[FIXTURE_START:FIXTURE_END]
+        if asset_class == "stock":
+            closes = closes[closes.index.dayofweek < 5]  # noqa: PLR2004
+        price_cache.set_daily_closes(
+            asset_class, symbol, closes, FIXTURE_START, FIXTURE_END,
+        )
+        price_cache.set_symbol(name, symbol)
+
+
+def warm_quote(asset_class: str, symbol: str) -> None:
+    """Cache a fresh quote, so the tool serves it without fetching one."""
+    price = float(price_series(symbol, asset_class)[-1])
+    price_cache.set_quote(asset_class, symbol, price)
+
+
+def ready(call: Callable[[], object]) -> Callable[[], Callable[[], object]]:
+    """Return the setup of a benchmark whose call needs no preparation."""
+    return lambda: call
+
+
+def tool_setup(
+    tool: Callable[[Any], object],
+    model: type[BaseModel],
+    quote: tuple[str, str] | None,
+) -> Callable[[], object]:
+    """Prepare a call of a tool with its model's payload."""
+    if quote is not None:
+        warm_quote(*quote)
+    return partial(tool, model.model_validate(MODEL_PAYLOADS[model.__name__]))
+
+
+def tool_benchmarks() -> list[Benchmark]:
+    """Return a benchmark of every agent tool."""
+    tools = [
+        (calculate_emergency_fund, EmergencyFundInput, None),
+        (project_emergency_fund, EmergencyFundProjectionInput, None),
+        (get_stock_prices, StockPriceInput, ("stock", "AAPL")),
+        (calculate_investment_return_simple, InvestmentReturnInput, None),
+        (calculate_investment_return_grid, InvestmentGridInput, None),
+        (summarize_investment_return_grid, InvestmentGridInput, None),
+        (simulate_investment_returns, MonteCarloInput, None),
+        (backtest_portfolio, BacktestInput, None),
+        (get_crypto_data, CryptoInput, ("crypto", "SOL")),
+        (get_spending_breakdown, SpendingBreakdownInput, None),
+        (get_spending_trends, SpendingTrendsInput, None),
+        (get_spending_anomalies, SpendingAnomaliesInput, None),
+    ]
+    return [
+        Benchmark(
+            f"tools.{tool.__name__}", "tools", partial(tool_setup, tool, model, quote),
+        )
+        for tool, model, quote in tools
+    ]
+
+
+def model_benchmarks() -> list[Benchmark]:
+    """Return a validation benchmark of every model in ``utils/models.py``.
+
+    Raises:
+        ValueError: If a model has no payload in ``MODEL_PAYLOADS``.
+
+    """
+    model_classes = [
+        value for _, value in inspect.getmembers(models, inspect.isclass)
+        if issubclass(value, BaseModel) and value.__module__ == models.__name__
+    ]
+    missing = [
+        model.__name__ for model in model_classes
+        if model.__name__ not in MODEL_PAYLOADS
+    ]
+    if missing:
+        error_message = f"No benchmark payload for models: {', '.join(missing)}"
+        raise ValueError(error_message)
+    return [
+        Benchmark(
+            f"models.{model.__name__}",
+            "models",
+            ready(partial(model.model_validate, MODEL_PAYLOADS[model.__name__])),
+        )
+        for model in model_classes
+    ]
+
+
+def call_directly(payload: dict[str, Any]) -> dict:
+    """Validate a payload and call the tool, without any agent plumbing."""
+    return calculate_emergency_fund(EmergencyFundInput(**payload))
+
+
+def invoke_traced(tool: StructuredTool, payload: dict[str, Any]) -> object:
+    """Invoke a tool with the tracing callback, inside a trace like a request."""
+    with trace("bench"):
+        return tool.invoke(
+            payload, config={"callbacks": [TracingCallbackHandler()]},
+        )
+
+
+def dispatch_benchmarks() -> list[Benchmark]:
+    """Return benchmarks of the cost of calling a tool the agent's way."""
+    tool = StructuredTool.from_function(
+        name="calculate_emergency_fund",
+        func=lambda **kwargs: calculate_emergency_fund(EmergencyFundInput(**kwargs)),
+        description="Calculate the ideal emergency fund size.",
+        args_schema=EmergencyFundInput,
+    )
+    payload = MODEL_PAYLOADS["EmergencyFundInput"]
+    return [
+        Benchmark(
+            "dispatch.direct", "dispatch", ready(partial(call_directly, payload)),
+        ),
+        Benchmark(
+            "dispatch.structured_tool",
+            "dispatch",
+            ready(partial(tool.invoke, payload)),
+        ),
+        Benchmark(
+            "dispatch.structured_tool_traced",
+            "dispatch",
+            ready(partial(invoke_traced, tool, payload)),
+        ),
+    ]
+
+
+def spending_frame(rows: int) -> pd.DataFrame:
+    """Return random spending rows over ten years, typed like the loaded data."""
+    rng = np.random.default_rng(rows)
+    return pd.DataFrame(
+        {
+            "category": pd.Categorical.from_codes(
+                rng.integers(0, len(FIXTURE_CATEGORIES), rows), FIXTURE_CATEGORIES,
+            ),
+            "amount": rng.gamma(2.0, 50.0, rows).round(2),
+            "year": rng.integers(2015, 2025, rows),
+            "month": pd.Categorical.from_codes(
+                rng.integers(0, len(MONTH_NAMES), rows), dtype=MONTH_DTYPE,
+            ),
+        },
+    )
+
+
+def cube_setup(rows: int) -> Callable[[], object]:
+    """Prepare aggregating spending rows into a cube."""
+    return partial(SpendingCube.from_frame, spending_frame(rows))
+
+
+def group_by_setup(rows: int) -> Callable[[], object]:
+    """Prepare summing spending rows per category, as for direct input."""
+    frame = spending_frame(rows)
+
+    def group_by() -> pd.Series:
+        return frame.groupby("category", observed=True)["amount"].sum()
+
+    return group_by
+
+
+def aggregation_benchmarks(row_counts: list[int]) -> list[Benchmark]:
+    """Return benchmarks of both aggregation paths for each row count."""
+    return [
+        benchmark
+        for rows in row_counts
+        for benchmark in (
+            Benchmark(
+                f"aggregation.cube.{rows}", "aggregation", partial(cube_setup, rows),
+            ),
+            Benchmark(
+                f"aggregation.group_by.{rows}",
+                "aggregation",
+                partial(group_by_setup, rows),
+            ),
+        )
+    ]
+
+
+def line_chart_setup(image_format: str) -> Callable[[], object]:
+    """Prepare rendering a long price series as a line chart."""
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(
+        {
+            "date": pd.date_range("2000-01-01", periods=LINE_CHART_POINTS, freq="h"),
+            "price": rng.normal(0, 1, LINE_CHART_POINTS).cumsum(),
+        },
+    )
+    style = {"title": "Price", "xlabel": "Date", "ylabel": "Price (USD)"}
+    return partial(
+        render_line_chart, data, "date", ["price"], style, image_format=image_format,
+    )
+
+
+def chart_benchmarks() -> list[Benchmark]:
+    """Return benchmarks of rendering each kind of chart."""
+    breakdown = {
+        category: 100.0 + 10 * i for i, category in enumerate(FIXTURE_CATEGORIES)
+    }
+    pie_style = {"title": "Spending Breakdown"}
+    return [
+        Benchmark(
+            "charts.pie_png",
+            "charts",
+            ready(partial(render_pie_chart, breakdown, pie_style)),
+        ),
+        Benchmark(
+            "charts.line_png",
+            "charts",
+            partial(line_chart_setup, "png"),
+        ),
+        Benchmark(
+            "charts.line_svg",
+            "charts",
+            partial(line_chart_setup, "svg"),
+        ),
+    ]
+
+
+def open_trace() -> None:
+    """Open and close a trace, which has a root span of its own."""
+    with trace("bench"):
+        pass
+
+
+def open_span() -> None:
+    """Open and close a tracing span inside a trace."""
+    with trace("bench"), span("tool", tool="get_spending_breakdown"):
+        pass
+
+
+def logging_benchmarks() -> list[Benchmark]:
+    """Return benchmarks of the logging and tracing calls of the hot path."""
+    input_data = SpendingBreakdownInput(**MODEL_PAYLOADS["SpendingBreakdownInput"])
+    return [
+        Benchmark(
+            "logging.log_event",
+            "logging",
+            ready(
+                partial(
+                    log_event,
+                    "tool.call",
+                    tool="get_spending_breakdown",
+                    input=input_data,
+                ),
+            ),
+        ),
+        Benchmark(
+            "logging.log_event_disabled",
+            "logging",
+            ready(partial(log_event, "tool.debug", "TRACE", input=input_data)),
+        ),
+        Benchmark("logging.request_events", "logging", ready(structured_request)),
+        Benchmark("logging.trace", "logging", ready(open_trace)),
+        Benchmark("logging.span", "logging", ready(open_span)),
+    ]
+
+
+def all_benchmarks(row_counts: list[int]) -> list[Benchmark]:
+    """Return the whole suite, grouped by layer."""
+    return [
+        *tool_benchmarks(),
+        *model_benchmarks(),
+        *dispatch_benchmarks(),
+        *aggregation_benchmarks(row_counts),
+        *chart_benchmarks(),
+        *logging_benchmarks(),
+    ]
+
+
+@contextmanager
+def benchmark_environment() -> Iterator[None]:
+    """Send logs to an unread network sink and prices to a temporary store."""
+    configs = load_logging_configs(DEFAULT_CONFIG_PATH.resolve())
+    socket = zmq.Context.instance().socket(zmq.PUB)
+    socket.bind("tcp://127.0.0.1:*")
+    shutdown_network_logger_client(logger)
+    logger.remove()
+    logger.add(
+        NetworkSink(socket, "msgpack"), format="{message}", level=configs.min_log_level,
+    )
+    store = price_cache.store
+    with tempfile.TemporaryDirectory() as store_dir:
+        try:
+            load_fixture_prices(Path(store_dir))
+            yield
+        finally:
+            price_cache.store = store
+            monte_carlo_engine.shutdown()
+            chart_cache.shutdown()
+            logger.remove()
+            socket.close(linger=0)
+
+
+def run(
+    benchmarks: list[Benchmark], configs: BenchmarkConfigs,
+) -> dict[str, dict[str, Any]]:
+    """Run benchmarks and return their timings by name."""
+    results = {}
+    with benchmark_environment():
+        for benchmark in benchmarks:
+            sys.stderr.write(f"{benchmark.name}...\n")
+            call = benchmark.setup()
+            timing = time_call(call, configs.repeat, configs.min_run_seconds)
+            results[benchmark.name] = {"group": benchmark.group, **timing}
+            del call
+    return results
+
+
+def compare_with_baseline(
+    results: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    threshold: float,
+) -> dict[str, Any]:
+    """Compare the medians of benchmarks run in both the results and baseline.
+
+    Returns:
+        dict: Ratio (new / baseline median) per benchmark, geometric mean
+        ratio per group, and the regressions beyond the threshold.
+
+    """
+    ratios = {
+        name: round(timing["median_us"] / baseline[name]["median_us"], 3)
+        for name, timing in results.items()
+        if name in baseline and baseline[name]["median_us"] > 0
+    }
+    by_group: dict[str, list[float]] = {}
+    for name, ratio in ratios.items():
+        by_group.setdefault(results[name]["group"], []).append(ratio)
+    return {
+        "ratios": ratios,
+        "groups": {
+            group: round(statistics.geometric_mean(values), 3)
+            for group, values in by_group.items()
+        },
+        "regressions": [
+            f"{name}: {results[name]['median_us']:.1f} us is {ratio:.2f}x the "
+            f"baseline ({baseline[name]['median_us']:.1f} us)"
+            for name, ratio in ratios.items()
+            if ratio > 1 + threshold
+        ],
+    }
+
+
+def evaluate(
+    report: dict[str, Any], configs: BenchmarkConfigs, baseline: Path | None = None,
+) -> dict[str, Any]:
+    """Return the comparison of a report with the baseline, if there is one."""
+    baseline = baseline or PROJECT_ROOT / configs.baseline_file
+    if not baseline.exists():
+        return {"baseline": None, "ratios": {}, "groups": {}, "regressions": []}
+    comparison = compare_with_baseline(
+        report["benchmarks"],
+        json.loads(baseline.read_text())["benchmarks"],
+        configs.regression_threshold,
+    )
+    return {"baseline": str(baseline), **comparison}
+
+
+def main() -> None:
+    """Run the suite, compare results with a baseline, or save a baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run the benchmarks.")
+    run_parser.add_argument(
+        "--filter", default="*", help="Glob of the benchmark names to run.",
+    )
+    run_parser.add_argument(
+        "--max-rows", type=int, help="Skip aggregation row counts above this.",
+    )
+    compare = commands.add_parser("compare", help="Compare results with a baseline.")
+    compare.add_argument("results", type=Path)
+    compare.add_argument("--baseline", type=Path)
+    save = commands.add_parser("save-baseline", help="Make results the baseline.")
+    save.add_argument("results", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "save-baseline":
+        target = PROJECT_ROOT / benchmark_configs.baseline_file
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(args.results, target)
+        sys.stdout.write(f"Saved {args.results} as {target}\n")
+        return
+    if args.command == "compare":
+        report = json.loads(args.results.read_text())
+        comparison = evaluate(report, benchmark_configs, args.baseline)
+    else:
+        row_counts = [
+            rows for rows in benchmark_configs.row_counts
+            if args.max_rows is None or rows <= args.max_rows
+        ]
+        benchmarks = [
+            benchmark for benchmark in all_benchmarks(row_counts)
+            if fnmatch.fnmatch(benchmark.name, args.filter)
+        ]
+        report = {
+            "started_at": datetime.now().astimezone().isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeat": benchmark_configs.repeat,
+            "benchmarks": run(benchmarks, benchmark_configs),
+        }
+        results_dir = PROJECT_ROOT / benchmark_configs.results_dir
+        results_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().astimezone().strftime("%Y%m%d-%H%M%S")
+        path = results_dir / f"micro-{stamp}.json"
+        path.write_text(json.dumps(report, indent=2) + "\n")
+        comparison = {
+            "results": str(path),
+            "medians_us": {
+                name: timing["median_us"]
+                for name, timing in report["benchmarks"].items()
+            },
+            **evaluate(report, benchmark_configs),
+        }
+    sys.stdout.write(json.dumps(comparison, indent=2) + "\n")
+    sys.exit(1 if comparison["regressions"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,20 +12,38 @@ from loguru import logger
 
 # Add project root to sys.path
 sys.path.append(str(Path(__file__).parent.parent))
+from tools.backtest import backtest_portfolio
 from tools.crypto_tools import get_crypto_data
-from tools.emergency_fund_tools import calculate_emergency_fund
-from tools.investment_tools import calculate_investment_return_simple
+from tools.emergency_fund_tools import (
+    calculate_emergency_fund,
+    project_emergency_fund,
+)
+from tools.investment_tools import (
+    calculate_investment_return_simple,
+    summarize_investment_return_grid,
+)
+from tools.monte_carlo import simulate_investment_returns
+from tools.spending_analytics import get_spending_anomalies, get_spending_trends
 from tools.spending_tools import get_spending_breakdown
 from tools.stock_tools import get_stock_prices
+from utils.cassettes import cassette
 from utils.configs import load_config
 from utils.logging_setup import setup_logging
 from utils.models import (
+    BacktestInput,
     CryptoInput,
     EmergencyFundInput,
+    EmergencyFundProjectionInput,
+    InvestmentGridInput,
     InvestmentReturnInput,
+    MonteCarloInput,
+    SpendingAnomaliesInput,
     SpendingBreakdownInput,
+    SpendingTrendsInput,
     StockPriceInput,
 )
+from utils.structured_logging import log_event
+from utils.tracing import TracingCallbackHandler, span
 
 # Constants
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -38,6 +56,7 @@ logger.info("Logging initialized for query_llm.py")
 # Load LLM configuration
 config = load_config()
 MODEL_NAME = config["llm"]["default_model"]
+OLLAMA_SERVER_URL = config["llm"]["ollama_server_url"]
 SYSTEM_PROMPT = config["llm"]["system_prompt"]
 
 # Define tools with StructuredTool
@@ -48,6 +67,19 @@ TOOLS: list[StructuredTool] = [
         description="Calculate emergency fund. Expects {'monthly_expenses': float}.",
         args_schema=EmergencyFundInput,
     ),
+    StructuredTool.from_function(
+        name="project_emergency_fund",
+        func=lambda **kwargs: project_emergency_fund(
+            EmergencyFundProjectionInput(**kwargs),
+        ),
+        description=(
+            "Size an emergency fund from the recorded spending history and "
+            "project savings toward it. Expects {'year': int} (optional); "
+            "optional 'current_savings', 'monthly_contributions': [float], "
+            "'months_coverage', 'expense_basis' ('mean' | 'p90')."
+        ),
+        args_schema=EmergencyFundProjectionInput,
+    ),
     StructuredTool.from_function(
         name="get_stock_prices",
         func=lambda **kwargs: get_stock_prices(StockPriceInput(**kwargs)),
@@ -69,6 +101,42 @@ TOOLS: list[StructuredTool] = [
         ),
         args_schema=InvestmentReturnInput,
     ),
+    StructuredTool.from_function(
+        name="calculate_investment_return_grid",
+        func=lambda **kwargs: summarize_investment_return_grid(
+            InvestmentGridInput(**kwargs),
+        ),
+        description=(
+            "Compare investment outcomes over several amounts, periods and/or "
+            "rates at once. Each of 'initial_amounts', 'years' and "
+            "'annual_returns' is a list of floats or {'start', 'stop', 'num'}. "
+            "Grids over 100 combinations come back as percentile summaries."
+        ),
+        args_schema=InvestmentGridInput,
+    ),
+    StructuredTool.from_function(
+        name="simulate_investment_returns",
+        func=lambda **kwargs: simulate_investment_returns(MonteCarloInput(**kwargs)),
+        description=(
+            "Monte Carlo ranges of investment outcomes (e.g. the 10th-percentile "
+            "balance). Expects {'initial_amount': float, 'years': int}; optional "
+            "'annual_contribution', 'mean_return', 'volatility', 'distribution' "
+            "('normal' | 'lognormal' | 'bootstrap' with 'symbol')."
+        ),
+        args_schema=MonteCarloInput,
+    ),
+    StructuredTool.from_function(
+        name="backtest_portfolio",
+        func=lambda **kwargs: backtest_portfolio(BacktestInput(**kwargs)),
+        description=(
+            "Backtest a portfolio over stored prices. Expects {'allocations': "
+            "{'AAPL': 60, 'crypto:BTC': 40}, 'initial_amount': float, "
+            "'start_date': 'YYYY-MM-DD'}; optional 'end_date', 'rebalance' "
+            "('none' | 'monthly' | 'quarterly' | 'yearly'), 'contribution', "
+            "'transaction_cost_bps'."
+        ),
+        args_schema=BacktestInput,
+    ),
     StructuredTool.from_function(
         name="get_crypto_data",
         func=lambda **kwargs: get_crypto_data(CryptoInput(**kwargs)),
@@ -81,15 +149,42 @@ TOOLS: list[StructuredTool] = [
     StructuredTool.from_function(
         name="get_spending_breakdown",
         func=lambda **kwargs: get_spending_breakdown(SpendingBreakdownInput(**kwargs)),
-        description="Retrieve spending data for a year. Expects {'year': str}.",
+        description=(
+            "Retrieve a spending breakdown by category. Optional filters: "
+            "{'year': int, 'month': str, 'category': str}."
+        ),
         args_schema=SpendingBreakdownInput,
     ),
+    StructuredTool.from_function(
+        name="get_spending_trends",
+        func=lambda **kwargs: get_spending_trends(SpendingTrendsInput(**kwargs)),
+        description=(
+            "Monthly spending with month-over-month and year-over-year changes, "
+            "rolling average and seasonality. Optional: {'year': int, "
+            "'category': str, 'window': int}."
+        ),
+        args_schema=SpendingTrendsInput,
+    ),
+    StructuredTool.from_function(
+        name="get_spending_anomalies",
+        func=lambda **kwargs: get_spending_anomalies(SpendingAnomaliesInput(**kwargs)),
+        description=(
+            "Find months where spending spiked or dropped unusually. Optional: "
+            "{'year': int, 'category': str, 'method': 'zscore' | 'iqr'}."
+        ),
+        args_schema=SpendingAnomaliesInput,
+    ),
 ]
 
 
 def initialize_llm() -> AgentExecutor:
     """Initialize the LangChain agent."""
-    llm = ChatOllama(model=MODEL_NAME, temperature=0)
+    llm = ChatOllama(
+        model=MODEL_NAME,
+        base_url=OLLAMA_SERVER_URL,
+        temperature=0,
+        client_kwargs=cassette.client_kwargs(),
+    )
     prompt = ChatPromptTemplate.from_messages(
         [
             ("system", SYSTEM_PROMPT),
@@ -98,7 +193,7 @@ def initialize_llm() -> AgentExecutor:
         ],
     )
     agent = create_tool_calling_agent(llm, TOOLS, prompt)
-    executor = AgentExecutor(agent=agent, tools=TOOLS, verbose=True, max_iterations=4)
+    executor = AgentExecutor(agent=agent, tools=TOOLS, verbose=False, max_iterations=4)
     logger.info("Financial agent initialized")
     return executor
 
@@ -114,16 +209,20 @@ def handle_invalid_response() -> NoReturn:
 
 def query_financial_agent(prompt: str) -> str:
     """Query the financial agent."""
-    logger.info(f"Processing query: {prompt}")
+    log_event("agent.query", prompt=prompt)
     max_retries = 4
     for attempt in range(max_retries):
         try:
-            response = agent_executor.invoke({"input": prompt})
+            with span("agent", attempt=attempt + 1):
+                response = agent_executor.invoke(
+                    {"input": prompt},
+                    config={"callbacks": [TracingCallbackHandler()]},
+                )
             if "output" not in response:
                 handle_invalid_response()
             else:
                 result = response["output"]
-                logger.info(f"Agent response: {result}")
+                log_event("agent.response", attempt=attempt + 1, response=result)
                 return result
         except (KeyError, ValueError) as e:
             error_message = f"Attempt {attempt + 1}/{max_retries} failed: {e}"
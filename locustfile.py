@@ -1,15 +1,26 @@
-"""Locust load testing for Financial Dashboard API."""
+"""Locust load testing for Financial Dashboard API.
+
+Set LOAD_SHAPE to 'step', 'spike' or 'soak' to run a capacity-finding load
+shape (see benchmarks/load_capacity.py) instead of a fixed number of users.
+"""
+import os
 import secrets
 from typing import Any
 
-from locust import HttpUser, between, task
+from locust import HttpUser, between, events, task
+
+from benchmarks import load_capacity
 
 HTTP_STATUS_OK = 200  # Constant for HTTP status code 200
+LOAD_SHAPE = os.environ.get("LOAD_SHAPE", "")
 
 class FinancialUser(HttpUser):
     """Simulate a user interacting with the Financial Dashboard API."""
 
-    wait_time = between(1, 3)  # Wait 1-3 seconds between tasks
+    wait_time = between(
+        load_capacity.load_testing_configs.min_wait_seconds,
+        load_capacity.load_testing_configs.max_wait_seconds,
+    )
 
     # FastAPI host (default) - override with --host on command line for BentoML
     host: str = "http://127.0.0.1:8000"
@@ -103,3 +114,17 @@ class FinancialUser(HttpUser):
     def query_investment_return(self) -> None:
         """Test investment return calculation."""
         self._make_query(self.investment_prompt, "Investment Return")
+
+
+if LOAD_SHAPE:
+    if LOAD_SHAPE not in load_capacity.SHAPES:
+        error_message = (
+            f"Unknown LOAD_SHAPE {LOAD_SHAPE!r}; "
+            f"use one of {list(load_capacity.SHAPES)}"
+        )
+        raise ValueError(error_message)
+
+    class CapacityLoadShape(load_capacity.SHAPES[LOAD_SHAPE]):
+        """The load shape picked with LOAD_SHAPE."""
+
+    events.test_stop.add_listener(load_capacity.finish_run)
@@ -0,0 +1,6 @@
+"""Local stand-ins for the external services of the Financial Dashboard.
+
+This package contains small servers that speak the same protocols as the
+services the dashboard depends on, so sync jobs and tools can be run and
+tested end to end without credentials or network access.
+"""
@@ -0,0 +1,249 @@
+"""Market Data Stand-in Server.
+
+This module serves the parts of the CoinGecko, CryptoCompare and Yahoo
+Finance APIs the price tools use, from fixture data:
+
+- ``/api/v3/search`` (CoinGecko) finds coins of a fixed list by id, name or
+  symbol.
+- ``/data/price``, ``/data/pricehistorical`` and ``/data/v2/histoday``
+  (CryptoCompare) serve current, historical and daily prices.
+- ``/v8/finance/chart/{symbol}`` (Yahoo Finance) serves daily bars on
+  weekdays.
+
+Prices are a deterministic random walk per symbol from 2010 onwards, the same
+on every run, so any symbol and date has a price. Every response is delayed
+by ``--latency-ms`` (plus or minus ``--jitter-ms``). Point the ``[upstreams]``
+URLs at it to use it.
+
+Example:
+    just start-market-standin --latency-ms 50
+
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+import zlib
+from collections.abc import Awaitable, Callable
+from datetime import UTC, date, datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Annotated, Any
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Query, Request, Response
+from loguru import logger
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.logging_setup import setup_logging
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+DEFAULT_PORT = 8101
+FIRST_DAY = date(2010, 1, 1)
+SECONDS_PER_DAY = 86_400
+DEFAULT_HISTODAY_LIMIT = 30
+WEEKEND = 5  # date.weekday() of Saturday
+# Seconds after UTC midnight that Yahoo stamps daily bars with (09:30 New York).
+MARKET_OPEN_SECONDS = 14 * 3600 + 30 * 60
+DAILY_VOLATILITY = {"crypto": 0.04, "stock": 0.015}
+DAILY_DRIFT = 0.0003
+# id, name, symbol and starting price of the coins the search knows.
+COINS = [
+    ("bitcoin", "Bitcoin", "BTC", 30_000.0),
+    ("ethereum", "Ethereum", "ETH", 2_000.0),
+    ("solana", "Solana", "SOL", 20.0),
+    ("cardano", "Cardano", "ADA", 0.4),
+    ("dogecoin", "Dogecoin", "DOGE", 0.08),
+    ("ripple", "XRP", "XRP", 0.5),
+]
+COIN_PRICES = {symbol: price for _, _, symbol, price in COINS}
+# Days covered by the Yahoo chart 'range' values.
+RANGE_DAYS = {"1d": 1, "5d": 5, "1mo": 31, "3mo": 92, "6mo": 183, "1y": 366}
+DEFAULT_STOCK_PRICE = 150.0
+DEFAULT_COIN_PRICE = 10.0
+
+# Set up logging
+logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
+logger.info("Logging initialized for market_data_server.py")
+
+
+@lru_cache(maxsize=256)
+def price_series(symbol: str, asset_class: str) -> np.ndarray:
+    """Return the daily prices of a symbol from FIRST_DAY to tomorrow."""
+    days = (datetime.now(tz=UTC).date() - FIRST_DAY).days + 2
+    rng = np.random.default_rng(zlib.crc32(f"{asset_class}:{symbol}".encode()))
+    returns = rng.normal(DAILY_DRIFT, DAILY_VOLATILITY[asset_class], days)
+    if asset_class == "crypto":
+        start = COIN_PRICES.get(symbol, DEFAULT_COIN_PRICE)
+    else:
+        start = DEFAULT_STOCK_PRICE
+    return np.round(start * np.exp(np.cumsum(returns)), 6)
+
+
+def price_on(symbol: str, asset_class: str, day: date) -> float:
+    """Return the close of a symbol on a day (clamped to the series)."""
+    series = price_series(symbol.upper(), asset_class)
+    index = min(max((day - FIRST_DAY).days, 0), len(series) - 1)
+    return float(series[index])
+
+
+def _day(timestamp: float) -> date:
+    """Return the UTC day of a Unix timestamp."""
+    return datetime.fromtimestamp(timestamp, tz=UTC).date()
+
+
+def _day_start(day: date) -> int:
+    """Return the Unix timestamp of a day's UTC midnight."""
+    return int(datetime(day.year, day.month, day.day, tzinfo=UTC).timestamp())
+
+
+def daily_bar(symbol: str, day: date) -> dict[str, Any]:
+    """Return a CryptoCompare daily bar."""
+    close = price_on(symbol, "crypto", day)
+    open_ = price_on(symbol, "crypto", day - timedelta(days=1))
+    return {
+        "time": _day_start(day),
+        "open": open_,
+        "high": max(open_, close),
+        "low": min(open_, close),
+        "close": close,
+        "volumefrom": 1000.0,
+        "volumeto": round(1000.0 * close, 2),
+    }
+
+
+def create_app(latency_ms: float, jitter_ms: float) -> FastAPI:
+    """Create the stand-in app.
+
+    Args:
+        latency_ms: Mean delay of a response.
+        jitter_ms: Largest random change to the delay, either way.
+
+    """
+    app = FastAPI(title="Market Data Stand-in")
+
+    @app.middleware("http")
+    async def delay(
+        request: Request, call_next: Callable[[Request], Awaitable[Response]],
+    ) -> Response:
+        """Delay every response like a remote API."""
+        seconds = (latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000  # noqa: S311
+        await asyncio.sleep(max(seconds, 0))
+        return await call_next(request)
+
+    @app.get("/api/v3/search")
+    async def coingecko_search(query: str) -> dict[str, Any]:
+        """Find the fixture coins matching a query."""
+        needle = query.lower()
+        coins = [
+            {"id": coin_id, "name": name, "symbol": symbol, "market_cap_rank": rank}
+            for rank, (coin_id, name, symbol, _) in enumerate(COINS, start=1)
+            if needle in coin_id or needle in name.lower() or needle == symbol.lower()
+        ]
+        return {"coins": coins, "exchanges": [], "categories": []}
+
+    @app.get("/data/price")
+    async def cryptocompare_price(fsym: str, tsyms: str) -> dict[str, float]:
+        """Return today's price of a coin in each requested currency."""
+        today = datetime.now(tz=UTC).date()
+        return dict.fromkeys(tsyms.split(","), price_on(fsym, "crypto", today))
+
+    @app.get("/data/pricehistorical")
+    async def cryptocompare_price_historical(
+        fsym: str, tsyms: str, ts: int | None = None,
+    ) -> dict[str, dict[str, float]]:
+        """Return a coin's close on the day of ``ts`` in each currency."""
+        day = _day(ts if ts is not None else time.time())
+        price = price_on(fsym, "crypto", day)
+        return {fsym.upper(): dict.fromkeys(tsyms.split(","), price)}
+
+    @app.get("/data/v2/histoday")
+    async def cryptocompare_histoday(
+        fsym: str,
+        tsym: str,  # noqa: ARG001
+        limit: int = DEFAULT_HISTODAY_LIMIT,
+        toTs: int | None = None,  # noqa: N803
+    ) -> dict[str, Any]:
+        """Return ``limit + 1`` daily bars ending on the day of ``toTs``."""
+        last = _day(toTs if toTs is not None else time.time())
+        bars = [
+            daily_bar(fsym, last - timedelta(days=offset))
+            for offset in range(limit, -1, -1)
+        ]
+        return {
+            "Response": "Success",
+            "Data": {
+                "TimeFrom": bars[0]["time"], "TimeTo": bars[-1]["time"], "Data": bars,
+            },
+        }
+
+    @app.get("/v8/finance/chart/{symbol}")
+    async def yahoo_chart(
+        symbol: str,
+        period1: int | None = None,
+        period2: int | None = None,
+        chart_range: Annotated[str, Query(alias="range")] = "1mo",
+    ) -> dict[str, Any]:
+        """Return daily bars of a stock on the weekdays between two timestamps."""
+        end = _day(period2 - 1) if period2 is not None else datetime.now(tz=UTC).date()
+        if period1 is not None:
+            start = _day(period1)
+        else:
+            start = end - timedelta(days=RANGE_DAYS.get(chart_range, 31) - 1)
+        days = [
+            start + timedelta(days=offset)
+            for offset in range((end - start).days + 1)
+            if (start + timedelta(days=offset)).weekday() < WEEKEND
+        ]
+        closes = [price_on(symbol, "stock", day) for day in days]
+        opens = [price_on(symbol, "stock", day - timedelta(days=1)) for day in days]
+        return {
+            "chart": {
+                "result": [
+                    {
+                        "meta": {
+                            "symbol": symbol.upper(),
+                            "currency": "USD",
+                            "exchangeTimezoneName": "America/New_York",
+                        },
+                        "timestamp": [
+                            _day_start(day) + MARKET_OPEN_SECONDS for day in days
+                        ],
+                        "indicators": {
+                            "quote": [
+                                {
+                                    "open": opens,
+                                    "high": list(map(max, opens, closes)),
+                                    "low": list(map(min, opens, closes)),
+                                    "close": closes,
+                                    "volume": [1_000_000] * len(days),
+                                },
+                            ],
+                        },
+                    },
+                ],
+                "error": None,
+            },
+        }
+
+    return app
+
+
+def main() -> None:
+    """Run the stand-in from the command line."""
+    parser = argparse.ArgumentParser(description="Serve market data fixtures.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    app = create_app(args.latency_ms, args.jitter_ms)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
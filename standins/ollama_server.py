@@ -0,0 +1,231 @@
+"""Ollama Stand-in Server.
+
+This module serves an Ollama-compatible ``/api/chat`` endpoint that answers
+from a script instead of a model, so the API, the agent and the tools can be
+load tested without a GPU and with repeatable results:
+
+- When the last message is the user's, the first rule whose pattern matches
+  it is answered with a call to the rule's tool. Argument values written as
+  ``"{name}"`` are filled in from the pattern's named groups (numbers become
+  numbers); tools the request does not offer are never called.
+- When the last message is a tool result, or no rule matches, the reply is a
+  short text answer quoting it.
+
+Every reply is delayed by ``--latency-ms`` (plus or minus ``--jitter-ms``) to
+stand in for generation time. Replies are streamed as newline-delimited JSON
+unless the request sets ``"stream": false``, like Ollama's. Point
+``[llm] ollama_server_url`` at it to use it.
+
+Example:
+    just start-ollama-standin --latency-ms 800 --jitter-ms 200
+
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from loguru import logger
+from pydantic import BaseModel
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.logging_setup import setup_logging
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+DEFAULT_PORT = 11435
+MAX_QUOTED_CHARS = 500
+# Rules matching the prompts of locustfile.py, tried in order.
+DEFAULT_SCRIPT: list[dict[str, Any]] = [
+    {
+        "pattern": (
+            r"(?i)(?P<crypto>solana|bitcoin|ethereum)\D*"
+            r"(?P<start>\d{4}-\d{2}-\d{2})\D*(?P<end>\d{4}-\d{2}-\d{2})"
+        ),
+        "tool": "get_crypto_data",
+        "arguments": {
+            "crypto_id": "{crypto}", "start_date": "{start}", "end_date": "{end}",
+        },
+    },
+    {
+        "pattern": r"(?i)return on \$(?P<amount>[\d,.]+)",
+        "tool": "calculate_investment_return_simple",
+        "arguments": {"initial_amount": "{amount}", "years": 1, "annual_return": 35},
+    },
+    {
+        "pattern": r"(?i)(?P<crypto>solana|bitcoin|ethereum)\b",
+        "tool": "get_crypto_data",
+        "arguments": {
+            "crypto_id": "{crypto}",
+            "start_date": "2023-01-01",
+            "end_date": "2023-12-31",
+        },
+    },
+    {
+        "pattern": r"(?i)emergency fund",
+        "tool": "calculate_emergency_fund",
+        "arguments": {"monthly_expenses": 2000, "months_coverage": 6},
+    },
+    {
+        "pattern": r"(?i)(spend|spent|money)\D*(?P<year>\d{4})",
+        "tool": "get_spending_breakdown",
+        "arguments": {"year": "{year}"},
+    },
+    {
+        "pattern": r"\b(?P<symbol>AAPL|MSFT|GOOGL|AMZN|NVDA)\b",
+        "tool": "get_stock_prices",
+        "arguments": {
+            "symbol": "{symbol}", "start_date": "2023-01-01", "end_date": "2023-12-31",
+        },
+    },
+]
+
+# Set up logging
+logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
+logger.info("Logging initialized for ollama_server.py")
+
+
+class ChatRequest(BaseModel):
+    """Body of an ``/api/chat`` request (the fields the stand-in reads)."""
+
+    model: str
+    messages: list[dict[str, Any]]
+    tools: list[dict[str, Any]] | None = None
+    stream: bool = True
+
+
+def _argument_value(template: Any, groups: dict[str, str]) -> Any:  # noqa: ANN401
+    """Fill a ``"{name}"`` argument from the match groups."""
+    if not (isinstance(template, str) and template.startswith("{")):
+        return template
+    value = groups.get(template.strip("{}"), "")
+    number = value.replace(",", "")
+    try:
+        return int(number)
+    except ValueError:
+        try:
+            return float(number)
+        except ValueError:
+            return value
+
+
+class Script:
+    """Picks the scripted reply to a conversation."""
+
+    def __init__(self, rules: list[dict[str, Any]]) -> None:
+        """Compile the rules.
+
+        Args:
+            rules: Dicts with a 'pattern', a 'tool' and its 'arguments'.
+
+        """
+        self.rules = [(re.compile(rule["pattern"]), rule) for rule in rules]
+
+    def reply(self, request: ChatRequest) -> dict[str, Any]:
+        """Return the assistant message answering the last message."""
+        last = request.messages[-1] if request.messages else {}
+        content = str(last.get("content", ""))
+        offered = {
+            tool.get("function", {}).get("name") for tool in request.tools or []
+        }
+        if last.get("role") == "user":
+            for pattern, rule in self.rules:
+                match = pattern.search(content)
+                if match and rule["tool"] in offered:
+                    groups = match.groupdict()
+                    arguments = {
+                        name: _argument_value(template, groups)
+                        for name, template in rule["arguments"].items()
+                    }
+                    call = {"function": {"name": rule["tool"], "arguments": arguments}}
+                    return {"role": "assistant", "content": "", "tool_calls": [call]}
+        if last.get("role") == "tool":
+            answer = f"Here is what I found: {content[:MAX_QUOTED_CHARS]}"
+        else:
+            answer = "I can help with spending, prices, investments and savings."
+        return {"role": "assistant", "content": answer}
+
+
+def chat_response(
+    model: str, message: dict[str, Any], *, done: bool,
+) -> dict[str, Any]:
+    """Return an Ollama chat response (or stream chunk) carrying a message."""
+    response: dict[str, Any] = {
+        "model": model,
+        "created_at": datetime.now(tz=UTC).isoformat(),
+        "message": message,
+        "done": done,
+    }
+    if done:
+        response.update(
+            done_reason="stop",
+            total_duration=0,
+            prompt_eval_count=0,
+            eval_count=len(message.get("content", "").split()),
+        )
+    return response
+
+
+def create_app(script: Script, latency_ms: float, jitter_ms: float) -> FastAPI:
+    """Create the stand-in app.
+
+    Args:
+        script: Scripted replies.
+        latency_ms: Mean delay of a reply.
+        jitter_ms: Largest random change to the delay, either way.
+
+    """
+    app = FastAPI(title="Ollama Stand-in")
+
+    @app.get("/api/version")
+    async def version() -> dict[str, str]:
+        """Report a version, as Ollama does."""
+        return {"version": "0.0.0-standin"}
+
+    @app.post("/api/chat", response_model=None)
+    async def chat(request: ChatRequest) -> dict[str, Any] | StreamingResponse:
+        """Answer a chat request from the script after the configured delay."""
+        message = script.reply(request)
+        delay = latency_ms + random.uniform(-jitter_ms, jitter_ms)  # noqa: S311
+        await asyncio.sleep(max(delay, 0) / 1000)
+        if not request.stream:
+            return chat_response(request.model, message, done=True)
+
+        async def chunks() -> AsyncIterator[str]:
+            yield json.dumps(chat_response(request.model, message, done=False)) + "\n"
+            final = {"role": "assistant", "content": ""}
+            yield json.dumps(chat_response(request.model, final, done=True)) + "\n"
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    return app
+
+
+def main() -> None:
+    """Run the stand-in from the command line."""
+    parser = argparse.ArgumentParser(description="Serve a scripted Ollama stand-in.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument(
+        "--script", type=Path, help="JSON file of rules replacing the default script.",
+    )
+    args = parser.parse_args()
+    rules = json.loads(args.script.read_text()) if args.script else DEFAULT_SCRIPT
+    app = create_app(Script(rules), args.latency_ms, args.jitter_ms)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
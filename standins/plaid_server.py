@@ -0,0 +1,359 @@
+"""Plaid Stand-in Server.
+
+This module serves a Plaid-compatible ``/transactions/sync`` endpoint backed
+by a deterministic, in-memory change log per access token: the first sync
+pages through about two years of generated history, and
+``/standin/transactions/simulate`` appends new, modified and removed
+transactions for the next incremental sync to pick up. Responses follow the
+Plaid schema closely enough for the official ``plaid-python`` client.
+
+Example:
+    just start-plaid-standin
+
+"""
+
+import base64
+import binascii
+import hashlib
+import sys
+import threading
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from loguru import logger
+from pydantic import BaseModel, Field
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.logging_setup import setup_logging
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+HISTORY_DAYS = 730
+TRANSACTIONS_PER_DAY = 3
+ACCOUNTS_PER_ITEM = 2
+MERCHANTS = {
+    "FOOD_AND_DRINK": ["Blue Bottle Coffee", "Chipotle", "Whole Foods"],
+    "TRANSPORTATION": ["Uber", "Shell", "Metro Transit"],
+    "ENTERTAINMENT": ["Netflix", "AMC Theatres", "Spotify"],
+    "GENERAL_MERCHANDISE": ["Amazon", "Target", "Costco"],
+    "RENT_AND_UTILITIES": ["City Power", "Comcast", "Water Utility"],
+    "MEDICAL": ["CVS Pharmacy", "City Clinic"],
+    "INCOME": ["Payroll"],
+}
+MEAN_AMOUNTS = {
+    "FOOD_AND_DRINK": 25.0,
+    "TRANSPORTATION": 30.0,
+    "ENTERTAINMENT": 20.0,
+    "GENERAL_MERCHANDISE": 60.0,
+    "RENT_AND_UTILITIES": 120.0,
+    "MEDICAL": 45.0,
+    "INCOME": 2500.0,
+}
+
+# Set up logging
+logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
+logger.info("Logging initialized for plaid_server.py")
+
+
+class SyncRequest(BaseModel):
+    """Body of a ``/transactions/sync`` request."""
+
+    client_id: str | None = None
+    secret: str | None = None
+    access_token: str
+    cursor: str | None = None
+    count: int = Field(100, ge=1, le=500)
+
+
+class SimulateRequest(BaseModel):
+    """Body of a ``/standin/transactions/simulate`` request."""
+
+    access_token: str
+    added: int = Field(10, ge=0)
+    modified: int = Field(0, ge=0)
+    removed: int = Field(0, ge=0)
+
+
+class PlaidError(Exception):
+    """A Plaid-style API error."""
+
+    error_type = "API_ERROR"
+    error_code = "INTERNAL_SERVER_ERROR"
+
+
+class InvalidFieldError(PlaidError):
+    """A request field has an invalid value."""
+
+    error_type = "INVALID_REQUEST"
+    error_code = "INVALID_FIELD"
+
+
+class InvalidAccessTokenError(PlaidError):
+    """The access token is not one this server issues."""
+
+    error_type = "INVALID_INPUT"
+    error_code = "INVALID_ACCESS_TOKEN"
+
+
+def encode_cursor(position: int) -> str:
+    """Return the opaque cursor for a position in an item's change log."""
+    return base64.urlsafe_b64encode(f"standin:{position}".encode()).decode()
+
+
+def decode_cursor(cursor: str | None) -> int:
+    """Return the change log position of a cursor ('' or None is the start).
+
+    Raises:
+        PlaidError: If the cursor was not issued by this server.
+
+    """
+    if not cursor:
+        return 0
+    error_message = "cursor is not a valid sync cursor"
+    try:
+        prefix, position = base64.urlsafe_b64decode(cursor).decode().split(":")
+        position_number = int(position)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidFieldError(error_message) from e
+    if prefix != "standin":
+        raise InvalidFieldError(error_message)
+    return position_number
+
+
+class Item:
+    """Generated accounts and the ordered change log of one access token."""
+
+    def __init__(self, access_token: str) -> None:
+        """Generate the item's accounts and transaction history."""
+        seed = int.from_bytes(hashlib.sha256(access_token.encode()).digest()[:8])
+        self.rng = np.random.default_rng(seed)
+        self.account_ids = [
+            uuid.UUID(bytes=self.rng.bytes(16)).hex for _ in range(ACCOUNTS_PER_ITEM)
+        ]
+        self.transactions: dict[str, dict[str, Any]] = {}
+        # Each entry is ("added" | "modified" | "removed", transaction).
+        self.changes: list[tuple[str, dict[str, Any]]] = []
+        start = date.today() - timedelta(days=HISTORY_DAYS)  # noqa: DTZ011
+        for offset in range(HISTORY_DAYS):
+            for _ in range(self.rng.poisson(TRANSACTIONS_PER_DAY)):
+                self.add(start + timedelta(days=offset))
+
+    def new_transaction(self, day: date) -> dict[str, Any]:
+        """Generate one transaction on a day."""
+        category = str(self.rng.choice(list(MERCHANTS)))
+        merchant = str(self.rng.choice(MERCHANTS[category]))
+        amount = round(float(self.rng.exponential(MEAN_AMOUNTS[category])) + 1, 2)
+        return transaction_object(
+            {
+                "transaction_id": uuid.UUID(bytes=self.rng.bytes(16)).hex,
+                "account_id": str(self.rng.choice(self.account_ids)),
+                "date": day.isoformat(),
+                "name": merchant,
+                "amount": -amount if category == "INCOME" else amount,
+            },
+            category,
+        )
+
+    def add(self, day: date) -> None:
+        """Append a new transaction to the change log."""
+        transaction = self.new_transaction(day)
+        self.transactions[transaction["transaction_id"]] = transaction
+        self.changes.append(("added", transaction))
+
+    def modify(self) -> None:
+        """Change the amount of a random existing transaction."""
+        transaction_id = str(self.rng.choice(list(self.transactions)))
+        transaction = dict(self.transactions[transaction_id])
+        transaction["amount"] = round(transaction["amount"] * 1.1, 2)
+        self.transactions[transaction_id] = transaction
+        self.changes.append(("modified", transaction))
+
+    def remove(self) -> None:
+        """Remove a random existing transaction."""
+        transaction_id = str(self.rng.choice(list(self.transactions)))
+        transaction = self.transactions.pop(transaction_id)
+        self.changes.append(
+            (
+                "removed",
+                {
+                    "transaction_id": transaction_id,
+                    "account_id": transaction["account_id"],
+                },
+            ),
+        )
+
+
+def transaction_object(fields: dict[str, Any], category: str) -> dict[str, Any]:
+    """Return a transaction with every field the Plaid schema requires.
+
+    Args:
+        fields: 'transaction_id', 'account_id', 'date', 'name' and 'amount'.
+        category: Plaid personal finance category (primary).
+
+    """
+    return {
+        **fields,
+        "iso_currency_code": "USD",
+        "unofficial_currency_code": None,
+        "authorized_date": fields["date"],
+        "authorized_datetime": None,
+        "datetime": None,
+        "merchant_name": fields["name"],
+        "pending": False,
+        "pending_transaction_id": None,
+        "account_owner": None,
+        "payment_channel": "in store",
+        "transaction_code": None,
+        "transaction_type": "place",
+        "category": None,
+        "category_id": None,
+        "personal_finance_category": {
+            "primary": category,
+            "detailed": f"{category}_OTHER",
+            "confidence_level": "HIGH",
+        },
+        "location": {
+            "address": None,
+            "city": None,
+            "region": None,
+            "postal_code": None,
+            "country": None,
+            "lat": None,
+            "lon": None,
+            "store_number": None,
+        },
+        "payment_meta": {
+            "reference_number": None,
+            "ppd_id": None,
+            "payee": None,
+            "by_order_of": None,
+            "payer": None,
+            "payment_method": None,
+            "payment_processor": None,
+            "reason": None,
+        },
+    }
+
+
+class ItemRegistry:
+    """Thread-safe registry of generated items, keyed by access token."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._items: dict[str, Item] = {}
+
+    def sync(self, request: SyncRequest) -> dict[str, Any]:
+        """Return the page of changes after a cursor."""
+        position = decode_cursor(request.cursor)
+        with self._lock:
+            item = self._item(request.access_token)
+            if position > len(item.changes):
+                error_message = "cursor is ahead of the item"
+                raise InvalidFieldError(error_message)
+            page = item.changes[position : position + request.count]
+            next_position = position + len(page)
+            has_more = next_position < len(item.changes)
+            account_ids = item.account_ids
+        response: dict[str, Any] = {"added": [], "modified": [], "removed": []}
+        for kind, transaction in page:
+            response[kind].append(transaction)
+        return {
+            **response,
+            "accounts": [account_object(account_id) for account_id in account_ids],
+            "next_cursor": encode_cursor(next_position),
+            "has_more": has_more,
+            "transactions_update_status": "HISTORICAL_UPDATE_COMPLETE",
+            "request_id": uuid.uuid4().hex[:15],
+        }
+
+    def simulate(self, request: SimulateRequest) -> dict[str, int]:
+        """Append new, modified and removed transactions to an item."""
+        with self._lock:
+            item = self._item(request.access_token)
+            for _ in range(request.added):
+                item.add(date.today())  # noqa: DTZ011
+            for _ in range(min(request.modified, len(item.transactions))):
+                item.modify()
+            for _ in range(min(request.removed, len(item.transactions))):
+                item.remove()
+            return {
+                "changes": len(item.changes),
+                "transactions": len(item.transactions),
+            }
+
+    def _item(self, access_token: str) -> Item:
+        """Return the item of an access token, generating it on first use."""
+        if not access_token.startswith("access-"):
+            error_message = "provided access token is invalid"
+            raise InvalidAccessTokenError(error_message)
+        if access_token not in self._items:
+            self._items[access_token] = Item(access_token)
+        return self._items[access_token]
+
+
+def account_object(account_id: str) -> dict[str, Any]:
+    """Return a minimal depository account in the Plaid schema."""
+    return {
+        "account_id": account_id,
+        "balances": {
+            "available": None,
+            "current": 1000.0,
+            "limit": None,
+            "iso_currency_code": "USD",
+            "unofficial_currency_code": None,
+        },
+        "mask": account_id[:4],
+        "name": "Stand-in Checking",
+        "official_name": None,
+        "type": "depository",
+        "subtype": "checking",
+    }
+
+
+registry = ItemRegistry()
+app = FastAPI(
+    title="Plaid Stand-in",
+    description="Plaid-compatible transaction sync for local development.",
+    version="1.0.0",
+)
+
+
+@app.exception_handler(PlaidError)
+async def plaid_error_handler(_: Request, error: PlaidError) -> JSONResponse:
+    """Return errors in Plaid's error format."""
+    return JSONResponse(
+        status_code=400,
+        content={
+            "error_type": error.error_type,
+            "error_code": error.error_code,
+            "error_message": str(error),
+            "display_message": None,
+            "request_id": uuid.uuid4().hex[:15],
+        },
+    )
+
+
+@app.post("/transactions/sync")
+async def transactions_sync(request: SyncRequest) -> dict[str, Any]:
+    """Serve one page of the item's changes after the cursor."""
+    return registry.sync(request)
+
+
+@app.post("/standin/transactions/simulate")
+async def simulate_transactions(request: SimulateRequest) -> dict[str, int]:
+    """Append activity to an item for the next sync to pick up."""
+    logger.info(f"Simulating activity: {request.model_dump(exclude={'access_token'})}")
+    return registry.simulate(request)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="127.0.0.1", port=8100, log_level="info")
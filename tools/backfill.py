@@ -0,0 +1,307 @@
+"""Historical Price Backfill CLI.
+
+This module pre-populates the local price store with stock and crypto history
+for a list of symbols, so the first user of a symbol does not pay for the full
+download. Symbols are fetched in a process pool with bounded concurrency and
+retries, progress is checkpointed so interrupted runs can resume, and the run
+reports its throughput in symbols per second.
+
+Example:
+    just backfill AAPL,MSFT,crypto:BTC 2015-01-01 2024-12-31 --workers 8
+
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Literal
+
+import pandas as pd
+from loguru import logger
+from pydantic import BaseModel, ConfigDict
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from tools.price_providers import (
+    DEFAULT_FIXTURE_DIR,
+    FixtureProvider,
+    LiveProvider,
+    PriceProvider,
+    RecordingProvider,
+)
+from tools.price_store import PriceStore
+from utils.config_types import PriceCacheConfigs
+from utils.logging_setup import setup_logging
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+DEFAULT_CHECKPOINT_PATH = PROJECT_ROOT / "data" / "prices" / "backfill_checkpoint.json"
+
+# Set up logging at module level
+logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
+logger.info("Logging initialized for backfill.py")
+
+
+class BackfillJob(BaseModel):
+    """One symbol's history to backfill.
+
+    ``end_date`` is the last day fetched, capped at yesterday, while
+    ``requested_end_date`` is the end the run asked for. The checkpoint key
+    uses the requested end, so a run resumed on a later day still recognizes
+    the jobs it already completed.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    asset_class: Literal["stock", "crypto"]
+    symbol: str
+    start_date: str
+    end_date: str
+    requested_end_date: str
+    currency: str = "usd"
+
+    @property
+    def key(self) -> str:
+        """Return the checkpoint key identifying this job."""
+        return (
+            f"{self.asset_class}:{self.symbol.upper()}:{self.currency.lower()}:"
+            f"{self.start_date}:{self.requested_end_date}"
+        )
+
+
+def parse_symbols(
+    entries: list[str],
+    default_asset_class: str,
+    start_date: str,
+    end_date: str,
+    currency: str = "usd",
+) -> list[BackfillJob]:
+    """Build backfill jobs from symbol entries.
+
+    Args:
+        entries: Symbols, optionally prefixed with an asset class
+            ('AAPL', 'crypto:BTC').
+        default_asset_class: Asset class of entries without a prefix.
+        start_date: First day to backfill ('YYYY-MM-DD').
+        end_date: Last day to backfill ('YYYY-MM-DD'), capped at yesterday
+            since today's bar is not final yet.
+        currency: Quote currency for crypto.
+
+    Returns:
+        list[BackfillJob]: One job per unique entry.
+
+    """
+    yesterday = pd.Timestamp(datetime.now(tz=UTC).date()) - pd.Timedelta(days=1)
+    fetch_end_date = min(pd.Timestamp(end_date), yesterday).strftime("%Y-%m-%d")
+    jobs: dict[str, BackfillJob] = {}
+    for raw_entry in entries:
+        entry = raw_entry.strip()
+        if not entry:
+            continue
+        asset_class, _, symbol = entry.rpartition(":")
+        job = BackfillJob(
+            asset_class=asset_class or default_asset_class,
+            symbol=symbol.upper(),
+            start_date=start_date,
+            end_date=fetch_end_date,
+            requested_end_date=end_date,
+            currency=currency,
+        )
+        jobs[job.key] = job
+    return list(jobs.values())
+
+
+def load_checkpoint(checkpoint_path: Path) -> set[str]:
+    """Return the keys of jobs completed by previous runs."""
+    if not checkpoint_path.exists():
+        return set()
+    with checkpoint_path.open() as f:
+        return set(json.load(f).get("completed", []))
+
+
+def save_checkpoint(checkpoint_path: Path, completed: set[str]) -> None:
+    """Atomically write the keys of completed jobs."""
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=checkpoint_path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump({"completed": sorted(completed)}, f, indent=2)
+    Path(tmp_name).replace(checkpoint_path)
+
+
+def fetch_job(
+    provider: PriceProvider,
+    job: BackfillJob,
+    retries: int,
+    backoff_seconds: float,
+) -> pd.Series:
+    """Fetch one job's closes, retrying with exponential backoff.
+
+    Runs in a worker process.
+
+    Raises:
+        ValueError: If every attempt fails.
+
+    """
+    for attempt in range(retries + 1):
+        try:
+            return provider.fetch_daily_closes(
+                job.asset_class, job.symbol, job.start_date, job.end_date, job.currency,
+            )
+        except ValueError as e:
+            if attempt == retries:
+                raise
+            delay = backoff_seconds * 2**attempt
+            logger.warning(
+                f"Backfill of {job.key} failed (attempt {attempt + 1}), "
+                f"retrying in {delay:.1f}s: {e}",
+            )
+            time.sleep(delay)
+    error_message = f"Backfill of {job.key} made no attempts"
+    raise ValueError(error_message)
+
+
+def run_backfill(  # noqa: PLR0913
+    jobs: list[BackfillJob],
+    provider: PriceProvider,
+    store: PriceStore,
+    checkpoint_path: Path,
+    *,
+    workers: int = 4,
+    retries: int = 3,
+    backoff_seconds: float = 1.0,
+) -> dict[str, Any]:
+    """Backfill jobs in a process pool and write the results to the store.
+
+    Only the parent process writes to the store and the checkpoint, so worker
+    processes never contend on files.
+
+    Args:
+        jobs: Jobs to run; jobs already in the checkpoint are skipped.
+        provider: Provider the workers fetch from (must be picklable).
+        store: Price store the closes are written into.
+        checkpoint_path: JSON file recording completed jobs.
+        workers: Maximum number of concurrent worker processes.
+        retries: Retries per job after the first failed attempt.
+        backoff_seconds: Base delay of the exponential backoff.
+
+    Returns:
+        dict[str, Any]: Counts of completed, skipped and failed jobs, the
+        elapsed time and the throughput in symbols per second.
+
+    """
+    completed = load_checkpoint(checkpoint_path)
+    pending = [job for job in jobs if job.key not in completed]
+    failed: list[str] = []
+    logger.info(
+        f"Backfilling {len(pending)} symbols ({len(jobs) - len(pending)} already "
+        f"done) with {workers} workers",
+    )
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(fetch_job, provider, job, retries, backoff_seconds): job
+            for job in pending
+        }
+        for future in as_completed(futures):
+            job = futures[future]
+            # Any failure (a dead worker, a network or Parquet error) only
+            # fails this job; it stays out of the checkpoint and is retried
+            # by the next run.
+            try:
+                closes = future.result()
+                days = pd.date_range(job.start_date, job.end_date, freq="D")
+                store.write(
+                    job.asset_class, job.symbol, closes.reindex(days), job.currency,
+                )
+            except Exception as e:  # noqa: BLE001
+                logger.error(f"Backfill of {job.key} failed: {e!r}")
+                failed.append(job.key)
+                continue
+            completed.add(job.key)
+            save_checkpoint(checkpoint_path, completed)
+    elapsed = time.perf_counter() - started
+
+    succeeded = len(pending) - len(failed)
+    report = {
+        "completed": succeeded,
+        "skipped": len(jobs) - len(pending),
+        "failed": failed,
+        "elapsed_seconds": round(elapsed, 3),
+        "symbols_per_second": round(succeeded / elapsed, 3) if elapsed > 0 else 0.0,
+    }
+    logger.info(f"Backfill finished: {report}")
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the backfill CLI.
+
+    Returns:
+        int: Process exit code (1 if any symbol failed).
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--symbols",
+        default="",
+        help="Comma-separated symbols, optionally prefixed ('AAPL,crypto:BTC').",
+    )
+    parser.add_argument(
+        "--symbols-file", type=Path, help="File with one symbol entry per line.",
+    )
+    parser.add_argument("--start", required=True, help="Start date (YYYY-MM-DD).")
+    parser.add_argument("--end", required=True, help="End date (YYYY-MM-DD).")
+    parser.add_argument(
+        "--asset-class", choices=["stock", "crypto"], default="stock",
+        help="Asset class of symbols without a prefix.",
+    )
+    parser.add_argument("--currency", default="usd", help="Quote currency for crypto.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--backoff", type=float, default=1.0)
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT_PATH)
+    parser.add_argument("--provider", choices=["live", "fixture"], default="live")
+    parser.add_argument("--fixture-dir", type=Path, default=DEFAULT_FIXTURE_DIR)
+    parser.add_argument(
+        "--record-dir", type=Path, help="Record fetched closes as fixtures here.",
+    )
+    args = parser.parse_args(argv)
+
+    entries = args.symbols.split(",")
+    if args.symbols_file:
+        entries += args.symbols_file.read_text().splitlines()
+    jobs = parse_symbols(
+        entries, args.asset_class, args.start, args.end, args.currency,
+    )
+
+    provider: PriceProvider = (
+        FixtureProvider(args.fixture_dir) if args.provider == "fixture"
+        else LiveProvider()
+    )
+    if args.record_dir:
+        provider = RecordingProvider(provider, args.record_dir)
+
+    store_dir = PriceCacheConfigs.load_from_path(str(DEFAULT_CONFIG_PATH)).store_dir
+    report = run_backfill(
+        jobs,
+        provider,
+        PriceStore(PROJECT_ROOT / store_dir),
+        args.checkpoint,
+        workers=args.workers,
+        retries=args.retries,
+        backoff_seconds=args.backoff,
+    )
+    sys.stdout.write(json.dumps(report, indent=2) + "\n")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
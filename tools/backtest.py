@@ -0,0 +1,277 @@
+"""Portfolio Backtest Module.
+
+This module replays a portfolio of stocks and crypto over the daily closes in
+the local price store: the closes are aligned into one (days x assets) price
+matrix, holdings change only on rebalancing and contribution days, and the
+equity curve for the whole period is a single matrix product of the prices
+with the holdings in force on each day. Only the (few hundred) trading events
+are stepped through one by one.
+
+Example:
+    just backfill AAPL,crypto:BTC 2020-01-01 2024-12-31
+
+"""
+
+import sys
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from tools.price_cache import price_cache
+from utils.logging_setup import setup_logging
+from utils.models import BacktestInput
+from utils.structured_logging import log_event
+from utils.visualization import lttb_indices
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+PERIOD_CODES = {"monthly": "M", "quarterly": "Q", "yearly": "Y"}
+BASIS_POINT = 1e-4
+DAYS_PER_YEAR = 365.25
+
+# Set up logging at module level
+logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
+logger.info("Logging initialized for backtest.py")
+
+
+class BacktestResult(NamedTuple):
+    """Daily portfolio values and what it took to produce them."""
+
+    equity: np.ndarray
+    # Cash added on each day (contributions, and the initial amount on day 0).
+    flows: np.ndarray
+    # Units held of each asset on the last day.
+    final_units: np.ndarray
+    costs: float
+    rebalances: int
+
+
+def parse_asset(entry: str) -> tuple[str, str]:
+    """Split 'crypto:BTC' / 'AAPL' into (asset class, symbol)."""
+    asset_class, _, symbol = entry.strip().rpartition(":")
+    return asset_class or "stock", symbol.upper()
+
+
+def load_price_matrix(
+    assets: list[str], start_date: str, end_date: str | None, currency: str = "usd",
+) -> pd.DataFrame:
+    """Align the stored closes of several assets into one matrix.
+
+    Days on which only some assets trade (e.g. weekends for crypto) carry the
+    last close of the others forward, and the matrix starts on the first day
+    every asset has a price.
+
+    Returns:
+        pd.DataFrame: Closes indexed by date, one column per asset entry.
+
+    Raises:
+        ValueError: If an asset has no stored closes in the range, or the
+            assets have no day in common.
+
+    """
+    closes = {}
+    for entry in assets:
+        asset_class, symbol = parse_asset(entry)
+        stored = (
+            price_cache.store.read(asset_class, symbol, currency, start_date, end_date)
+            if price_cache.store
+            else None
+        )
+        if stored is None or stored.dropna().empty:
+            error_message = (
+                f"No stored price history for {entry} since {start_date}; "
+                "backfill it first (just backfill)"
+            )
+            raise ValueError(error_message)
+        closes[entry] = stored.dropna()
+    prices = pd.DataFrame(closes).sort_index().ffill().dropna()
+    if prices.empty:
+        error_message = "The assets have no trading days in common"
+        raise ValueError(error_message)
+    return prices
+
+
+def period_starts(index: pd.DatetimeIndex, frequency: str) -> np.ndarray:
+    """Flag the first day of every month, quarter or year after the first day."""
+    periods = index.to_period(PERIOD_CODES[frequency]).asi8
+    starts = np.zeros(len(index), dtype=bool)
+    starts[1:] = periods[1:] != periods[:-1]
+    return starts
+
+
+def simulate(  # noqa: PLR0913
+    prices: np.ndarray,
+    weights: np.ndarray,
+    initial_amount: float,
+    *,
+    rebalance_days: np.ndarray,
+    contribution_days: np.ndarray,
+    contribution: float,
+    cost_rate: float,
+) -> BacktestResult:
+    """Replay a portfolio over a price matrix.
+
+    On a rebalancing day the holdings (plus any contribution) are reset to the
+    target weights, paying ``cost_rate`` on the value traded; on other
+    contribution days only the contribution is invested at the target weights.
+
+    Args:
+        prices: Closes of shape (days, assets).
+        weights: Target weights summing to 1.
+        initial_amount: Amount invested on the first day.
+        rebalance_days: Boolean mask of rebalancing days.
+        contribution_days: Boolean mask of contribution days.
+        contribution: Amount added on each contribution day.
+        cost_rate: Cost per unit of value traded.
+
+    Returns:
+        BacktestResult: Daily values, cash flows, final holdings and costs.
+
+    """
+    events = np.flatnonzero(rebalance_days | contribution_days)
+    units = np.empty((len(events) + 1, len(weights)))
+    costs = cost_rate * initial_amount
+    units[0] = weights * (initial_amount - costs) / prices[0]
+    for step, day in enumerate(events, 1):
+        price = prices[day]
+        held = units[step - 1] * price
+        cash = contribution if contribution_days[day] else 0.0
+        if rebalance_days[day]:
+            total = held.sum() + cash
+            cost = cost_rate * np.abs(weights * total - held).sum()
+            units[step] = weights * (total - cost) / price
+        else:
+            cost = cost_rate * cash
+            units[step] = units[step - 1] + weights * (cash - cost) / price
+        costs += cost
+
+    # Row i of units is in force from event i (day 0 for the first) onwards.
+    is_event = np.zeros(len(prices), dtype=np.intp)
+    is_event[events] = 1
+    holdings = units[np.cumsum(is_event)]
+    flows = np.where(contribution_days, contribution, 0.0)
+    flows[0] = initial_amount
+    return BacktestResult(
+        equity=np.einsum("ij,ij->i", prices, holdings),
+        flows=flows,
+        final_units=units[-1],
+        costs=float(costs),
+        rebalances=int(rebalance_days.sum()),
+    )
+
+
+def summary_stats(
+    index: pd.DatetimeIndex, equity: np.ndarray, flows: np.ndarray,
+) -> dict[str, float | None]:
+    """Compute time-weighted performance statistics of an equity curve.
+
+    Daily returns exclude the cash added that day, so contributions do not
+    count as performance.
+
+    Returns:
+        dict[str, float | None]: Time-weighted total return and CAGR, annual
+        volatility, Sharpe ratio (zero risk-free rate) and maximum drawdown,
+        in percent where applicable; None when undefined.
+
+    """
+    daily = (equity[1:] - flows[1:]) / equity[:-1] - 1
+    growth = np.concatenate([[1.0], np.cumprod(1 + daily)])
+    total_growth = float(growth[-1])
+    years = (index[-1] - index[0]).days / DAYS_PER_YEAR
+    periods_per_year = len(daily) / years if years > 0 else 0
+    volatility = (
+        float(daily.std() * np.sqrt(periods_per_year)) if len(daily) > 1 else 0.0
+    )
+    drawdown = growth / np.maximum.accumulate(growth) - 1
+    return {
+        "time_weighted_return_pct": round((total_growth - 1) * 100, 2),
+        "cagr_pct": (
+            round((total_growth ** (1 / years) - 1) * 100, 2) if years else None
+        ),
+        "annual_volatility_pct": round(volatility * 100, 2),
+        "sharpe_ratio": (
+            round(float(daily.mean()) * periods_per_year / volatility, 2)
+            if volatility > 0
+            else None
+        ),
+        "max_drawdown_pct": round(float(drawdown.min()) * 100, 2),
+    }
+
+
+def backtest_portfolio(input_data: BacktestInput) -> dict[str, Any]:
+    """Backtest a portfolio over the stored daily closes of its assets.
+
+    Args:
+        input_data: Validated input data using Pydantic.
+
+    Returns:
+        dict: The period covered, amounts invested and final value, summary
+        statistics, costs, final weights and a downsampled equity curve.
+
+    Raises:
+        ValueError: If the price history needed is not stored.
+
+    """
+    log_event("tool.call", tool="backtest_portfolio", input=input_data)
+    assets = list(input_data.allocations)
+    prices = load_price_matrix(
+        assets, input_data.start_date, input_data.end_date, input_data.currency,
+    )
+    weights = np.array([input_data.allocations[asset] for asset in assets])
+    weights /= weights.sum()
+    index = pd.DatetimeIndex(prices.index)
+    never = np.zeros(len(index), dtype=bool)
+    result = simulate(
+        prices.to_numpy(),
+        weights,
+        input_data.initial_amount,
+        rebalance_days=(
+            never
+            if input_data.rebalance == "none"
+            else period_starts(index, input_data.rebalance)
+        ),
+        contribution_days=(
+            period_starts(index, input_data.contribution_frequency)
+            if input_data.contribution > 0
+            else never
+        ),
+        contribution=input_data.contribution,
+        cost_rate=input_data.transaction_cost_bps * BASIS_POINT,
+    )
+
+    final_value = float(result.equity[-1])
+    invested = float(result.flows.sum())
+    curve = lttb_indices(
+        index.asi8.astype(float), result.equity, input_data.curve_points,
+    )
+    final_weights = result.final_units * prices.to_numpy()[-1] / final_value
+    log_event(
+        "tool.result", tool="backtest_portfolio", final_value=round(final_value, 2),
+    )
+    return {
+        "start_date": index[0].strftime("%Y-%m-%d"),
+        "end_date": index[-1].strftime("%Y-%m-%d"),
+        "total_invested": round(invested, 2),
+        "final_value": round(final_value, 2),
+        "profit_loss": round(final_value - invested, 2),
+        **summary_stats(index, result.equity, result.flows),
+        "total_costs": round(result.costs, 2),
+        "rebalances": result.rebalances,
+        "final_weights": {
+            asset: round(float(weight), 4)
+            for asset, weight in zip(assets, final_weights, strict=True)
+        },
+        "equity_curve": [
+            {
+                "date": index[day].strftime("%Y-%m-%d"),
+                "value": round(float(result.equity[day]), 2),
+            }
+            for day in curve
+        ],
+    }
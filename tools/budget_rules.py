@@ -0,0 +1,502 @@
+"""Budget Rules Module.
+
+This module evaluates declarative budget rules (see ``BudgetRule``), such as
+"food over $1000 in a month" or "shopping up 30% on last year", for every
+tenant at once. The spending aggregates of all tenants are pivoted into one
+(tenant x period) by category table per period type, and the rules are
+compiled into a values matrix, a baseline matrix and a threshold vector, so
+all rules x all tenants are decided by a single array comparison.
+
+Runs are incremental: tenants whose aggregates did not change since the last
+run are skipped without being read, and for the others only the periods whose
+spending changed (and the later periods comparing against them) are
+re-evaluated.
+
+Example:
+    just evaluate-budgets
+
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from tools.columnar_store import write_parquet
+from tools.spending_cube import MONTH_NAMES, MONTHS_PER_YEAR
+from tools.spending_ingest import AGGREGATE_KEYS, Fingerprint, file_fingerprint
+from tools.tenant_store import TenantStore, tenant_store
+from utils.config_types import BudgetConfigs
+from utils.logging_setup import setup_logging
+from utils.models import BudgetRule
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+TOTAL_COLUMN = "__total__"
+AMOUNT_TOLERANCE = 1e-9
+PERIOD_KEYS = {"month": ["tenant_id", "year", "month"], "year": ["tenant_id", "year"]}
+ALERT_COLUMNS = [
+    "tenant_id", "rule", "period", "category", "value", "baseline", "threshold",
+]
+
+# Set up logging at module level
+logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
+logger.info("Logging initialized for budget_rules.py")
+
+budget_configs = BudgetConfigs.load_from_path(str(DEFAULT_CONFIG_PATH))
+
+# Changed periods of one tenant as (year, month number); None means all.
+ChangedPeriods = set[tuple[int, int]] | None
+
+
+class CompiledRules(NamedTuple):
+    """The rules of one period type, as arrays lined up with their columns."""
+
+    names: list[str]
+    columns: list[str]
+    categories: list[str | None]
+    is_change: np.ndarray
+    compare_to: np.ndarray
+    thresholds: np.ndarray
+
+
+def compile_rules(rules: list[BudgetRule]) -> CompiledRules:
+    """Turn rules into the arrays one batch evaluation works on."""
+    return CompiledRules(
+        names=[rule.name for rule in rules],
+        columns=[
+            rule.category.lower() if rule.category else TOTAL_COLUMN
+            for rule in rules
+        ],
+        categories=[rule.category for rule in rules],
+        is_change=np.array([rule.metric == "change_pct" for rule in rules]),
+        compare_to=np.array([rule.compare_to for rule in rules]),
+        thresholds=np.array([rule.threshold for rule in rules], dtype="float64"),
+    )
+
+
+def period_tables(aggregates: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Pivot the aggregates of many tenants into one table per period type.
+
+    Args:
+        aggregates: Rows with 'tenant_id', 'year', 'month' (name), 'category'
+            and 'amount' columns.
+
+    Returns:
+        dict[str, pd.DataFrame]: 'month' and 'year' tables indexed by
+        ``PERIOD_KEYS`` (months numbered 1-12), with one column per lowercased
+        category plus ``TOTAL_COLUMN``.
+
+    """
+    month_numbers = pd.Categorical(aggregates["month"], categories=MONTH_NAMES).codes
+    monthly = (
+        aggregates.assign(
+            month=month_numbers + 1, category=aggregates["category"].str.lower(),
+        )
+        .pivot_table(
+            index=PERIOD_KEYS["month"],
+            columns="category",
+            values="amount",
+            aggfunc="sum",
+            fill_value=0.0,
+        )
+        .rename_axis(columns=None)
+    )
+    monthly[TOTAL_COLUMN] = monthly.sum(axis=1)
+    yearly = monthly.groupby(level=PERIOD_KEYS["year"]).sum()
+    return {"month": monthly, "year": yearly}
+
+
+def baseline_index(index: pd.MultiIndex, period: str, compare_to: str) -> pd.MultiIndex:
+    """Return the period each row of a period table is compared with."""
+    tenants = index.get_level_values("tenant_id")
+    years = index.get_level_values("year").to_numpy()
+    if period == "year":
+        return pd.MultiIndex.from_arrays([tenants, years - 1], names=index.names)
+    months = index.get_level_values("month").to_numpy()
+    if compare_to == "previous_year":
+        return pd.MultiIndex.from_arrays(
+            [tenants, years - 1, months], names=index.names,
+        )
+    wraps = months == 1
+    return pd.MultiIndex.from_arrays(
+        [tenants, years - wraps, np.where(wraps, MONTHS_PER_YEAR, months - 1)],
+        names=index.names,
+    )
+
+
+def evaluate(
+    table: pd.DataFrame,
+    period: str,
+    rules: CompiledRules,
+    rows: pd.MultiIndex | None = None,
+) -> pd.DataFrame:
+    """Evaluate every rule on every row of a period table in one pass.
+
+    Args:
+        table: A period table from ``period_tables``.
+        period: 'month' or 'year'.
+        rules: Compiled rules of that period type.
+        rows: Rows to evaluate (all if None); baselines may come from any row.
+
+    Returns:
+        pd.DataFrame: One alert per (row, rule) over its threshold, with
+        ``ALERT_COLUMNS``. 'baseline' is NaN for amount rules.
+
+    """
+    evaluated = table if rows is None else table.loc[table.index.intersection(rows)]
+    values = evaluated.reindex(columns=rules.columns, fill_value=0.0).to_numpy()
+    baselines = np.full_like(values, np.nan)
+    for compare_to in np.unique(rules.compare_to[rules.is_change]):
+        mask = rules.is_change & (rules.compare_to == compare_to)
+        previous = table.reindex(
+            index=baseline_index(evaluated.index, period, compare_to),
+            columns=rules.columns,
+            fill_value=0.0,
+        ).to_numpy()
+        baselines[:, mask] = previous[:, mask]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = np.where(baselines > 0, (values - baselines) / baselines * 100, np.nan)
+    metrics = np.where(rules.is_change, change, values)
+    rows_hit, rules_hit = np.nonzero(metrics > rules.thresholds)
+
+    years = evaluated.index.get_level_values("year").to_numpy()[rows_hit]
+    if period == "month":
+        months = evaluated.index.get_level_values("month").to_numpy()[rows_hit]
+        labels = [
+            f"{year}-{month:02d}" for year, month in zip(years, months, strict=True)
+        ]
+    else:
+        labels = [str(year) for year in years]
+    return pd.DataFrame(
+        {
+            "tenant_id": evaluated.index.get_level_values("tenant_id")[rows_hit],
+            "rule": np.asarray(rules.names, dtype=object)[rules_hit],
+            "period": labels,
+            "category": np.asarray(rules.categories, dtype=object)[rules_hit],
+            "value": values[rows_hit, rules_hit],
+            "baseline": baselines[rows_hit, rules_hit],
+            "threshold": rules.thresholds[rules_hit],
+        },
+        columns=ALERT_COLUMNS,
+    )
+
+
+def changed_periods(
+    current: pd.DataFrame, snapshot: pd.DataFrame | None,
+) -> set[tuple[int, int]] | None:
+    """Return the (year, month number) pairs whose spending differs.
+
+    Args:
+        current: A tenant's aggregates, indexed by year, month and category.
+        snapshot: The aggregates at the last evaluation (None if never).
+
+    Returns:
+        set[tuple[int, int]] | None: The changed months; None if the tenant
+        was never evaluated.
+
+    """
+    if snapshot is None:
+        return None
+    difference = current["amount"].sub(snapshot["amount"], fill_value=0.0)
+    changed = difference[difference.abs() > AMOUNT_TOLERANCE].index
+    return {
+        (int(year), MONTH_NAMES.index(month) + 1)
+        for year, month in zip(
+            changed.get_level_values("year"),
+            changed.get_level_values("month"),
+            strict=True,
+        )
+    }
+
+
+def rows_to_evaluate(
+    table: pd.DataFrame, period: str, changes: dict[str, ChangedPeriods],
+) -> pd.MultiIndex:
+    """Return the rows affected by the changed periods of each tenant.
+
+    A changed month also affects the next month and the same month next
+    year, whose change rules compare against it; a changed year affects
+    itself and the next year.
+    """
+    tenants = table.index.get_level_values("tenant_id")
+    keys = []
+    for tenant_id, periods in changes.items():
+        if periods is None:
+            keys.extend(table.index[tenants == tenant_id])
+            continue
+        for year, month in periods:
+            if period == "year":
+                keys.extend([(tenant_id, year), (tenant_id, year + 1)])
+            else:
+                following = (
+                    (year + 1, 1) if month == MONTHS_PER_YEAR else (year, month + 1)
+                )
+                keys.extend(
+                    [
+                        (tenant_id, year, month),
+                        (tenant_id, *following),
+                        (tenant_id, year + 1, month),
+                    ],
+                )
+    if not keys:
+        return table.index[:0]
+    return pd.MultiIndex.from_tuples(keys, names=table.index.names).unique()
+
+
+def _write_json(path: Path, payload: dict[str, Any]) -> None:
+    """Replace a JSON file atomically."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(payload, f)
+    Path(tmp_name).replace(path)
+
+
+class BudgetEngine:
+    """Incremental, batched evaluation of budget rules over all tenants.
+
+    The state directory holds:
+
+    - ``state.json``: a hash of the rules and, per tenant, the fingerprint of
+      the aggregates last evaluated;
+    - ``snapshots/<tenant>.parquet``: those aggregates, to find which periods
+      changed since;
+    - ``alerts/<tenant>.parquet``: the tenant's current alerts.
+
+    Changing the rules re-evaluates every tenant on the next run.
+    """
+
+    def __init__(
+        self, store: TenantStore, rules: list[BudgetRule], state_dir: Path,
+    ) -> None:
+        """Initialize the engine.
+
+        Args:
+            store: Tenant storage with the spending aggregates.
+            rules: Rules to evaluate.
+            state_dir: Directory of the engine's state.
+
+        """
+        self.store = store
+        self.rules = rules
+        self.state_dir = state_dir
+        self.rules_hash = hashlib.sha256(
+            json.dumps([rule.model_dump() for rule in rules]).encode(),
+        ).hexdigest()
+
+    def load_alerts(self, tenant_id: str) -> pd.DataFrame:
+        """Return the current alerts of a tenant."""
+        path = self._state_path("alerts", tenant_id)
+        if not path.exists():
+            return pd.DataFrame(columns=ALERT_COLUMNS)
+        return pd.read_parquet(path)
+
+    def run(self, tenant_ids: list[str] | None = None) -> dict[str, Any]:
+        """Re-evaluate the rules where the aggregates changed since the last run.
+
+        Args:
+            tenant_ids: Tenants to consider; defaults to every tenant.
+
+        Returns:
+            dict[str, Any]: Tenants evaluated and skipped, rows evaluated, and
+            the alerts raised in this run.
+
+        """
+        state = self._load_state()
+        full = state.get("rules_hash") != self.rules_hash
+        fingerprints: dict[str, list[int]] = {} if full else state["fingerprints"]
+        tenant_ids = self.store.tenant_ids() if tenant_ids is None else tenant_ids
+
+        loaded, changes = self._find_changes(tenant_ids, fingerprints)
+        batches = []
+        evaluated: dict[str, set[str]] = {}
+        rows_evaluated = 0
+        if changes:
+            tables = period_tables(
+                pd.concat(
+                    {tenant_id: loaded[tenant_id][1] for tenant_id in changes},
+                    names=["tenant_id"],
+                ).reset_index(),
+            )
+            for period, table in tables.items():
+                rules = [rule for rule in self.rules if rule.period == period]
+                if not rules:
+                    continue
+                rows = rows_to_evaluate(table, period, changes)
+                batches.append(evaluate(table, period, compile_rules(rules), rows))
+                rows_evaluated += len(table.index.intersection(rows))
+                for tenant_id, labels in _period_labels(rows, period).items():
+                    evaluated.setdefault(tenant_id, set()).update(labels)
+        alerts = (
+            pd.concat(batches, ignore_index=True)
+            if batches
+            else pd.DataFrame(columns=ALERT_COLUMNS)
+        )
+
+        for tenant_id, (fingerprint, current) in loaded.items():
+            if tenant_id in changes:
+                self._save_alerts(
+                    tenant_id,
+                    alerts[alerts["tenant_id"] == tenant_id],
+                    None
+                    if changes[tenant_id] is None
+                    else evaluated.get(tenant_id, set()),
+                )
+            self._save_snapshot(tenant_id, current)
+            fingerprints[tenant_id] = list(fingerprint)
+        _write_json(
+            self.state_dir / "state.json",
+            {"rules_hash": self.rules_hash, "fingerprints": fingerprints},
+        )
+
+        summary = {
+            "full": full,
+            "tenants_evaluated": len(changes),
+            "tenants_skipped": len(tenant_ids) - len(changes),
+            "rows_evaluated": rows_evaluated,
+            "alerts_raised": len(alerts),
+        }
+        logger.info(f"Evaluated {len(self.rules)} budget rules: {summary}")
+        return {
+            **summary,
+            "alerts": alerts.replace({np.nan: None}).to_dict(orient="records"),
+        }
+
+    def _find_changes(
+        self, tenant_ids: list[str], fingerprints: dict[str, list[int]],
+    ) -> tuple[dict[str, tuple[Fingerprint, pd.DataFrame]], dict[str, ChangedPeriods]]:
+        """Load the tenants whose aggregates changed and find the changed periods.
+
+        Args:
+            tenant_ids: Tenants to consider.
+            fingerprints: Fingerprints of the aggregates last evaluated; a
+                tenant missing here is evaluated in full.
+
+        Returns:
+            tuple: The fingerprint and aggregates of every changed tenant, and
+            the changed periods of those whose spending actually differs.
+
+        """
+        loaded: dict[str, tuple[Fingerprint, pd.DataFrame]] = {}
+        changes: dict[str, ChangedPeriods] = {}
+        for tenant_id in tenant_ids:
+            path = self.store.aggregates_path(tenant_id)
+            if not path.exists():
+                continue
+            fingerprint = file_fingerprint(path)
+            if fingerprints.get(tenant_id) == list(fingerprint):
+                continue
+            current = self.store.load_aggregates(tenant_id)
+            loaded[tenant_id] = (fingerprint, current)
+            snapshot = (
+                self._load_snapshot(tenant_id) if tenant_id in fingerprints else None
+            )
+            periods = changed_periods(current, snapshot)
+            if periods is None or periods:
+                changes[tenant_id] = periods
+        return loaded, changes
+
+    def _state_path(self, kind: str, tenant_id: str) -> Path:
+        """Return a tenant's file of one kind ('snapshots' or 'alerts')."""
+        tenant_name = self.store.tenant_dir(tenant_id).name
+        return self.state_dir / kind / f"{tenant_name}.parquet"
+
+    def _load_state(self) -> dict[str, Any]:
+        """Return the saved engine state (empty before the first run)."""
+        path = self.state_dir / "state.json"
+        if not path.exists():
+            return {}
+        with path.open() as f:
+            return json.load(f)
+
+    def _load_snapshot(self, tenant_id: str) -> pd.DataFrame | None:
+        """Return the aggregates a tenant was last evaluated on, if any."""
+        path = self._state_path("snapshots", tenant_id)
+        if not path.exists():
+            return None
+        return pd.read_parquet(path).set_index(AGGREGATE_KEYS)
+
+    def _save_snapshot(self, tenant_id: str, aggregates: pd.DataFrame) -> None:
+        """Save the aggregates a tenant was evaluated on."""
+        write_parquet(
+            self._state_path("snapshots", tenant_id), aggregates.reset_index(),
+        )
+
+    def _save_alerts(
+        self, tenant_id: str, alerts: pd.DataFrame, labels: set[str] | None,
+    ) -> None:
+        """Replace a tenant's alerts for the periods that were re-evaluated.
+
+        Args:
+            tenant_id: Tenant the alerts belong to.
+            alerts: The tenant's alerts from this run.
+            labels: Periods that were re-evaluated; None if all were.
+
+        """
+        kept = self.load_alerts(tenant_id)
+        kept = kept.iloc[:0] if labels is None else kept[~kept["period"].isin(labels)]
+        frames = [frame for frame in (kept, alerts) if not frame.empty]
+        updated = (
+            pd.concat(frames, ignore_index=True)
+            if frames
+            else pd.DataFrame(columns=ALERT_COLUMNS)
+        )
+        write_parquet(
+            self._state_path("alerts", tenant_id),
+            updated.astype(
+                {"value": "float64", "baseline": "float64", "threshold": "float64"},
+            ),
+        )
+
+
+def _period_labels(rows: pd.MultiIndex, period: str) -> dict[str, list[str]]:
+    """Group the period labels of evaluated rows by tenant."""
+    frame = rows.to_frame(index=False)
+    if period == "month":
+        frame["label"] = [
+            f"{year}-{month:02d}"
+            for year, month in zip(frame["year"], frame["month"], strict=True)
+        ]
+    else:
+        frame["label"] = frame["year"].astype(str)
+    return {
+        tenant_id: group["label"].tolist()
+        for tenant_id, group in frame.groupby("tenant_id")
+    }
+
+
+budget_engine = BudgetEngine(
+    tenant_store, budget_configs.rules, PROJECT_ROOT / budget_configs.state_dir,
+)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the budget evaluation CLI."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--tenant",
+        action="append",
+        dest="tenants",
+        help="Tenant to evaluate (repeatable); defaults to every tenant.",
+    )
+    args = parser.parse_args(argv)
+    report = budget_engine.run(args.tenants)
+    sys.stdout.write(json.dumps(report, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""Chart Cache Module.
+
+This module renders charts at most once per distinct input: each chart is
+stored under a name derived from a hash of the renderer, the plotted data and
+the chart options, so a repeated request is answered with the existing file
+and concurrent requests never write to the same path. Charts that are not
+cached yet are rendered in a small process pool, which keeps matplotlib's
+CPU-bound (and GIL-holding) work off the API worker threads.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.config_types import ChartConfigs
+from utils.logging_setup import setup_logging
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+KEY_LENGTH = 24
+
+# Set up logging at module level
+logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
+logger.info("Logging initialized for chart_cache.py")
+
+chart_configs = ChartConfigs.load_from_path(str(DEFAULT_CONFIG_PATH))
+
+Renderer = Callable[[Any, dict[str, Any]], None]
+
+
+def chart_key(
+    renderer: Renderer, data: Any, options: dict[str, Any],  # noqa: ANN401
+) -> str:
+    """Return the content hash identifying a chart.
+
+    Args:
+        renderer: Module-level function drawing the chart.
+        data: JSON-serializable data plotted.
+        options: JSON-serializable chart options (title, labels, ...).
+
+    """
+    payload = json.dumps(
+        [f"{renderer.__module__}.{renderer.__qualname__}", data, options],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:KEY_LENGTH]
+
+
+def _render(
+    renderer: Renderer, data: Any, options: dict[str, Any], path: str,  # noqa: ANN401
+) -> None:
+    """Render a chart into a temporary file and move it into place (in a worker)."""
+    target = Path(path)
+    fd, tmp_name = tempfile.mkstemp(
+        dir=target.parent, prefix=".tmp-", suffix=target.suffix,
+    )
+    os.close(fd)
+    try:
+        renderer(data, {**options, "output_path": Path(tmp_name)})
+        Path(tmp_name).replace(target)
+    finally:
+        Path(tmp_name).unlink(missing_ok=True)
+
+
+class ChartCache:
+    """Content-addressed chart files, rendered in a process pool on a miss.
+
+    Requests for a chart that is already being rendered wait for the same
+    render instead of starting another one. Once more than ``max_charts``
+    files exist, the least recently used ones are removed.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        workers: int,
+        max_charts: int,
+        render_timeout_seconds: float,
+    ) -> None:
+        """Initialize the cache; the pool starts on the first miss.
+
+        Args:
+            cache_dir: Directory of the chart files.
+            workers: Rendering processes.
+            max_charts: Chart files kept on disk.
+            render_timeout_seconds: Longest a caller waits for a render.
+
+        """
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.max_charts = max_charts
+        self.render_timeout_seconds = render_timeout_seconds
+        self._lock = threading.Lock()
+        self._pending: dict[Path, Future] = {}
+        self._executor: ProcessPoolExecutor | None = None
+
+    def get_chart(
+        self,
+        renderer: Renderer,
+        data: Any,  # noqa: ANN401
+        options: dict[str, Any],
+        suffix: str = ".png",
+    ) -> tuple[Path, bool]:
+        """Return the file of a chart, rendering it if it is not cached.
+
+        Args:
+            renderer: Module-level function called as
+                ``renderer(data, {**options, "output_path": path})``.
+            data: JSON-serializable data plotted.
+            options: JSON-serializable chart options.
+            suffix: File suffix, which selects the image format.
+
+        Returns:
+            tuple[Path, bool]: The chart file and whether it was a cache hit.
+
+        Raises:
+            ValueError: If rendering fails or times out.
+
+        """
+        path = self.cache_dir / f"{chart_key(renderer, data, options)}{suffix}"
+        submitted = False
+        with self._lock:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                future = self._pending.get(path)
+                if future is None:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    future = self._submit(renderer, data, options, path)
+                    self._pending[path] = future
+                    submitted = True
+            else:
+                return path, True
+        # A future that is already done runs the callback right away, and
+        # _finish takes the lock, so it is registered outside the lock.
+        if submitted:
+            future.add_done_callback(lambda _: self._finish(path))
+
+        try:
+            future.result(timeout=self.render_timeout_seconds)
+        except FutureTimeoutError as e:
+            error_message = f"Rendering {path.name} timed out"
+            logger.error(error_message)
+            raise ValueError(error_message) from e
+        except Exception as e:
+            error_message = f"Error rendering chart: {e}"
+            logger.error(error_message)
+            raise ValueError(error_message) from e
+        logger.info(f"Rendered chart {path}")
+        return path, False
+
+    def shutdown(self) -> None:
+        """Stop the rendering processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def _submit(
+        self,
+        renderer: Renderer,
+        data: Any,  # noqa: ANN401
+        options: dict[str, Any],
+        path: Path,
+    ) -> Future:
+        """Queue a render, replacing the pool if a worker died (lock held)."""
+        for _ in range(2):
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            try:
+                return self._executor.submit(
+                    _render, renderer, data, options, str(path),
+                )
+            except BrokenProcessPool:
+                logger.warning("Chart rendering pool broke, starting a new one")
+                self._executor = None
+        error_message = "Chart rendering pool is unavailable"
+        raise ValueError(error_message)
+
+    def _finish(self, path: Path) -> None:
+        """Forget a finished render and trim the cache to its size limit."""
+        with self._lock:
+            self._pending.pop(path, None)
+            # Pruning under the lock keeps it from racing with cache hits
+            # touching their file.
+            charts = [
+                chart
+                for chart in self.cache_dir.glob(f"*{path.suffix}")
+                if not chart.name.startswith(".tmp-")
+            ]
+            if len(charts) <= self.max_charts:
+                return
+            charts.sort(key=lambda chart: chart.stat().st_mtime_ns)
+            for chart in charts[: len(charts) - self.max_charts]:
+                chart.unlink(missing_ok=True)
+
+
+chart_cache = ChartCache(
+    PROJECT_ROOT / chart_configs.cache_dir,
+    chart_configs.workers,
+    chart_configs.max_charts,
+    chart_configs.render_timeout_seconds,
+)
@@ -0,0 +1,231 @@
+"""Columnar Storage Module.
+
+This module stores tabular data as Parquet files partitioned by year
+(``<root>/year=2023/part-0.parquet``) and reads them memory-mapped through
+Arrow, loading only the requested columns and the partitions that can match
+the filters. Spending data and the price store both sit on top of it.
+
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from loguru import logger
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from tools.spending_cube import MONTH_DTYPE
+from tools.spending_ingest import (
+    AGGREGATE_KEYS,
+    TRANSACTION_DTYPES,
+    add_periods,
+    spending_configs,
+)
+from utils.logging_setup import setup_logging
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+PARTITION_COLUMN = "year"
+
+# Set up logging at module level
+logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
+logger.info("Logging initialized for columnar_store.py")
+
+Filters = list[tuple[str, str, Any]]
+
+
+def is_columnar(path: Path) -> bool:
+    """Return whether a path is a Parquet file or a partitioned dataset."""
+    return path.is_dir() or path.suffix == ".parquet"
+
+
+def write_partitioned(
+    frame: pd.DataFrame, root: Path, part_name: str = "part-0",
+) -> None:
+    """Write a frame as one Parquet file per year partition.
+
+    Each ``<root>/year=<y>/<part_name>.parquet`` file is written to a hidden
+    temporary file, which dataset discovery skips, and renamed into place, so
+    readers never see a partial file. Writing the same part name again
+    replaces that part of the partition.
+
+    Args:
+        frame: Rows with a 'year' column.
+        root: Dataset directory.
+        part_name: File name (without suffix) inside each partition.
+
+    """
+    for year, part in frame.groupby(PARTITION_COLUMN, observed=True):
+        partition_dir = root / f"{PARTITION_COLUMN}={int(year)}"
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(
+            part.drop(columns=PARTITION_COLUMN), preserve_index=False,
+        )
+        fd, tmp_name = tempfile.mkstemp(dir=partition_dir, prefix=".tmp-")
+        os.close(fd)
+        try:
+            pq.write_table(table, tmp_name, compression="zstd")
+            Path(tmp_name).replace(partition_dir / f"{part_name}.parquet")
+        finally:
+            Path(tmp_name).unlink(missing_ok=True)
+
+
+def write_parquet(path: Path, frame: pd.DataFrame) -> None:
+    """Replace a single Parquet file atomically."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    os.close(fd)
+    try:
+        frame.to_parquet(tmp_name, index=False)
+        Path(tmp_name).replace(path)
+    finally:
+        Path(tmp_name).unlink(missing_ok=True)
+
+
+def read_partitioned(
+    root: Path,
+    columns: list[str] | None = None,
+    filters: Filters | None = None,
+    *,
+    categorical: tuple[str, ...] = (),
+) -> pd.DataFrame:
+    """Read a dataset memory-mapped, with column and partition pruning.
+
+    Args:
+        root: Dataset directory or single Parquet file.
+        columns: Columns to read (all if None).
+        filters: Arrow filters such as ``[("year", "=", 2023)]``; filters on
+            'year' skip whole partitions.
+        categorical: String columns to return as categoricals.
+
+    Returns:
+        pd.DataFrame: The matching rows; empty if the dataset does not exist.
+
+    """
+    if not root.exists():
+        return pd.DataFrame(columns=columns or [])
+    table = read_table(root, columns, filters)
+    for column in categorical:
+        if column in table.column_names:
+            index = table.schema.get_field_index(column)
+            table = table.set_column(
+                index, column, pc.dictionary_encode(table[column].cast(pa.string())),
+            )
+    return table.to_pandas()
+
+
+def read_table(
+    root: Path, columns: list[str] | None = None, filters: Filters | None = None,
+) -> pa.Table:
+    """Read a dataset into an Arrow table, memory-mapped and pruned."""
+    table = pq.read_table(
+        root,
+        columns=columns,
+        filters=filters or None,
+        memory_map=True,
+        partitioning="hive",
+    )
+    if PARTITION_COLUMN in table.column_names:
+        index = table.schema.get_field_index(PARTITION_COLUMN)
+        table = table.set_column(
+            index,
+            PARTITION_COLUMN,
+            table[PARTITION_COLUMN].cast(pa.string()).cast(pa.int16()),
+        )
+    return table
+
+
+def dataset_fingerprint(root: Path) -> tuple[int, int]:
+    """Return the newest mtime (ns) and total size of a dataset's files."""
+    files = [root] if root.is_file() else list(root.rglob("*.parquet"))
+    stats = [file.stat() for file in files]
+    return (
+        max((stat.st_mtime_ns for stat in stats), default=0),
+        sum(stat.st_size for stat in stats),
+    )
+
+
+def aggregate_spending_dataset(root: Path) -> pd.DataFrame:
+    """Aggregate a spending dataset per (year, month, category) inside Arrow.
+
+    Only the four aggregate columns are read, and the grouping runs on the
+    memory-mapped Arrow table, so no per-row pandas objects are created.
+
+    Returns:
+        pd.DataFrame: 'amount' and 'count' columns indexed by year, month name
+        and category.
+
+    """
+    table = read_table(root, columns=[*AGGREGATE_KEYS, "amount"])
+    grouped = table.group_by(AGGREGATE_KEYS).aggregate(
+        [("amount", "sum"), ("amount", "count")],
+    )
+    aggregates = grouped.to_pandas().rename(
+        columns={"amount_sum": "amount", "amount_count": "count"},
+    )
+    aggregates["year"] = aggregates["year"].astype("int64")
+    return aggregates.set_index(AGGREGATE_KEYS).sort_index()
+
+
+def convert_spending_csv(
+    csv_path: Path, dataset_dir: Path, chunk_rows: int = spending_configs.chunk_rows,
+) -> dict[str, Any]:
+    """Convert a spending/transaction CSV into a year-partitioned Parquet dataset.
+
+    The CSV is streamed in chunks, each chunk becoming one part file per year,
+    so conversion memory is bounded by the chunk size.
+
+    Args:
+        csv_path: CSV with 'category', 'amount' and 'year'/'month' or 'date'.
+        dataset_dir: Output directory; replaced if it exists.
+        chunk_rows: Rows converted at a time.
+
+    Returns:
+        dict[str, Any]: Rows written, partitions and output size.
+
+    """
+    header = pd.read_csv(csv_path, nrows=0).columns
+    dtypes = {
+        column: dtype
+        for column, dtype in TRANSACTION_DTYPES.items()
+        if column in header
+    }
+    if dataset_dir.exists():
+        shutil.rmtree(dataset_dir)
+
+    rows = 0
+    with pd.read_csv(csv_path, dtype=dtypes, chunksize=chunk_rows) as reader:
+        for chunk_number, chunk in enumerate(reader):
+            chunk_with_periods = add_periods(chunk).astype(
+                {"category": str, "month": str},
+            )
+            write_partitioned(
+                chunk_with_periods, dataset_dir, part_name=f"part-{chunk_number}",
+            )
+            rows += len(chunk)
+
+    report = {
+        "rows": rows,
+        "partitions": len(list(dataset_dir.glob(f"{PARTITION_COLUMN}=*"))),
+        "csv_bytes": csv_path.stat().st_size,
+        "parquet_bytes": dataset_fingerprint(dataset_dir)[1],
+        "dataset": str(dataset_dir),
+    }
+    logger.info(f"Converted {csv_path} to Parquet: {report}")
+    return report
+
+
+def load_spending_dataset(root: Path) -> pd.DataFrame:
+    """Read a whole spending dataset with categorical 'category' and 'month'."""
+    spending_df = read_partitioned(root, categorical=("category",))
+    spending_df["month"] = spending_df["month"].astype(str).astype(MONTH_DTYPE)
+    return spending_df
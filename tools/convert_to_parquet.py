@@ -0,0 +1,60 @@
+"""Parquet Conversion CLI.
+
+This module converts the existing CSV data to the year-partitioned Parquet
+layout of the columnar store: a spending CSV into a spending dataset, and the
+CSV files of the price store into per-asset price datasets.
+
+Example:
+    just convert-spending data/combined_spending_data.csv data/spending
+    just convert-prices
+
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from loguru import logger
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from tools.columnar_store import convert_spending_csv
+from tools.price_cache import price_cache
+from tools.spending_ingest import spending_configs
+from utils.logging_setup import setup_logging
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+
+# Set up logging at module level
+logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
+logger.info("Logging initialized for convert_to_parquet.py")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the conversion CLI."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    spending = commands.add_parser(
+        "spending", help="Convert a spending CSV to a Parquet dataset.",
+    )
+    spending.add_argument("source", type=Path, help="Spending CSV to convert.")
+    spending.add_argument("destination", type=Path, help="Dataset directory.")
+    spending.add_argument(
+        "--chunk-rows", type=int, default=spending_configs.chunk_rows,
+    )
+    commands.add_parser("prices", help="Convert price store CSV files to Parquet.")
+    args = parser.parse_args(argv)
+
+    if args.command == "spending":
+        report = convert_spending_csv(args.source, args.destination, args.chunk_rows)
+    else:
+        report = price_cache.store.convert_csv_files()
+    sys.stdout.write(json.dumps(report, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
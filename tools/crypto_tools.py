@@ -5,17 +5,23 @@ from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
+import pandas as pd
 import requests
 from loguru import logger
 
 # Add project root to sys.path for module imports
 sys.path.append(str(Path(__file__).parent.parent))
+from tools.price_cache import price_cache
+from utils.config_types import UpstreamConfigs
+from utils.http_client import http_session
 from utils.logging_setup import setup_logging
 from utils.models import CryptoInput  # Import the Pydantic model
+from utils.structured_logging import log_event
 
 # Constants
 PROJECT_ROOT = Path(__file__).parent.parent
 DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+upstream_configs = UpstreamConfigs.load_from_path(str(DEFAULT_CONFIG_PATH))
 
 # Set up logging at module level
 logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
@@ -24,6 +30,11 @@ logger.info("Logging initialized for crypto_tools.py")
 MAX_CRYPTO_SYMBOL_LENGTH = 5
 
 
+def is_crypto_symbol(crypto_name: str) -> bool:
+    """Return whether a name is already a crypto symbol (e.g. 'BTC')."""
+    return crypto_name.isupper() and len(crypto_name) <= MAX_CRYPTO_SYMBOL_LENGTH
+
+
 def lookup_crypto_symbol(crypto_name: str) -> str | None:
     """Look up cryptocurrency symbol from a name using CoinGecko API.
 
@@ -36,17 +47,22 @@ def lookup_crypto_symbol(crypto_name: str) -> str | None:
         Optional[str]: The cryptocurrency symbol if found, None otherwise
 
     """
+    cached_symbol = price_cache.get_symbol(crypto_name)
+    if cached_symbol:
+        return cached_symbol
+
+    result = None
     try:
         # First check if it's already a valid symbol (upper case)
-        if crypto_name.isupper() and len(crypto_name) <= MAX_CRYPTO_SYMBOL_LENGTH:
+        if is_crypto_symbol(crypto_name):
             logger.info(f"Assuming {crypto_name} is already a valid crypto symbol")
             return crypto_name
 
         # Use CoinGecko's search API to find the symbol
-        url = f"https://api.coingecko.com/api/v3/search?query={crypto_name}"
+        url = f"{upstream_configs.coingecko_url}/api/v3/search?query={crypto_name}"
         logger.info(f"Looking up symbol for cryptocurrency: {crypto_name}")
 
-        response = requests.get(url, timeout=10)
+        response = http_session.get(url, timeout=10)
         response.raise_for_status()
         data = response.json()
 
@@ -56,6 +72,7 @@ def lookup_crypto_symbol(crypto_name: str) -> str | None:
             name = data["coins"][0]["name"]
             coin_id = data["coins"][0]["id"]
             logger.info(f"Found match: {name} (ID: {coin_id}, Symbol: {symbol})")
+            price_cache.set_symbol(crypto_name, symbol)
             result = symbol
         else:
             # Log warning if no matches are found
@@ -95,14 +112,21 @@ def get_historical_price(
         # Look up the symbol if needed
         symbol = lookup_crypto_symbol(crypto_id) or crypto_id
 
+        cached_price = price_cache.get_daily_close("crypto", symbol, date, vs_currency)
+        if cached_price is not None:
+            return cached_price
+
         # Convert date to timestamp with timezone awareness
         dt = datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=UTC)
         timestamp = int(dt.timestamp())
 
-        url = f"https://min-api.cryptocompare.com/data/pricehistorical?fsym={symbol}&tsyms={vs_currency.upper()}&ts={timestamp}"
+        url = (
+            f"{upstream_configs.cryptocompare_url}/data/pricehistorical?"
+            f"fsym={symbol}&tsyms={vs_currency.upper()}&ts={timestamp}"
+        )
         logger.info(f"Fetching historical price for {symbol} on {date}")
 
-        response = requests.get(url, timeout=10)
+        response = http_session.get(url, timeout=10)
         response.raise_for_status()
         data = response.json()
 
@@ -113,13 +137,110 @@ def get_historical_price(
             logger.error(error_message)
             raise ValueError(error_message)
 
-        return data[symbol][vs_currency.upper()]
+        price = data[symbol][vs_currency.upper()]
 
     except requests.RequestException as e:
         error_message = f"Error fetching historical data for {crypto_id}: {e}"
         logger.error(error_message)
         raise ValueError(error_message) from e
 
+    else:
+        price_cache.set_daily_closes(
+            "crypto", symbol, pd.Series([price], index=[dt]), date, date,
+            currency=vs_currency,
+        )
+        return price
+
+
+def fetch_current_price(crypto_symbol: str, vs_currency: str = "usd") -> float:
+    """Fetch the current price of a cryptocurrency and store it in the price cache.
+
+    Args:
+    ----
+        crypto_symbol: Cryptocurrency symbol (e.g., 'BTC').
+        vs_currency: Currency to compare against (default: 'usd').
+
+    Returns:
+    -------
+        float: Current price of the cryptocurrency.
+
+    Raises:
+    ------
+        ValueError: If no data is available.
+        requests.RequestException: If the request fails.
+
+    """
+    url = (
+        f"{upstream_configs.cryptocompare_url}/data/price?"
+        f"fsym={crypto_symbol}&tsyms={vs_currency.upper()}"
+    )
+    response = http_session.get(url, timeout=10)
+    response.raise_for_status()
+    data = response.json()
+
+    # Validate data and raise error if missing
+    if vs_currency.upper() not in data:
+        error_message = f"No data found for cryptocurrency symbol {crypto_symbol}"
+        logger.error(error_message)
+        raise ValueError(error_message)
+
+    current_price = data[vs_currency.upper()]
+    price_cache.set_quote("crypto", crypto_symbol, current_price, vs_currency)
+    return current_price
+
+
+def refresh_crypto_quote(crypto_symbol: str, vs_currency: str = "usd") -> float:
+    """Refresh the current quote and the latest daily bars of a cryptocurrency.
+
+    The symbol is not looked up here, so the caller controls (and can rate
+    limit) the CoinGecko search; each refresh is two CryptoCompare calls.
+
+    Args:
+    ----
+        crypto_symbol: Cryptocurrency symbol (e.g., 'SOL').
+        vs_currency: Currency to compare against (default: 'usd').
+
+    Returns:
+    -------
+        float: Current price of the cryptocurrency.
+
+    Raises:
+    ------
+        ValueError: If the data cannot be fetched.
+
+    """
+    try:
+        current_price = fetch_current_price(crypto_symbol, vs_currency)
+
+        # Yesterday's (final) and today's (live) daily bars
+        url = (
+            f"{upstream_configs.cryptocompare_url}/data/v2/histoday?"
+            f"fsym={crypto_symbol}&tsym={vs_currency.upper()}&limit=1"
+        )
+        response = http_session.get(url, timeout=10)
+        response.raise_for_status()
+        bars = response.json().get("Data", {}).get("Data", [])
+        if bars:
+            closes = pd.Series(
+                [bar["close"] for bar in bars],
+                index=pd.to_datetime([bar["time"] for bar in bars], unit="s"),
+            )
+            price_cache.set_daily_closes(
+                "crypto",
+                crypto_symbol,
+                closes,
+                closes.index[0].strftime("%Y-%m-%d"),
+                closes.index[-1].strftime("%Y-%m-%d"),
+                currency=vs_currency,
+            )
+
+    except requests.RequestException as e:
+        error_message = f"Error refreshing crypto data for {crypto_symbol}: {e}"
+        logger.error(error_message)
+        raise ValueError(error_message) from e
+
+    return current_price
+
 
 def get_crypto_data(input_data: CryptoInput) -> dict[str, Any]:
     """Retrieve current cryptocurrency data and calculate price increase b/w two dates.
@@ -141,29 +262,16 @@ def get_crypto_data(input_data: CryptoInput) -> dict[str, Any]:
     # Look up the symbol if needed
     crypto_symbol = lookup_crypto_symbol(input_data.crypto_id) or input_data.crypto_id
 
-    logger.info(
-        f"""Fetching crypto data for {input_data.crypto_id}
-        (resolved to symbol: {crypto_symbol}) in {input_data.vs_currency}""",
+    log_event(
+        "tool.call", tool="get_crypto_data", input=input_data, symbol=crypto_symbol,
     )
 
     try:
-        # Fetch current data
-        url = (
-            f"https://min-api.cryptocompare.com/data/price?"
-            f"fsym={crypto_symbol}&tsyms={input_data.vs_currency.upper()}"
+        current_price = price_cache.get_quote(
+            "crypto", crypto_symbol, input_data.vs_currency,
         )
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-
-        # Validate data and raise error if missing
-        if input_data.vs_currency.upper() not in data:
-            error_message = f"""No data found for cryptocurrency
-            {input_data.crypto_id} (symbol: {crypto_symbol})"""
-            logger.error(error_message)
-            raise ValueError(error_message)
-
-        current_price = data[input_data.vs_currency.upper()]
+        if current_price is None:
+            current_price = fetch_current_price(crypto_symbol, input_data.vs_currency)
 
         # Initialize result dictionary
         result = {
@@ -204,10 +312,7 @@ def get_crypto_data(input_data: CryptoInput) -> dict[str, Any]:
                 },
             )
 
-        logger.info(
-            f"""Successfully fetched crypto data for
-            {input_data.crypto_id} (symbol: {crypto_symbol})""",
-        )
+        log_event("tool.result", tool="get_crypto_data", symbol=crypto_symbol)
 
     except requests.RequestException as e:
         error_message = f"Error fetching crypto data for {input_data.crypto_id}: {e}"
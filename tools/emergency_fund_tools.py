@@ -1,17 +1,34 @@
-"""Emergency Fund Calculator Tool."""
+"""Emergency Fund Calculator Tool.
+
+Besides sizing a fund from stated monthly expenses, the fund can be sized from
+the spending history itself: monthly totals come from the cached spending
+cube, and the savings trajectory is projected for several monthly
+contributions at once as one (months x scenarios) array.
+"""
 import sys
 from pathlib import Path
+from typing import Any
 
+import numpy as np
 from loguru import logger
 
 # Add project root to sys.path for module imports
 sys.path.append(str(Path(__file__).parent.parent))
+from tools.spending_analytics import load_monthly_spending, row_mask
+from tools.spending_cube import MONTHS_PER_YEAR
 from utils.logging_setup import setup_logging
-from utils.models import EmergencyFundInput
+from utils.models import EmergencyFundInput, EmergencyFundProjectionInput
+from utils.structured_logging import log_event
 
 # Constants
 PROJECT_ROOT = Path(__file__).parent.parent
 DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+STORAGE_TIPS = [
+    "High-yield savings account: Offers better interest rates with easy access.",
+    "Money market account: Balances liquidity and returns.",
+    "Short-term CDs: Higher interest for fixed terms, but less flexibility.",
+    "Avoid stocks or volatile investments for emergency funds due to risk.",
+]
 
 # Set up logging at module level (only needed if this is a standalone file)
 logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
@@ -28,7 +45,7 @@ def calculate_emergency_fund(input_data: EmergencyFundInput) -> dict:
         dict: Emergency fund details including target size, progress, and storage tips.
 
     """
-    logger.info("Calculating emergency fund with validated inputs.")
+    log_event("tool.call", tool="calculate_emergency_fund", input=input_data)
 
     # Extract validated inputs
     monthly_expenses = input_data.monthly_expenses
@@ -51,14 +68,6 @@ def calculate_emergency_fund(input_data: EmergencyFundInput) -> dict:
 
     remaining_amount = max(0, target_fund_size - current_savings)
 
-    # Storage suggestions
-    storage_tips = [
-        "High-yield savings account: Offers better interest rates with easy access.",
-        "Money market account: Balances liquidity and returns.",
-        "Short-term CDs: Higher interest for fixed terms, but less flexibility.",
-        "Avoid stocks or volatile investments for emergency funds due to risk.",
-    ]
-
     result = {
         "monthly_expenses": monthly_expenses,
         "financial_obligations": financial_obligations,
@@ -67,9 +76,154 @@ def calculate_emergency_fund(input_data: EmergencyFundInput) -> dict:
         "current_savings": current_savings,
         "progress_percentage": round(progress_percentage, 2),
         "remaining_amount": remaining_amount,
-        "storage_tips": storage_tips,
+        "storage_tips": STORAGE_TIPS,
     }
 
-    logger.info(f"""Emergency fund calculated: target={target_fund_size},
-                progress={progress_percentage:.2f}%""")
+    log_event(
+        "tool.result",
+        tool="calculate_emergency_fund",
+        target=target_fund_size,
+        progress=round(progress_percentage, 2),
+    )
     return result
+
+
+def expense_statistics(totals: np.ndarray) -> dict[str, float | None]:
+    """Summarize monthly expense totals.
+
+    Returns:
+        dict[str, float | None]: The number of months, the mean, median,
+        90th-percentile and largest month, and the month-to-month volatility
+        (standard deviation, also relative to the mean).
+
+    """
+    mean = float(totals.mean())
+    volatility = float(totals.std(ddof=1)) if len(totals) > 1 else 0.0
+    median, p90 = np.percentile(totals, [50, 90])
+    return {
+        "months": len(totals),
+        "mean": round(mean, 2),
+        "median": round(float(median), 2),
+        "p90": round(float(p90), 2),
+        "max": round(float(totals.max()), 2),
+        "volatility": round(volatility, 2),
+        "coefficient_of_variation": round(volatility / mean, 4) if mean else None,
+    }
+
+
+def project_savings(
+    current_savings: float,
+    contributions: np.ndarray,
+    annual_interest_rate: float,
+    horizon_months: int,
+) -> np.ndarray:
+    """Project the fund balance month by month for every contribution at once.
+
+    Interest compounds monthly and each contribution is added at the end of
+    the month.
+
+    Args:
+        current_savings: Balance at month 0.
+        contributions: Monthly contribution of each scenario.
+        annual_interest_rate: Yearly interest as a fraction (0.04 for 4%).
+        horizon_months: Months to project.
+
+    Returns:
+        np.ndarray: Balances of shape (horizon_months + 1, scenarios).
+
+    """
+    months = np.arange(horizon_months + 1)
+    monthly_rate = (1 + annual_interest_rate) ** (1 / MONTHS_PER_YEAR) - 1
+    growth = (1 + monthly_rate) ** months
+    # Value of contributing 1 per month for ``months`` months.
+    accumulated = (growth - 1) / monthly_rate if monthly_rate > 0 else months
+    return current_savings * growth[:, None] + np.outer(accumulated, contributions)
+
+
+def months_to_target(balances: np.ndarray, target: float) -> list[int | None]:
+    """Return the first month each scenario reaches the target (None if never)."""
+    reached = balances >= target
+    first = reached.argmax(axis=0)
+    return [
+        int(month) if ever else None
+        for month, ever in zip(first, reached.any(axis=0), strict=True)
+    ]
+
+
+def project_emergency_fund(input_data: EmergencyFundProjectionInput) -> dict[str, Any]:
+    """Size an emergency fund from spending history and project savings toward it.
+
+    Monthly expenses are the total spending of every month with spending (in
+    the requested year, if any); the fund covers the average or the
+    90th-percentile month.
+
+    Args:
+        input_data: Validated input data using Pydantic.
+
+    Returns:
+        dict: Expense statistics, the target fund size and progress, and per
+        contribution scenario the months until the target is reached and the
+        balance at the end of every month.
+
+    Raises:
+        ValueError: If there is no spending history for the requested period.
+
+    """
+    log_event("tool.call", tool="project_emergency_fund", input=input_data)
+    spending = load_monthly_spending(input_data.data_source, input_data.tenant_id)
+    totals = spending.amounts[row_mask(spending, input_data.year), -1]
+    totals = totals[totals > 0]
+    if totals.size == 0:
+        error_message = "No months with spending to base the emergency fund on"
+        raise ValueError(error_message)
+    statistics = expense_statistics(totals)
+    monthly_expenses = statistics[input_data.expense_basis]
+    target_fund_size = round(
+        (monthly_expenses + input_data.financial_obligations)
+        * input_data.months_coverage,
+        2,
+    )
+
+    contributions = np.asarray(input_data.monthly_contributions, dtype=float)
+    balances = project_savings(
+        input_data.current_savings,
+        contributions,
+        input_data.annual_interest_rate / 100,
+        input_data.horizon_months,
+    )
+    reached = months_to_target(balances, target_fund_size)
+    trajectories = balances[1:].round(2).T.tolist()
+    log_event(
+        "tool.result",
+        tool="project_emergency_fund",
+        target=target_fund_size,
+        months=len(totals),
+    )
+    return {
+        "year": input_data.year,
+        "expense_statistics": statistics,
+        "expense_basis": input_data.expense_basis,
+        "monthly_expenses": monthly_expenses,
+        "financial_obligations": input_data.financial_obligations,
+        "months_coverage": input_data.months_coverage,
+        "target_fund_size": target_fund_size,
+        "current_savings": input_data.current_savings,
+        "progress_percentage": round(
+            input_data.current_savings / target_fund_size * 100, 2,
+        ),
+        "remaining_amount": round(
+            max(0.0, target_fund_size - input_data.current_savings), 2,
+        ),
+        "scenarios": [
+            {
+                "monthly_contribution": contribution,
+                "months_to_target": months,
+                "final_balance": trajectory[-1],
+                "balances": trajectory,
+            }
+            for contribution, months, trajectory in zip(
+                input_data.monthly_contributions, reached, trajectories, strict=True,
+            )
+        ],
+        "storage_tips": STORAGE_TIPS,
+    }
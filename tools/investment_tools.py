@@ -1,22 +1,33 @@
 """Investment Tools Module.
 
 This module provides tools for calculating investment returns and validating stock data.
+The grid calculator evaluates every combination of amounts, periods and rates
+in one broadcast NumPy expression instead of one call per combination. The
+HTTP endpoints get the whole grid base64-encoded; the agent tool gets the
+grid only when it is small and a percentile summary otherwise, so a large
+grid cannot flood the model's context.
 """
 
+import base64
 import sys
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 from loguru import logger
 
 # Add project root to sys.path for module imports
 sys.path.append(str(Path(__file__).parent.parent))
 from utils.logging_setup import setup_logging
-from utils.models import InvestmentReturnInput
+from utils.models import InvestmentGridInput, InvestmentReturnInput, ParameterRange
+from utils.structured_logging import log_event
 
 # Constants
 PROJECT_ROOT = Path(__file__).parent.parent
 DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+GRID_TOOL_MAX_CELLS = 100
+GRID_TOOL_MAX_AXIS_VALUES = 10
+GRID_SUMMARY_PERCENTILES = {"min": 0, "p10": 10, "median": 50, "p90": 90, "max": 100}
 
 # Set up logging at module level
 logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
@@ -43,11 +54,7 @@ def calculate_investment_return_simple(
         (negative values or unreasonable annual return).
 
     """
-    logger.info(
-        f"Calculating simple investment return with "
-        f"initial_amount={input_data.initial_amount}, years={input_data.years}, "
-        f"annual_return={input_data.annual_return}%",
-    )
+    log_event("tool.call", tool="calculate_investment_return_simple", input=input_data)
 
     try:
         # Unpack validated inputs
@@ -65,10 +72,11 @@ def calculate_investment_return_simple(
             (profit_loss / initial_amount) * 100 if initial_amount > 0 else 0
         )
 
-        logger.info(
-            f"Investment return calculated: final_value={final_value:.2f}, "
-            f"profit/loss={profit_loss:.2f}, "
-            f"return%={total_percentage_return:.2f}",
+        log_event(
+            "tool.result",
+            tool="calculate_investment_return_simple",
+            final_value=round(final_value, 2),
+            return_pct=round(total_percentage_return, 2),
         )
 
         return {
@@ -89,3 +97,125 @@ def calculate_investment_return_simple(
         raise ValueError(error_message) from e
 
 
+def _grid_axis(values: list[float] | ParameterRange) -> np.ndarray:
+    """Return the values of one grid parameter as an array."""
+    if isinstance(values, ParameterRange):
+        return np.linspace(values.start, values.stop, values.num)
+    return np.asarray(values, dtype=float)
+
+
+def _grid_values(
+    input_data: InvestmentGridInput, tool: str,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Return the grid axes, the growth factors and the final values.
+
+    The growth factor ``(1 + r)^t`` is computed once per (years, rate) pair and
+    broadcast against the amounts, so the whole grid is two array operations.
+    """
+    amounts = _grid_axis(input_data.initial_amounts)
+    years = _grid_axis(input_data.years)
+    annual_returns = _grid_axis(input_data.annual_returns)
+    log_event(
+        "tool.call",
+        tool=tool,
+        shape=f"{amounts.size}x{years.size}x{annual_returns.size}",
+    )
+    growth = (1 + annual_returns / 100) ** years[:, None]
+    return amounts, years, annual_returns, growth, amounts[:, None, None] * growth
+
+
+def _encode_grid(values: np.ndarray) -> str:
+    """Encode a grid as base64 of its little-endian float32 values, row-major."""
+    return base64.b64encode(values.astype("<f4").tobytes()).decode("ascii")
+
+
+def _summarize_axis(values: np.ndarray) -> list[float] | dict[str, Any]:
+    """Return the values of a short axis, or its range for a long one."""
+    if values.size <= GRID_TOOL_MAX_AXIS_VALUES:
+        return values.round(2).tolist()
+    return {
+        "min": round(float(values.min()), 2),
+        "max": round(float(values.max()), 2),
+        "count": int(values.size),
+    }
+
+
+def _summarize_values(values: np.ndarray) -> dict[str, float]:
+    """Return the minimum, maximum and percentiles of grid values."""
+    percentiles = np.percentile(values, list(GRID_SUMMARY_PERCENTILES.values()))
+    return dict(
+        zip(GRID_SUMMARY_PERCENTILES, percentiles.round(2).tolist(), strict=True),
+    )
+
+
+def calculate_investment_return_grid(
+    input_data: InvestmentGridInput,
+) -> dict[str, Any]:
+    """Calculate investment returns for every (amount, years, rate) combination.
+
+    The grids are returned base64-encoded (little-endian float32, row-major),
+    which keeps a million-cell grid to a few megabytes of JSON; decode one with
+    ``np.frombuffer(base64.b64decode(data), "<f4").reshape(shape)``.
+
+    Args:
+        input_data: Validated input data using Pydantic.
+
+    Returns:
+        dict: The axis values, the grid shape, final values shaped
+        (initial_amounts, years, annual_returns) and the total percentage
+        return shaped (years, annual_returns), which does not depend on the
+        amount. Profit/loss is the final value minus the initial amount.
+
+    """
+    amounts, years, annual_returns, growth, final_values = _grid_values(
+        input_data, "calculate_investment_return_grid",
+    )
+    return {
+        "initial_amounts": amounts.round(2).tolist(),
+        "years": years.tolist(),
+        "annual_returns": annual_returns.tolist(),
+        "shape": list(final_values.shape),
+        "encoding": "base64-float32-le",
+        "final_value": _encode_grid(final_values),
+        "total_percentage_return": _encode_grid((growth - 1) * 100),
+    }
+
+
+def summarize_investment_return_grid(
+    input_data: InvestmentGridInput,
+) -> dict[str, Any]:
+    """Calculate an investment grid sized for the agent's context.
+
+    Grids of up to ``GRID_TOOL_MAX_CELLS`` cells are returned in full, as
+    nested lists; larger ones are summarized by the range of each axis and
+    the minimum, maximum and percentiles of the outcomes.
+
+    Args:
+        input_data: Validated input data using Pydantic.
+
+    Returns:
+        dict: The axes (or their ranges), the grid shape and either the
+        final value and total percentage return grids or their summaries.
+
+    """
+    amounts, years, annual_returns, growth, final_values = _grid_values(
+        input_data, "summarize_investment_return_grid",
+    )
+    total_percentage_return = (growth - 1) * 100
+    if final_values.size <= GRID_TOOL_MAX_CELLS:
+        return {
+            "initial_amounts": amounts.round(2).tolist(),
+            "years": years.tolist(),
+            "annual_returns": annual_returns.tolist(),
+            "shape": list(final_values.shape),
+            "final_value": final_values.round(2).tolist(),
+            "total_percentage_return": total_percentage_return.round(2).tolist(),
+        }
+    return {
+        "initial_amounts": _summarize_axis(amounts),
+        "years": _summarize_axis(years),
+        "annual_returns": _summarize_axis(annual_returns),
+        "shape": list(final_values.shape),
+        "final_value_summary": _summarize_values(final_values),
+        "total_percentage_return_summary": _summarize_values(total_percentage_return),
+    }
@@ -0,0 +1,315 @@
+"""Monte Carlo Simulation Module.
+
+This module simulates many possible paths of an investment, with yearly
+returns drawn from a normal or lognormal distribution or bootstrapped from
+the stored price history of an asset, and reports percentile bands of the
+outcome per year ("what is my 10th-percentile balance after 20 years?").
+
+Paths are simulated in fixed-size chunks across a process pool. Each chunk
+gets its own child of one ``SeedSequence``, so results depend only on the
+seed and the chunk size, not on the number of workers, and each chunk only
+returns a histogram of balances per year over fixed log-spaced bins. Chunk
+results are merged by adding the histograms, so memory stays bounded by the
+chunk size however many paths are simulated.
+"""
+
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from tools.price_cache import price_cache
+from utils.config_types import MonteCarloConfigs
+from utils.logging_setup import setup_logging
+from utils.models import MonteCarloInput
+from utils.structured_logging import log_event
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+# Histogram range, in decades relative to the amount invested in total.
+LOG_RANGE = (-8.0, 12.0)
+DAYS_PER_YEAR = 365
+MIN_BOOTSTRAP_SAMPLES = 30
+
+# Set up logging at module level
+logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
+logger.info("Logging initialized for monte_carlo.py")
+
+monte_carlo_configs = MonteCarloConfigs.load_from_path(str(DEFAULT_CONFIG_PATH))
+
+
+class SimulationSpec(NamedTuple):
+    """Everything a worker needs to simulate a chunk of paths."""
+
+    initial_amount: float
+    annual_contribution: float
+    years: int
+    distribution: str
+    mean: float
+    volatility: float
+    # Historical yearly log returns, for 'bootstrap' only.
+    samples: np.ndarray | None
+    bins: int
+
+
+class ChunkResult(NamedTuple):
+    """Mergeable summary of simulated paths."""
+
+    # Paths per (year, log-spaced balance bin).
+    counts: np.ndarray
+    # Sum of the balances per year, for the mean.
+    sums: np.ndarray
+    # Paths ending below the total amount invested.
+    losses: int
+
+
+def invested_total(spec: SimulationSpec) -> float:
+    """Return the amount invested over the whole period."""
+    return spec.initial_amount + spec.annual_contribution * spec.years
+
+
+def _growth_factors(
+    spec: SimulationSpec, rng: np.random.Generator, paths: int,
+) -> np.ndarray:
+    """Draw (1 + return) for every year and path, shape (years, paths)."""
+    shape = (spec.years, paths)
+    if spec.distribution == "normal":
+        return np.maximum(1 + rng.normal(spec.mean, spec.volatility, shape), 0.0)
+    if spec.distribution == "lognormal":
+        # Parameters of log(1 + r) giving 1 + r the requested mean and volatility.
+        sigma2 = np.log1p((spec.volatility / (1 + spec.mean)) ** 2)
+        mu = np.log1p(spec.mean) - sigma2 / 2
+        return np.exp(rng.normal(mu, np.sqrt(sigma2), shape))
+    return np.exp(spec.samples[rng.integers(0, len(spec.samples), shape)])
+
+
+def simulate_chunk(
+    spec: SimulationSpec, paths: int, seed: np.random.SeedSequence,
+) -> ChunkResult:
+    """Simulate a chunk of paths and summarize them (runs in a worker).
+
+    Args:
+        spec: Simulation parameters.
+        paths: Paths in this chunk.
+        seed: Seed of this chunk's generator.
+
+    Returns:
+        ChunkResult: Histograms and sums of the balance per year.
+
+    """
+    rng = np.random.default_rng(seed)
+    growth = _growth_factors(spec, rng, paths)
+    low, high = LOG_RANGE
+    offset = np.log10(invested_total(spec)) + low
+    scale = spec.bins / (high - low)
+
+    counts = np.zeros((spec.years, spec.bins), dtype=np.int64)
+    sums = np.zeros(spec.years)
+    balance = np.full(paths, spec.initial_amount)
+    for year in range(spec.years):
+        balance *= growth[year]
+        balance += spec.annual_contribution
+        with np.errstate(divide="ignore"):
+            positions = (np.log10(balance) - offset) * scale
+        bins = np.clip(positions, 0, spec.bins - 1).astype(np.intp)
+        counts[year] = np.bincount(bins, minlength=spec.bins)
+        sums[year] = balance.sum()
+    losses = int(np.count_nonzero(balance < invested_total(spec)))
+    return ChunkResult(counts, sums, losses)
+
+
+def merge_results(results: list[ChunkResult]) -> ChunkResult:
+    """Add up the summaries of several chunks."""
+    return ChunkResult(
+        counts=sum(result.counts for result in results),
+        sums=sum(result.sums for result in results),
+        losses=sum(result.losses for result in results),
+    )
+
+
+def histogram_percentiles(
+    counts: np.ndarray, percentiles: np.ndarray, spec: SimulationSpec,
+) -> np.ndarray:
+    """Read percentiles off per-year histograms, interpolating inside a bin.
+
+    Args:
+        counts: Paths per (year, bin).
+        percentiles: Percentiles to read (0-100).
+        spec: Simulation parameters, which fix the bin edges.
+
+    Returns:
+        np.ndarray: Balances of shape (years, percentiles).
+
+    """
+    low, high = LOG_RANGE
+    bin_width = (high - low) / spec.bins
+    cumulative = np.cumsum(counts, axis=1)
+    # A tiny positive rank makes the 0th percentile the first non-empty bin.
+    ranks = np.maximum(percentiles / 100 * cumulative[:, -1:], np.finfo(float).tiny)
+    # First bin whose cumulative count reaches each rank, per year.
+    bins = np.minimum(
+        (cumulative[:, :, None] < ranks[:, None, :]).sum(axis=1), spec.bins - 1,
+    )
+    rows = np.arange(counts.shape[0])[:, None]
+    in_bin = counts[rows, bins]
+    before = cumulative[rows, bins] - in_bin
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.where(in_bin > 0, (ranks - before) / in_bin, 0.0)
+    log_balance = (
+        np.log10(invested_total(spec)) + low + (bins + fraction) * bin_width
+    )
+    return 10**log_balance
+
+
+def bootstrap_samples(asset_class: str, symbol: str) -> np.ndarray:
+    """Return overlapping one-year log returns from an asset's stored closes.
+
+    Raises:
+        ValueError: If less than about a year and a month of history is stored.
+
+    """
+    closes = price_cache.store.read(asset_class, symbol) if price_cache.store else None
+    closes = closes.dropna() if closes is not None else pd.Series(dtype=float)
+    if closes.empty:
+        error_message = (
+            f"No stored price history for {symbol}; backfill it first "
+            "(just backfill)"
+        )
+        raise ValueError(error_message)
+    horizon = closes.index + pd.Timedelta(days=DAYS_PER_YEAR)
+    starts = horizon <= closes.index[-1]
+    year_later = closes.reindex(horizon[starts], method="ffill").to_numpy()
+    samples = np.log(year_later / closes.to_numpy()[starts])
+    if len(samples) < MIN_BOOTSTRAP_SAMPLES:
+        error_message = f"Not enough stored price history for {symbol} to bootstrap"
+        raise ValueError(error_message)
+    return samples
+
+
+class MonteCarloEngine:
+    """Runs simulation chunks in a process pool, started on first use."""
+
+    def __init__(self, configs: MonteCarloConfigs = monte_carlo_configs) -> None:
+        """Initialize the engine.
+
+        Args:
+            configs: Worker count, chunk size and histogram resolution.
+
+        """
+        self.workers = configs.workers or os.cpu_count() or 1
+        self.chunk_paths = configs.chunk_paths
+        self.bins = configs.histogram_bins
+        self._lock = threading.Lock()
+        self._executor: ProcessPoolExecutor | None = None
+
+    def run(
+        self, spec: SimulationSpec, simulations: int, seed: int | None,
+    ) -> tuple[ChunkResult, int]:
+        """Simulate paths in chunks and merge their summaries.
+
+        Returns:
+            tuple[ChunkResult, int]: The merged summary and the seed used.
+
+        """
+        seed_sequence = np.random.SeedSequence(seed)
+        sizes = [self.chunk_paths] * (simulations // self.chunk_paths)
+        if simulations % self.chunk_paths:
+            sizes.append(simulations % self.chunk_paths)
+        seeds = seed_sequence.spawn(len(sizes))
+        if len(sizes) == 1 or self.workers == 1:
+            results = list(map(simulate_chunk, [spec] * len(sizes), sizes, seeds))
+        else:
+            results = list(
+                self._pool().map(simulate_chunk, [spec] * len(sizes), sizes, seeds),
+            )
+        return merge_results(results), seed_sequence.entropy
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        """Return the process pool, starting it if needed."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+
+monte_carlo_engine = MonteCarloEngine()
+
+
+def simulate_investment_returns(input_data: MonteCarloInput) -> dict[str, Any]:
+    """Simulate investment outcomes and report percentile bands per year.
+
+    Args:
+        input_data: Validated input data using Pydantic.
+
+    Returns:
+        dict: The inputs, the seed used (pass it back to reproduce the run),
+        the requested percentiles and the mean balance for every year, and
+        the final-year summary including the probability of ending below the
+        total amount invested.
+
+    Raises:
+        ValueError: If bootstrapping has no price history to draw from.
+
+    """
+    log_event("tool.call", tool="simulate_investment_returns", input=input_data)
+    samples = None
+    if input_data.distribution == "bootstrap":
+        samples = bootstrap_samples(input_data.asset_class, input_data.symbol)
+    spec = SimulationSpec(
+        initial_amount=input_data.initial_amount,
+        annual_contribution=input_data.annual_contribution,
+        years=input_data.years,
+        distribution=input_data.distribution,
+        mean=input_data.mean_return / 100,
+        volatility=input_data.volatility / 100,
+        samples=samples,
+        bins=monte_carlo_engine.bins,
+    )
+    merged, seed = monte_carlo_engine.run(
+        spec, input_data.simulations, input_data.seed,
+    )
+
+    percentiles = np.asarray(input_data.percentiles, dtype=float)
+    bands = histogram_percentiles(merged.counts, percentiles, spec).round(2).tolist()
+    means = (merged.sums / input_data.simulations).round(2).tolist()
+    labels = [f"p{percentile:g}" for percentile in percentiles]
+    log_event(
+        "tool.result",
+        tool="simulate_investment_returns",
+        simulations=input_data.simulations,
+        seed=seed,
+    )
+    return {
+        **input_data.model_dump(exclude={"seed"}),
+        "seed": seed,
+        "total_invested": round(invested_total(spec), 2),
+        "bands": [
+            {"year": year, "mean": mean, **dict(zip(labels, row, strict=True))}
+            for year, (mean, row) in enumerate(zip(means, bands, strict=True), 1)
+        ],
+        "final": {
+            "mean": means[-1],
+            **dict(zip(labels, bands[-1], strict=True)),
+            "probability_of_loss": round(merged.losses / input_data.simulations, 4),
+        },
+    }
@@ -0,0 +1,218 @@
+"""Price Cache Module.
+
+This module provides a thread-safe, in-memory cache for current quotes, daily
+closing prices and crypto symbol lookups. The stock and crypto tools read
+through it, and the background refresher keeps popular symbols warm in it.
+Completed daily closes are also persisted to the on-disk price store.
+"""
+
+import sys
+import threading
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from tools.price_store import PriceStore, merge_closes
+from utils.config_types import PriceCacheConfigs
+from utils.logging_setup import setup_logging
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+
+# Set up logging at module level
+logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
+logger.info("Logging initialized for price_cache.py")
+
+SeriesKey = tuple[str, str, str]
+
+
+def _series_key(asset_class: str, symbol: str, currency: str) -> SeriesKey:
+    """Build the cache key for one asset priced in one currency."""
+    return asset_class, symbol.upper(), currency.lower()
+
+
+def _today() -> pd.Timestamp:
+    """Return today's date (UTC) as a naive, normalized timestamp."""
+    return pd.Timestamp(datetime.now(tz=UTC).date())
+
+
+class PriceCache:
+    """Thread-safe cache for quotes, daily closes and crypto symbol lookups.
+
+    Daily closes are stored per calendar day. Days inside a cached range
+    without a trading bar are stored as NaN, so a range is known to be fully
+    cached when every calendar day in it is present. Today's bar is still
+    moving, so ranges that include today are only served while the last
+    write for that series is younger than the quote TTL.
+
+    When a store is given, a series is loaded from it the first time it is
+    requested, and closes of completed days are written back to it.
+    """
+
+    def __init__(
+        self, quote_ttl_seconds: float, store: PriceStore | None = None,
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            quote_ttl_seconds: Seconds a quote (or today's bar) stays fresh.
+            store: Optional on-disk store backing the daily closes.
+
+        """
+        self.quote_ttl_seconds = quote_ttl_seconds
+        self.store = store
+        self._lock = threading.Lock()
+        self._loaded_from_store: set[SeriesKey] = set()
+        self._quotes: dict[SeriesKey, tuple[float, float]] = {}
+        self._closes: dict[SeriesKey, pd.Series] = {}
+        self._live_bar_written_at: dict[SeriesKey, float] = {}
+        self._symbols: dict[str, str] = {}
+
+    def get_quote(
+        self, asset_class: str, symbol: str, currency: str = "usd",
+    ) -> float | None:
+        """Return a cached quote, or None if it is missing or stale."""
+        key = _series_key(asset_class, symbol, currency)
+        with self._lock:
+            entry = self._quotes.get(key)
+        if entry is None:
+            return None
+        price, written_at = entry
+        if time.monotonic() - written_at > self.quote_ttl_seconds:
+            return None
+        return price
+
+    def set_quote(
+        self, asset_class: str, symbol: str, price: float, currency: str = "usd",
+    ) -> None:
+        """Store the current quote for a symbol."""
+        key = _series_key(asset_class, symbol, currency)
+        with self._lock:
+            self._quotes[key] = (float(price), time.monotonic())
+
+    def get_daily_closes(
+        self,
+        asset_class: str,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        currency: str = "usd",
+    ) -> pd.Series | None:
+        """Return cached closes for an inclusive date range.
+
+        Args:
+            asset_class: Either 'stock' or 'crypto'.
+            symbol: Ticker or crypto symbol.
+            start_date: First day of the range ('YYYY-MM-DD').
+            end_date: Last day of the range ('YYYY-MM-DD').
+            currency: Quote currency.
+
+        Returns:
+            pd.Series | None: Closes indexed by date with non-trading days
+            dropped, or None if any day of the range is not cached.
+
+        """
+        key = _series_key(asset_class, symbol, currency)
+        days = pd.date_range(start_date, end_date, freq="D")
+        self._load_from_store(key)
+        with self._lock:
+            closes = self._closes.get(key)
+            live_written_at = self._live_bar_written_at.get(key)
+        if closes is None or days.empty or not days.isin(closes.index).all():
+            return None
+        if days[-1] >= _today() and (
+            live_written_at is None
+            or time.monotonic() - live_written_at > self.quote_ttl_seconds
+        ):
+            return None
+        return closes.loc[days[0] : days[-1]].dropna()
+
+    def get_daily_close(
+        self, asset_class: str, symbol: str, date: str, currency: str = "usd",
+    ) -> float | None:
+        """Return the cached close for a single day, or None if unavailable."""
+        closes = self.get_daily_closes(asset_class, symbol, date, date, currency)
+        if closes is None or closes.empty:
+            return None
+        return float(closes.iloc[-1])
+
+    def set_daily_closes(  # noqa: PLR0913
+        self,
+        asset_class: str,
+        symbol: str,
+        closes: pd.Series,
+        start_date: str,
+        end_date: str,
+        *,
+        currency: str = "usd",
+    ) -> None:
+        """Store closes and mark every day of the inclusive range as cached.
+
+        Args:
+            asset_class: Either 'stock' or 'crypto'.
+            symbol: Ticker or crypto symbol.
+            closes: Closing prices indexed by (possibly tz-aware) timestamps.
+            start_date: First day the fetch covered ('YYYY-MM-DD').
+            end_date: Last day the fetch covered ('YYYY-MM-DD').
+            currency: Quote currency.
+
+        """
+        key = _series_key(asset_class, symbol, currency)
+        index = pd.DatetimeIndex(closes.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        days = pd.date_range(start_date, end_date, freq="D")
+        if days.empty:
+            return
+        fetched = pd.Series(closes.to_numpy(dtype=float), index=index.normalize())
+        fetched = fetched[~fetched.index.duplicated(keep="last")].reindex(days)
+        self._load_from_store(key)
+        with self._lock:
+            self._closes[key] = merge_closes(self._closes.get(key), fetched)
+            if days[-1] >= _today():
+                self._live_bar_written_at[key] = time.monotonic()
+
+        completed = fetched[fetched.index < _today()]
+        if self.store is not None and not completed.empty:
+            self.store.write(asset_class, symbol, completed, currency)
+
+    def _load_from_store(self, key: SeriesKey) -> None:
+        """Merge the stored series for a key into memory, once per key."""
+        if self.store is None:
+            return
+        with self._lock:
+            if key in self._loaded_from_store:
+                return
+            self._loaded_from_store.add(key)
+        stored = self.store.read(*key)
+        if stored is None:
+            return
+        with self._lock:
+            # Values already in memory are at least as fresh as the stored ones.
+            in_memory = self._closes.get(key)
+            self._closes[key] = (
+                stored if in_memory is None else merge_closes(stored, in_memory)
+            )
+
+    def get_symbol(self, crypto_name: str) -> str | None:
+        """Return the cached symbol for a crypto name, if it was looked up."""
+        with self._lock:
+            return self._symbols.get(crypto_name.strip().lower())
+
+    def set_symbol(self, crypto_name: str, symbol: str) -> None:
+        """Remember the symbol a crypto name resolved to."""
+        with self._lock:
+            self._symbols[crypto_name.strip().lower()] = symbol
+
+
+price_cache_configs = PriceCacheConfigs.load_from_path(str(DEFAULT_CONFIG_PATH))
+price_cache = PriceCache(
+    price_cache_configs.quote_ttl_seconds,
+    PriceStore(PROJECT_ROOT / price_cache_configs.store_dir),
+)
@@ -0,0 +1,229 @@
+"""Price Provider Module.
+
+This module defines the providers that bulk jobs (such as the historical
+backfill) fetch daily closing prices from: the live yfinance/CryptoCompare
+APIs, a recorded-fixture provider for offline runs, and a recording wrapper
+that captures live responses as fixtures.
+"""
+
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Protocol
+
+import pandas as pd
+import requests
+from loguru import logger
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from tools.price_store import PriceStore
+from tools.stock_history import fetch_stock_history
+from utils.config_types import UpstreamConfigs
+from utils.http_client import http_session
+from utils.logging_setup import setup_logging
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+DEFAULT_FIXTURE_DIR = PROJECT_ROOT / "data" / "fixtures" / "prices"
+CRYPTOCOMPARE_MAX_BARS = 2000
+SECONDS_PER_DAY = 86400
+upstream_configs = UpstreamConfigs.load_from_path(str(DEFAULT_CONFIG_PATH))
+
+# Set up logging at module level
+logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
+logger.info("Logging initialized for price_providers.py")
+
+
+class PriceProvider(Protocol):
+    """Source of daily closing prices."""
+
+    def fetch_daily_closes(
+        self,
+        asset_class: str,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        currency: str = "usd",
+    ) -> pd.Series:
+        """Return closes for trading days in an inclusive date range.
+
+        Raises:
+            ValueError: If the data cannot be fetched.
+
+        """
+        ...
+
+
+def _normalize_index(closes: pd.Series) -> pd.Series:
+    """Index closes by naive, normalized calendar day."""
+    index = pd.DatetimeIndex(closes.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return pd.Series(closes.to_numpy(dtype=float), index=index.normalize())
+
+
+class LiveProvider:
+    """Fetch closes from yfinance (stocks) and CryptoCompare (crypto)."""
+
+    def fetch_daily_closes(
+        self,
+        asset_class: str,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        currency: str = "usd",
+    ) -> pd.Series:
+        """Return closes for trading days in an inclusive date range.
+
+        Raises:
+            ValueError: If the data cannot be fetched.
+
+        """
+        if asset_class == "crypto":
+            return self._fetch_crypto(symbol, start_date, end_date, currency)
+        return self._fetch_stock(symbol, start_date, end_date)
+
+    @staticmethod
+    def _fetch_stock(symbol: str, start_date: str, end_date: str) -> pd.Series:
+        """Fetch stock closes; yfinance treats the end date as exclusive."""
+        exclusive_end = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+        try:
+            hist = fetch_stock_history(
+                symbol, start=start_date, end=exclusive_end.strftime("%Y-%m-%d"),
+            )
+        except Exception as e:
+            error_message = f"Error fetching stock history for {symbol}: {e}"
+            logger.error(error_message)
+            raise ValueError(error_message) from e
+
+        if hist.empty:
+            error_message = (
+                f"No historical data for {symbol} between {start_date} and {end_date}"
+            )
+            raise ValueError(error_message)
+        return _normalize_index(hist["Close"])
+
+    @staticmethod
+    def _fetch_crypto(
+        symbol: str, start_date: str, end_date: str, currency: str,
+    ) -> pd.Series:
+        """Fetch crypto closes from CryptoCompare, paging back from the end date."""
+        start_ts = int(
+            datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=UTC).timestamp(),
+        )
+        to_ts = int(
+            datetime.strptime(end_date, "%Y-%m-%d").replace(tzinfo=UTC).timestamp(),
+        )
+        bars: list[dict] = []
+        try:
+            while to_ts >= start_ts:
+                days_left = (to_ts - start_ts) // SECONDS_PER_DAY
+                limit = min(CRYPTOCOMPARE_MAX_BARS, days_left)
+                url = (
+                    f"{upstream_configs.cryptocompare_url}/data/v2/histoday?"
+                    f"fsym={symbol.upper()}&tsym={currency.upper()}"
+                    f"&limit={limit}&toTs={to_ts}"
+                )
+                response = http_session.get(url, timeout=30)
+                response.raise_for_status()
+                page = response.json().get("Data", {}).get("Data", [])
+                if not page:
+                    break
+                bars = page + bars
+                to_ts = page[0]["time"] - SECONDS_PER_DAY
+        except requests.RequestException as e:
+            error_message = f"Error fetching crypto history for {symbol}: {e}"
+            logger.error(error_message)
+            raise ValueError(error_message) from e
+
+        bars = [bar for bar in bars if bar["time"] >= start_ts and bar["close"] > 0]
+        if not bars:
+            error_message = (
+                f"No historical data for {symbol} between {start_date} and {end_date}"
+            )
+            raise ValueError(error_message)
+        return pd.Series(
+            [bar["close"] for bar in bars],
+            index=pd.to_datetime([bar["time"] for bar in bars], unit="s"),
+        )
+
+
+class FixtureProvider:
+    """Serve closes from recorded fixture files, for offline runs."""
+
+    def __init__(self, fixture_dir: Path = DEFAULT_FIXTURE_DIR) -> None:
+        """Initialize the provider.
+
+        Args:
+            fixture_dir: Directory laid out like the price store.
+
+        """
+        self.fixtures = PriceStore(fixture_dir)
+
+    def fetch_daily_closes(
+        self,
+        asset_class: str,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        currency: str = "usd",
+    ) -> pd.Series:
+        """Return recorded closes for trading days in an inclusive date range.
+
+        Raises:
+            ValueError: If no fixture covers the symbol and range.
+
+        """
+        closes = self.fixtures.read(
+            asset_class, symbol, currency, start_date=start_date, end_date=end_date,
+        )
+        if closes is not None:
+            closes = closes.dropna()
+        if closes is None or closes.empty:
+            error_message = (
+                f"No fixture data for {symbol} between {start_date} and {end_date}"
+            )
+            raise ValueError(error_message)
+        return closes
+
+
+class RecordingProvider:
+    """Wrap a provider and record everything it returns as fixtures."""
+
+    def __init__(self, provider: PriceProvider, fixture_dir: Path) -> None:
+        """Initialize the recorder.
+
+        Args:
+            provider: Provider to fetch from.
+            fixture_dir: Directory the fixtures are written to.
+
+        """
+        self.provider = provider
+        self.fixtures = PriceStore(fixture_dir)
+
+    def fetch_daily_closes(
+        self,
+        asset_class: str,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        currency: str = "usd",
+    ) -> pd.Series:
+        """Fetch closes from the wrapped provider and record them.
+
+        Raises:
+            ValueError: If the wrapped provider fails.
+
+        """
+        closes = self.provider.fetch_daily_closes(
+            asset_class, symbol, start_date, end_date, currency,
+        )
+        self.fixtures.write(
+            asset_class,
+            symbol,
+            closes.reindex(pd.date_range(start_date, end_date, freq="D")),
+            currency,
+        )
+        return closes
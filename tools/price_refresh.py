@@ -0,0 +1,203 @@
+"""Background Price Refresh Module.
+
+This module keeps a configurable watchlist of stock and crypto symbols warm in
+the price cache, so user queries for those symbols never wait on the network.
+"""
+
+import secrets
+import sys
+import threading
+import time
+from pathlib import Path
+
+from loguru import logger
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from tools.crypto_tools import (
+    is_crypto_symbol,
+    lookup_crypto_symbol,
+    refresh_crypto_quote,
+)
+from tools.price_cache import price_cache
+from tools.stock_tools import refresh_stock_quote
+from utils.config_types import PriceRefreshConfigs
+from utils.logging_setup import setup_logging
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+SECONDS_PER_MINUTE = 60
+
+# Set up logging at module level
+logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
+logger.info("Logging initialized for price_refresh.py")
+
+
+class RateLimiter:
+    """Token bucket limiting calls to a provider to a number per minute."""
+
+    def __init__(self, requests_per_minute: int) -> None:
+        """Initialize a full bucket.
+
+        Args:
+            requests_per_minute: Sustained number of calls allowed per minute.
+
+        """
+        self.capacity = max(1, requests_per_minute)
+        self.refill_rate = self.capacity / SECONDS_PER_MINUTE
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, stop_event: threading.Event | None = None) -> bool:
+        """Block until a call is allowed.
+
+        Args:
+            stop_event: Optional event that aborts the wait when set.
+
+        Returns:
+            bool: True if a token was taken, False if the wait was aborted.
+
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated_at) * self.refill_rate,
+                )
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait_seconds = (1 - self._tokens) / self.refill_rate
+            if stop_event is None:
+                time.sleep(wait_seconds)
+            elif stop_event.wait(wait_seconds):
+                return False
+
+
+class PriceRefreshScheduler:
+    """Daemon thread refreshing watchlist quotes and daily bars on an interval."""
+
+    def __init__(self, configs: PriceRefreshConfigs) -> None:
+        """Initialize the scheduler without starting it.
+
+        Args:
+            configs: Watchlists, interval, jitter and provider rate limits.
+
+        """
+        self.configs = configs
+        self.stock_limiter = RateLimiter(configs.stock_requests_per_minute)
+        self.crypto_limiter = RateLimiter(configs.crypto_requests_per_minute)
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._random = secrets.SystemRandom()
+
+    def start(self) -> None:
+        """Start refreshing in a background daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="price-refresh", daemon=True,
+        )
+        self._thread.start()
+        logger.info(
+            f"Price refresh started for {len(self.configs.stock_watchlist)} stocks "
+            f"and {len(self.configs.crypto_watchlist)} cryptocurrencies",
+        )
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Signal the refresh thread to stop and wait for it to exit."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+        logger.info("Price refresh stopped")
+
+    def refresh_once(self) -> None:
+        """Refresh every watchlist symbol once, respecting the rate limits.
+
+        Each stock refresh is one provider call; each crypto refresh is two
+        (current price and latest daily bars), plus a CoinGecko search while
+        the name has not been resolved to a symbol.
+        """
+        for symbol in self.configs.stock_watchlist:
+            if not self.stock_limiter.acquire(self._stop_event):
+                return
+            try:
+                refresh_stock_quote(symbol)
+            except ValueError as e:
+                logger.warning(f"Price refresh failed for stock {symbol}: {e}")
+
+        for crypto_id in self.configs.crypto_watchlist:
+            crypto_symbol = self._crypto_symbol(crypto_id)
+            if not (
+                crypto_symbol
+                and self.crypto_limiter.acquire(self._stop_event)
+                and self.crypto_limiter.acquire(self._stop_event)
+            ):
+                return
+            try:
+                refresh_crypto_quote(crypto_symbol, self.configs.vs_currency)
+            except ValueError as e:
+                logger.warning(f"Price refresh failed for crypto {crypto_id}: {e}")
+
+    def _crypto_symbol(self, crypto_id: str) -> str | None:
+        """Resolve a watchlist name to its symbol; None if stopped while waiting.
+
+        Resolved names are cached by the price cache, so only names that are
+        not yet resolved take a rate-limit token for the search.
+        """
+        cached_symbol = price_cache.get_symbol(crypto_id)
+        if cached_symbol or is_crypto_symbol(crypto_id):
+            return cached_symbol or crypto_id
+        if not self.crypto_limiter.acquire(self._stop_event):
+            return None
+        return lookup_crypto_symbol(crypto_id) or crypto_id
+
+    def next_delay(self) -> float:
+        """Return the delay before the next round, with random jitter applied."""
+        jitter = self._random.uniform(
+            -self.configs.jitter_seconds, self.configs.jitter_seconds,
+        )
+        return max(0.0, self.configs.interval_seconds + jitter)
+
+    def _run(self) -> None:
+        """Refresh in a loop until stopped."""
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            self.refresh_once()
+            logger.debug(
+                f"Price refresh round took {time.monotonic() - started:.2f}s",
+            )
+            self._stop_event.wait(self.next_delay())
+
+
+def start_price_refresh(
+    config_path: str = str(DEFAULT_CONFIG_PATH),
+) -> PriceRefreshScheduler | None:
+    """Start the background price refresh if it is enabled in the config.
+
+    Args:
+        config_path (str): Path to the TOML configuration file.
+
+    Returns:
+        PriceRefreshScheduler | None: The running scheduler, or None if disabled.
+
+    """
+    configs = PriceRefreshConfigs.load_from_path(config_path)
+    if not configs.enabled:
+        logger.info("Price refresh disabled in config")
+        return None
+    scheduler = PriceRefreshScheduler(configs)
+    scheduler.start()
+    return scheduler
+
+
+if __name__ == "__main__":
+    refresh_scheduler = PriceRefreshScheduler(
+        PriceRefreshConfigs.load_from_path(str(DEFAULT_CONFIG_PATH)),
+    )
+    refresh_scheduler.refresh_once()
@@ -0,0 +1,175 @@
+"""Price Store Module.
+
+This module persists daily closing prices to disk, one year-partitioned
+Parquet dataset per asset, so price history survives restarts and can be
+pre-populated by the backfill CLI. Reads for a date range only open the
+partitions of the years it spans. Days that were fetched but had no trading
+bar are stored with an empty close, which lets readers tell "no trading" apart
+from "not fetched". Writes to an asset are serialized with a lock file, so
+API threads, the refresh thread and the backfill CLI never lose each other's
+days.
+"""
+
+import fcntl
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+from loguru import logger
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from tools.columnar_store import PARTITION_COLUMN, read_partitioned, write_partitioned
+from utils.logging_setup import setup_logging
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+
+# Set up logging at module level
+logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
+logger.info("Logging initialized for price_store.py")
+
+
+def merge_closes(existing: pd.Series | None, fetched: pd.Series) -> pd.Series:
+    """Merge two calendar-day close series, preferring the fetched values."""
+    if existing is None or existing.empty:
+        return fetched.sort_index()
+    return pd.concat(
+        [existing[~existing.index.isin(fetched.index)], fetched],
+    ).sort_index()
+
+
+@contextmanager
+def _write_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on a dataset, shared by threads and processes."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with (path.parent / f"{path.name}.lock").open("a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class PriceStore:
+    """On-disk store of daily closes, one Parquet dataset per asset and currency."""
+
+    def __init__(self, root: Path) -> None:
+        """Initialize the store.
+
+        Args:
+            root: Directory holding one sub-directory per asset class.
+
+        """
+        self.root = root
+
+    def path_for(self, asset_class: str, symbol: str, currency: str = "usd") -> Path:
+        """Return the dataset directory holding the closes of one asset."""
+        return self.root / asset_class / f"{symbol.upper()}-{currency.lower()}"
+
+    def read(
+        self,
+        asset_class: str,
+        symbol: str,
+        currency: str = "usd",
+        start_date: str | None = None,
+        end_date: str | None = None,
+    ) -> pd.Series | None:
+        """Read the stored closes of one asset.
+
+        Args:
+            asset_class: Either 'stock' or 'crypto'.
+            symbol: Ticker or crypto symbol.
+            currency: Quote currency.
+            start_date: Optional first day to read (YYYY-MM-DD).
+            end_date: Optional last day to read (YYYY-MM-DD).
+
+        Returns:
+            pd.Series | None: Closes indexed by calendar day (NaN for days
+            without trading), or None if nothing is stored.
+
+        """
+        path = self.path_for(asset_class, symbol, currency)
+        if not path.exists():
+            return None
+        filters = []
+        if start_date is not None:
+            filters.append((PARTITION_COLUMN, ">=", pd.Timestamp(start_date).year))
+        if end_date is not None:
+            filters.append((PARTITION_COLUMN, "<=", pd.Timestamp(end_date).year))
+        stored = read_partitioned(path, columns=["date", "close"], filters=filters)
+        closes = stored.set_index(pd.DatetimeIndex(stored["date"]))["close"]
+        return closes.rename_axis("date").sort_index().loc[start_date:end_date]
+
+    def write(
+        self,
+        asset_class: str,
+        symbol: str,
+        closes: pd.Series,
+        currency: str = "usd",
+    ) -> None:
+        """Merge closes into the stored series of one asset.
+
+        The read-merge-write runs under a per-asset lock file, and is skipped
+        when the closes add nothing to what is stored. Only the year
+        partitions the new closes fall into are rewritten, each replaced
+        atomically, so concurrent readers never see a partial file.
+
+        Args:
+            asset_class: Either 'stock' or 'crypto'.
+            symbol: Ticker or crypto symbol.
+            closes: Closes indexed by calendar day (NaN for days without trading).
+            currency: Quote currency.
+
+        """
+        if closes.empty:
+            return
+        path = self.path_for(asset_class, symbol, currency)
+        index = pd.DatetimeIndex(closes.index)
+        with _write_lock(path):
+            existing = self.read(
+                asset_class,
+                symbol,
+                currency,
+                start_date=f"{index.min().year}-01-01",
+                end_date=f"{index.max().year}-12-31",
+            )
+            merged = merge_closes(existing, closes.set_axis(index))
+            if existing is not None and merged.equals(existing):
+                return
+            frame = pd.DataFrame(
+                {
+                    "date": merged.index,
+                    "close": merged.to_numpy(dtype="float64"),
+                    PARTITION_COLUMN: merged.index.year,
+                },
+            )
+            write_partitioned(frame, path)
+        logger.debug(f"Stored {len(closes)} daily closes for {symbol} in {path}")
+
+    def convert_csv_files(self) -> dict[str, Any]:
+        """Migrate CSV files left by the previous store layout to Parquet.
+
+        The CSV files are left in place; converting again only re-merges them.
+
+        Returns:
+            dict[str, Any]: Number of files converted and their paths.
+
+        """
+        converted = []
+        for csv_path in sorted(self.root.glob("*/*.csv")):
+            symbol, _, currency = csv_path.stem.rpartition("-")
+            stored = pd.read_csv(
+                csv_path,
+                index_col="date",
+                parse_dates=["date"],
+                dtype={"close": "float64"},
+            )
+            self.write(csv_path.parent.name, symbol, stored["close"], currency)
+            converted.append(str(csv_path))
+        logger.info(f"Converted {len(converted)} price CSV files in {self.root}")
+        return {"converted": len(converted), "files": converted}
@@ -0,0 +1,327 @@
+"""Spending Analytics Module.
+
+This module computes month-over-month and year-over-year changes, rolling
+averages, per-category seasonality and anomaly flags from the spending cube.
+The cube is unrolled once into a (month x category) matrix covering every
+month from the first to the last one with spending, and each metric is a
+single array operation over all categories (plus their total) at once.
+"""
+
+import sys
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+from loguru import logger
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from tools.spending_cache import spending_cache
+from tools.spending_cube import MONTH_NAMES, MONTHS_PER_YEAR, SpendingCube
+from tools.tenant_store import tenant_cache
+from utils.logging_setup import setup_logging
+from utils.models import SpendingAnomaliesInput, SpendingTrendsInput
+from utils.structured_logging import log_event
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+DEFAULT_SPENDING_DATA = PROJECT_ROOT / "data" / "combined_spending_data.csv"
+TOTAL = "Total"
+DEFAULT_THRESHOLDS = {"zscore": 2.5, "iqr": 1.5}
+
+# Set up logging at module level
+logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
+logger.info("Logging initialized for spending_analytics.py")
+
+
+class MonthlySpending(NamedTuple):
+    """Spending per calendar month and category, with a trailing total column."""
+
+    years: np.ndarray
+    months: np.ndarray
+    columns: list[str]
+    amounts: np.ndarray
+
+
+def monthly_spending(cube: SpendingCube) -> MonthlySpending:
+    """Unroll a cube into consecutive months, from the first to the last active one.
+
+    Years missing from the cube are filled with zero spending, so row ``t - 1``
+    is always the previous calendar month and ``t - 12`` the same month a year
+    earlier.
+
+    Returns:
+        MonthlySpending: Amounts of shape (months, categories + 1); the last
+        column is the total over all categories.
+
+    Raises:
+        ValueError: If the cube has no spending at all.
+
+    """
+    if not cube.years:
+        error_message = "No spending data to analyse"
+        raise ValueError(error_message)
+    n_categories = len(cube.categories)
+    first_year = cube.years[0]
+    n_years = cube.years[-1] - first_year + 1
+    amounts = np.zeros((n_years, MONTHS_PER_YEAR, n_categories))
+    counts = np.zeros((n_years, MONTHS_PER_YEAR, n_categories), dtype=np.int64)
+    year_positions = np.asarray(cube.years) - first_year
+    amounts[year_positions] = cube.amounts
+    counts[year_positions] = cube.counts
+
+    amounts = amounts.reshape(-1, n_categories)
+    active = np.flatnonzero(counts.reshape(-1, n_categories).sum(axis=1))
+    if active.size == 0:
+        error_message = "No spending data to analyse"
+        raise ValueError(error_message)
+    rows = np.arange(active[0], active[-1] + 1)
+    return MonthlySpending(
+        years=first_year + rows // MONTHS_PER_YEAR,
+        months=rows % MONTHS_PER_YEAR,
+        columns=[*cube.categories, TOTAL],
+        amounts=np.column_stack([amounts[rows], amounts[rows].sum(axis=1)]),
+    )
+
+
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    """Shift rows down by ``periods``, filling the first rows with NaN."""
+    shifted = np.full_like(values, np.nan)
+    if periods < len(values):
+        shifted[periods:] = values[:-periods]
+    return shifted
+
+
+def _percent_change(current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """Return the percentage change, NaN where the previous value is not positive."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(previous > 0, (current - previous) / previous * 100, np.nan)
+
+
+def trend_metrics(amounts: np.ndarray, window: int) -> dict[str, np.ndarray]:
+    """Compute change and rolling-average metrics for every column at once.
+
+    Args:
+        amounts: Monthly amounts of shape (months, columns).
+        window: Months in the trailing rolling average.
+
+    Returns:
+        dict[str, np.ndarray]: Arrays shaped like ``amounts``; NaN where the
+        metric needs months before the start of the data.
+
+    """
+    previous_month = _shift(amounts, 1)
+    previous_year = _shift(amounts, MONTHS_PER_YEAR)
+    cumulative = np.vstack([np.zeros((1, amounts.shape[1])), amounts.cumsum(axis=0)])
+    rolling = np.full_like(amounts, np.nan)
+    rolling[window - 1 :] = (cumulative[window:] - cumulative[:-window]) / window
+    return {
+        "mom_change": amounts - previous_month,
+        "mom_pct": _percent_change(amounts, previous_month),
+        "yoy_change": amounts - previous_year,
+        "yoy_pct": _percent_change(amounts, previous_year),
+        "rolling_avg": rolling,
+    }
+
+
+def seasonal_index(spending: MonthlySpending) -> np.ndarray:
+    """Return each calendar month's average spend relative to the overall average.
+
+    Returns:
+        np.ndarray: Shape (12, columns); 1.2 means the month runs 20% above
+        the column's average month, NaN where a column never has spending.
+
+    """
+    one_hot = np.eye(MONTHS_PER_YEAR)[spending.months]
+    overall = spending.amounts.mean(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Calendar months missing from the history divide by zero here.
+        month_means = (one_hot.T @ spending.amounts) / one_hot.sum(axis=0)[:, None]
+        return np.where(overall > 0, month_means / overall, np.nan)
+
+
+def anomaly_scores(
+    amounts: np.ndarray, method: str,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Score every month of every column against the column's distribution.
+
+    Args:
+        amounts: Monthly amounts of shape (months, columns).
+        method: 'zscore' (distance from the mean in standard deviations) or
+            'iqr' (distance beyond the quartiles in interquartile ranges).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Signed scores shaped like ``amounts``
+        (positive for spikes) and the expected amount per column.
+
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if method == "zscore":
+            expected = amounts.mean(axis=0)
+            spread = amounts.std(axis=0)
+            scores = (amounts - expected) / spread
+        else:
+            q1, expected, q3 = np.percentile(amounts, [25, 50, 75], axis=0)
+            spread = q3 - q1
+            scores = (
+                np.maximum(amounts - q3, 0) - np.maximum(q1 - amounts, 0)
+            ) / spread
+    return np.where(spread > 0, scores, 0.0), expected
+
+
+def _round(value: float) -> float | None:
+    """Round a metric for output, mapping NaN to None."""
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+def _column_index(spending: MonthlySpending, category: str | None) -> int:
+    """Return the column of a category (case-insensitive), or of the total."""
+    if category is None:
+        return len(spending.columns) - 1
+    lookup = {column.lower(): i for i, column in enumerate(spending.columns[:-1])}
+    if category.lower() not in lookup:
+        error_message = f"No spending data for category {category}"
+        raise ValueError(error_message)
+    return lookup[category.lower()]
+
+
+def row_mask(spending: MonthlySpending, year: int | None) -> np.ndarray:
+    """Return the rows of a year (all rows if None)."""
+    if year is None:
+        return np.ones(len(spending.years), dtype=bool)
+    mask = spending.years == year
+    if not mask.any():
+        error_message = f"No spending data for year {year}"
+        raise ValueError(error_message)
+    return mask
+
+
+def _period(spending: MonthlySpending, row: int) -> str:
+    """Return a 'YYYY-MM' label for a row."""
+    return f"{spending.years[row]}-{spending.months[row] + 1:02d}"
+
+
+def load_monthly_spending(
+    data_source: str | None, tenant_id: str | None,
+) -> MonthlySpending:
+    """Return the monthly spending of a tenant or data source via the caches.
+
+    Raises:
+        ValueError: If the source has no periods to analyse.
+
+    """
+    if tenant_id:
+        return monthly_spending(tenant_cache.get_cube(tenant_id))
+    try:
+        cube = spending_cache.get_cube(data_source or DEFAULT_SPENDING_DATA)
+    except OSError as e:
+        error_message = f"Error reading spending data: {e}"
+        logger.error(error_message)
+        raise ValueError(error_message) from e
+    if cube is None:
+        error_message = "Spending data has no 'year' and 'month' columns to analyse"
+        raise ValueError(error_message)
+    return monthly_spending(cube)
+
+
+def get_spending_trends(input_data: SpendingTrendsInput) -> dict[str, Any]:
+    """Report monthly spending with its changes, rolling average and seasonality.
+
+    Changes are computed over the whole history, so January of the requested
+    year is still compared with the December before it.
+
+    Args:
+        input_data: Validated input data using Pydantic.
+
+    Returns:
+        dict: One entry per month (amount, month-over-month and year-over-year
+        change, rolling average) and the seasonal index per calendar month.
+
+    Raises:
+        ValueError: If the data is invalid or the year/category is unknown.
+
+    """
+    log_event("tool.call", tool="get_spending_trends", input=input_data)
+    spending = load_monthly_spending(
+        input_data.data_source, input_data.tenant_id,
+    )
+    column = _column_index(spending, input_data.category)
+    rows = np.flatnonzero(row_mask(spending, input_data.year))
+    metrics = trend_metrics(spending.amounts, input_data.window)
+    seasonality = seasonal_index(spending)[:, column]
+
+    periods = [
+        {
+            "period": _period(spending, row),
+            "amount": _round(spending.amounts[row, column]),
+            **{name: _round(values[row, column]) for name, values in metrics.items()},
+        }
+        for row in rows
+    ]
+    return {
+        "category": spending.columns[column],
+        "year": input_data.year,
+        "window": input_data.window,
+        "periods": periods,
+        "seasonality": {
+            month: _round(index)
+            for month, index in zip(MONTH_NAMES, seasonality, strict=True)
+        },
+    }
+
+
+def get_spending_anomalies(input_data: SpendingAnomaliesInput) -> dict[str, Any]:
+    """Flag months whose spending in a category is unusually high or low.
+
+    Each category is scored against its own monthly history; the requested
+    year and category only restrict which flags are returned.
+
+    Args:
+        input_data: Validated input data using Pydantic.
+
+    Returns:
+        dict: The flagged months, strongest first, with the amount, expected
+        amount and score of each.
+
+    Raises:
+        ValueError: If the data is invalid or the year/category is unknown.
+
+    """
+    log_event("tool.call", tool="get_spending_anomalies", input=input_data)
+    spending = load_monthly_spending(
+        input_data.data_source, input_data.tenant_id,
+    )
+    threshold = input_data.threshold or DEFAULT_THRESHOLDS[input_data.method]
+    scores, expected = anomaly_scores(spending.amounts, input_data.method)
+
+    flagged = np.abs(scores) > threshold
+    flagged &= row_mask(spending, input_data.year)[:, None]
+    if input_data.category is not None:
+        column_mask = np.zeros(len(spending.columns), dtype=bool)
+        column_mask[_column_index(spending, input_data.category)] = True
+        flagged &= column_mask
+    rows, columns = np.nonzero(flagged)
+    order = np.argsort(-np.abs(scores[rows, columns]), kind="stable")
+    order = order[: input_data.limit]
+
+    anomalies = [
+        {
+            "period": _period(spending, row),
+            "category": spending.columns[column],
+            "amount": _round(spending.amounts[row, column]),
+            "expected": _round(expected[column]),
+            "score": _round(scores[row, column]),
+            "direction": "spike" if scores[row, column] > 0 else "drop",
+        }
+        for row, column in zip(rows[order], columns[order], strict=True)
+    ]
+    log_event(
+        "tool.result", tool="get_spending_anomalies", flagged=int(flagged.sum()),
+    )
+    return {
+        "method": input_data.method,
+        "threshold": threshold,
+        "total_flagged": int(flagged.sum()),
+        "anomalies": anomalies,
+    }
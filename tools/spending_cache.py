@@ -0,0 +1,228 @@
+"""Spending Data Cache Module.
+
+This module keeps parsed spending files in memory for the whole process, so
+repeated spending questions do not re-read and re-parse the CSV. Categories
+and months are stored as categorical dtypes and amounts as float64, and an
+entry is reloaded as soon as its file's modification time or size changes.
+Files with periods ('year'/'month' or 'date' columns) also get a pre-aggregated
+spending cube built once at load. Files above the streaming threshold are
+never loaded whole: they are ingested in chunks into persisted aggregates, and
+the cube is built from those. Parquet datasets (see ``columnar_store``) are
+aggregated inside Arrow and only read in full when a caller needs the rows.
+"""
+
+import sys
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+import pandas as pd
+from loguru import logger
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from tools.columnar_store import (
+    aggregate_spending_dataset,
+    dataset_fingerprint,
+    is_columnar,
+    load_spending_dataset,
+)
+from tools.spending_cube import MONTH_DTYPE, SpendingCube
+from tools.spending_ingest import (
+    Fingerprint,
+    add_periods,
+    file_fingerprint,
+    load_aggregates,
+    save_aggregates,
+    spending_configs,
+    stream_aggregates,
+)
+from utils.logging_setup import setup_logging
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+SPENDING_DTYPES = {
+    "category": "category",
+    "amount": "float64",
+    "year": "int16",
+    "month": MONTH_DTYPE,
+}
+BYTES_PER_MB = 1024 * 1024
+
+# Set up logging at module level
+logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
+logger.info("Logging initialized for spending_cache.py")
+
+
+class SpendingEntry(NamedTuple):
+    """A parsed spending file and the file state it was parsed from.
+
+    ``frame`` is None for files that were only ingested into aggregates.
+    """
+
+    fingerprint: Fingerprint
+    frame: pd.DataFrame | None
+    cube: SpendingCube | None
+
+
+def has_periods(columns: pd.Index) -> bool:
+    """Return whether spending rows can be assigned to a year and month."""
+    return {"year", "month"}.issubset(columns) or "date" in columns
+
+
+def freeze_frame(spending_df: pd.DataFrame) -> pd.DataFrame:
+    """Return a copy of a frame whose numeric columns are read-only arrays.
+
+    Writes through the returned frame (``.loc``, ``.values``) raise instead of
+    silently changing the copy every other request shares.
+    """
+    columns = {}
+    for column in spending_df.columns:
+        values = spending_df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            columns[column] = values.copy()
+        else:
+            array = values.to_numpy(copy=True)
+            array.flags.writeable = False
+            columns[column] = array
+    return pd.DataFrame(columns, copy=False)
+
+
+def load_spending_frame(path: Path) -> pd.DataFrame:
+    """Parse a spending CSV or Parquet dataset with compact dtypes.
+
+    Args:
+        path: CSV file with 'category' and 'amount' columns and, optionally,
+            'year' and 'month' columns or a 'date' column; or a Parquet
+            dataset written by ``columnar_store``.
+
+    Returns:
+        pd.DataFrame: Read-only frame with categorical 'category'/'month'.
+
+    Raises:
+        ValueError: If required columns are missing or amounts are not numeric.
+
+    """
+    if is_columnar(path):
+        return freeze_frame(load_spending_dataset(path))
+
+    header = pd.read_csv(path, nrows=0).columns
+    required_columns = {"category", "amount"}
+    if not required_columns.issubset(header):
+        error_message = "Spending data must contain 'category' and 'amount' columns"
+        raise ValueError(error_message)
+
+    dtypes = {
+        column: dtype for column, dtype in SPENDING_DTYPES.items() if column in header
+    }
+    try:
+        spending_df = pd.read_csv(path, dtype=dtypes)
+    except (TypeError, ValueError) as e:
+        error_message = f"'amount' column must contain numeric values: {e}"
+        raise ValueError(error_message) from e
+    if has_periods(header):
+        spending_df = add_periods(spending_df)
+    return freeze_frame(spending_df)
+
+
+class SpendingDataCache:
+    """Process-wide cache of parsed spending files.
+
+    Each entry is keyed by the resolved file path and remembers the file's
+    modification time and size; a lookup reloads the file when either changed.
+    The returned frames are shared by every caller and must not be mutated.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._lock = threading.Lock()
+        self._entries: dict[Path, SpendingEntry] = {}
+
+    def get_entry(self, data_source: str | Path) -> SpendingEntry:
+        """Return the cached entry for a file, loading it if needed.
+
+        Args:
+            data_source: Path to the spending CSV or Parquet dataset.
+
+        Returns:
+            SpendingEntry: Shared frame and, if the file has periods, its cube.
+
+        Raises:
+            OSError: If the file cannot be read.
+            ValueError: If the file is not valid spending data.
+
+        """
+        path = Path(data_source).resolve()
+        columnar = is_columnar(path)
+        fingerprint = dataset_fingerprint(path) if columnar else file_fingerprint(path)
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is not None and entry.fingerprint == fingerprint:
+            return entry
+
+        aggregates = None if columnar else load_aggregates(path)
+        if columnar:
+            logger.info(f"Aggregating spending dataset {path}")
+            entry = SpendingEntry(
+                fingerprint,
+                None,
+                SpendingCube.from_aggregates(aggregate_spending_dataset(path)),
+            )
+        elif aggregates is not None:
+            logger.info(f"Loading persisted spending aggregates for {path}")
+            entry = SpendingEntry(
+                fingerprint, None, SpendingCube.from_aggregates(aggregates),
+            )
+        elif fingerprint[1] > spending_configs.stream_threshold_mb * BYTES_PER_MB and (
+            has_periods(pd.read_csv(path, nrows=0).columns)
+        ):
+            logger.info(f"Streaming spending data from {path} into aggregates")
+            aggregates, _ = stream_aggregates(path, spending_configs.chunk_rows)
+            save_aggregates(path, aggregates, fingerprint)
+            entry = SpendingEntry(
+                fingerprint, None, SpendingCube.from_aggregates(aggregates),
+            )
+        else:
+            logger.info(f"Loading spending data from {path}")
+            spending_df = load_spending_frame(path)
+            cube = (
+                SpendingCube.from_frame(spending_df)
+                if {"year", "month"}.issubset(spending_df.columns)
+                else None
+            )
+            entry = SpendingEntry(fingerprint, spending_df, cube)
+
+        with self._lock:
+            self._entries[path] = entry
+        return entry
+
+    def get_frame(self, data_source: str | Path) -> pd.DataFrame:
+        """Return the shared, read-only spending frame for a file.
+
+        Files that were only ingested into aggregates are loaded in full here,
+        so prefer ``get_cube`` for anything an aggregate can answer.
+        """
+        entry = self.get_entry(data_source)
+        if entry.frame is not None:
+            return entry.frame
+        path = Path(data_source).resolve()
+        spending_df = load_spending_frame(path)
+        with self._lock:
+            self._entries[path] = entry._replace(frame=spending_df)
+        return spending_df
+
+    def get_cube(self, data_source: str | Path) -> SpendingCube | None:
+        """Return the spending cube for a file, or None if it has no periods."""
+        return self.get_entry(data_source).cube
+
+    def invalidate(self, data_source: str | Path | None = None) -> None:
+        """Drop one cached file, or every cached file if none is given."""
+        with self._lock:
+            if data_source is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(Path(data_source).resolve(), None)
+
+
+spending_cache = SpendingDataCache()
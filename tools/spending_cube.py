@@ -0,0 +1,159 @@
+"""Spending Cube Module.
+
+This module pre-aggregates spending rows into a dense year x month x category
+array, together with its year, month and overall marginals. Any breakdown
+slice is then answered by an indexed lookup whose cost depends only on the
+number of categories, not on how many rows or years of history there are.
+"""
+
+import calendar
+
+import numpy as np
+import pandas as pd
+
+MONTH_NAMES = list(calendar.month_name)[1:]
+MONTH_DTYPE = pd.CategoricalDtype(MONTH_NAMES, ordered=True)
+MONTHS_PER_YEAR = 12
+
+
+class SpendingCube:
+    """Summed amounts and row counts per year, month and category."""
+
+    def __init__(
+        self,
+        years: list[int],
+        categories: list[str],
+        amounts: np.ndarray,
+        counts: np.ndarray,
+    ) -> None:
+        """Initialize the cube and precompute its marginals.
+
+        Args:
+            years: Sorted years along the first axis.
+            categories: Categories along the last axis.
+            amounts: Summed amounts, shape (years, 12, categories).
+            counts: Row counts, same shape as ``amounts``.
+
+        """
+        self.years = years
+        self.categories = categories
+        self.amounts = amounts
+        self.counts = counts
+        self._year_index = {year: i for i, year in enumerate(years)}
+        self._category_index = {
+            category.lower(): i for i, category in enumerate(categories)
+        }
+        # Marginals, so every slice is a single lookup of at most one row per
+        # category: (year, month) -> cell, year -> by_year, month -> by_month.
+        self._by_year = (amounts.sum(axis=1), counts.sum(axis=1))
+        self._by_month = (amounts.sum(axis=0), counts.sum(axis=0))
+        self._total = (amounts.sum(axis=(0, 1)), counts.sum(axis=(0, 1)))
+
+    @classmethod
+    def from_frame(cls, spending_df: pd.DataFrame) -> "SpendingCube":
+        """Aggregate spending rows into a cube.
+
+        Args:
+            spending_df: Rows with 'category', 'amount', 'year' and 'month'
+                columns; 'month' holds month names. An optional 'count'
+                column gives the number of transactions each row stands for.
+
+        Returns:
+            SpendingCube: The aggregated cube.
+
+        """
+        years, year_codes = np.unique(
+            spending_df["year"].to_numpy(dtype=np.int64), return_inverse=True,
+        )
+        month_codes = (
+            spending_df["month"].astype(MONTH_DTYPE).cat.codes.to_numpy(np.int64)
+        )
+        categories = spending_df["category"].astype("category")
+        category_codes = categories.cat.codes.to_numpy(np.int64)
+        n_categories = len(categories.cat.categories)
+
+        valid = (month_codes >= 0) & (category_codes >= 0)
+        shape = (len(years), MONTHS_PER_YEAR, n_categories)
+        flat_index = np.ravel_multi_index(
+            (year_codes[valid], month_codes[valid], category_codes[valid]), shape,
+        )
+        size = int(np.prod(shape))
+        amounts = np.bincount(
+            flat_index,
+            weights=spending_df["amount"].to_numpy(np.float64)[valid],
+            minlength=size,
+        ).reshape(shape)
+        weights = (
+            spending_df["count"].to_numpy(np.float64)[valid]
+            if "count" in spending_df.columns
+            else None
+        )
+        counts = (
+            np.bincount(flat_index, weights=weights, minlength=size)
+            .astype(np.int64)
+            .reshape(shape)
+        )
+        return cls(
+            [int(year) for year in years],
+            [str(category) for category in categories.cat.categories],
+            amounts,
+            counts,
+        )
+
+    @classmethod
+    def from_aggregates(cls, aggregates: pd.DataFrame) -> "SpendingCube":
+        """Build a cube from 'amount'/'count' aggregates indexed by period."""
+        return cls.from_frame(aggregates.reset_index())
+
+    def breakdown(
+        self,
+        year: int | None = None,
+        month: str | None = None,
+        category: str | None = None,
+    ) -> dict[str, float]:
+        """Return amounts per category for a slice of the cube.
+
+        Args:
+            year: Optional year to restrict to.
+            month: Optional month name to restrict to.
+            category: Optional category to restrict to (case-insensitive).
+
+        Returns:
+            dict[str, float]: Amount per category that has spending in the slice.
+
+        Raises:
+            ValueError: If the year or category is not in the data.
+
+        """
+        year_i = self._lookup(self._year_index, year, "year")
+        category_i = self._lookup(
+            self._category_index, category.lower() if category else None, "category",
+        )
+        month_i = MONTH_NAMES.index(month) if month else None
+
+        if year_i is not None and month_i is not None:
+            amounts = self.amounts[year_i, month_i]
+            counts = self.counts[year_i, month_i]
+        elif year_i is not None:
+            amounts, counts = self._by_year[0][year_i], self._by_year[1][year_i]
+        elif month_i is not None:
+            amounts, counts = self._by_month[0][month_i], self._by_month[1][month_i]
+        else:
+            amounts, counts = self._total
+
+        selected = range(len(self.categories)) if category_i is None else [category_i]
+        return {
+            self.categories[i]: round(float(amounts[i]), 2)
+            for i in selected
+            if counts[i] > 0
+        }
+
+    @staticmethod
+    def _lookup(index: dict, key: object, label: str) -> int | None:
+        """Return the position of a key along an axis, or None if not filtered."""
+        if key is None:
+            return None
+        if key not in index:
+            error_message = f"No spending data for {label} {key}"
+            raise ValueError(error_message)
+        return index[key]
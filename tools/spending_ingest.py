@@ -0,0 +1,255 @@
+"""Streaming Spending Ingestion Module.
+
+This module ingests transaction files of any size in fixed-size chunks with
+explicit dtypes, folding each chunk into running per-period, per-category
+aggregates. Peak memory depends on the chunk size and the number of
+(year, month, category) groups, never on the file size. The aggregates are
+persisted next to a fingerprint of the source file, so later queries are
+answered without touching the raw file again.
+
+Example:
+    just ingest-transactions exports/transactions.csv
+
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+from loguru import logger
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from tools.spending_cube import MONTH_DTYPE
+from utils.config_types import SpendingConfigs
+from utils.logging_setup import setup_logging
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+AGGREGATE_KEYS = ["year", "month", "category"]
+TRANSACTION_DTYPES = {
+    "category": "category",
+    "amount": "float64",
+    "year": "int16",
+    "month": MONTH_DTYPE,
+    "date": "string",
+}
+
+# Set up logging at module level
+logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
+logger.info("Logging initialized for spending_ingest.py")
+
+spending_configs = SpendingConfigs.load_from_path(str(DEFAULT_CONFIG_PATH))
+AGGREGATES_DIR = PROJECT_ROOT / spending_configs.aggregates_dir
+
+Fingerprint = tuple[int, int]
+
+
+def file_fingerprint(path: Path) -> Fingerprint:
+    """Return the (mtime in ns, size) pair identifying a file's contents."""
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def add_periods(transactions: pd.DataFrame) -> pd.DataFrame:
+    """Derive 'year' and 'month' columns from a 'date' column if they are missing.
+
+    Args:
+        transactions: Rows with either 'year'/'month' or 'date' columns.
+
+    Returns:
+        pd.DataFrame: Rows with 'year' (int16) and 'month' (month name) columns.
+
+    Raises:
+        ValueError: If the rows have neither periods nor dates.
+
+    """
+    if {"year", "month"}.issubset(transactions.columns):
+        return transactions
+    if "date" not in transactions.columns:
+        error_message = "Transactions need 'year'/'month' columns or a 'date' column"
+        raise ValueError(error_message)
+    dates = pd.to_datetime(transactions["date"], format="ISO8601")
+    return transactions.assign(
+        year=dates.dt.year.astype("int16"),
+        month=pd.Categorical.from_codes(
+            dates.dt.month.to_numpy() - 1, dtype=MONTH_DTYPE,
+        ),
+    ).drop(columns="date")
+
+
+def aggregate_transactions(transactions: pd.DataFrame) -> pd.DataFrame:
+    """Sum amounts and count rows per (year, month, category).
+
+    Returns:
+        pd.DataFrame: 'amount' and 'count' columns indexed by year, month name
+        and category.
+
+    """
+    transactions = add_periods(transactions)
+    grouped = transactions.groupby(
+        [
+            transactions["year"].astype("int64"),
+            transactions["month"].astype(str),
+            transactions["category"].astype(str),
+        ],
+        observed=True,
+    )["amount"]
+    return pd.DataFrame(
+        {"amount": grouped.sum(), "count": grouped.size().astype("int64")},
+    ).rename_axis(AGGREGATE_KEYS)
+
+
+def merge_aggregates(
+    running: pd.DataFrame | None, update: pd.DataFrame,
+) -> pd.DataFrame:
+    """Add an aggregate update into running aggregates (negative updates subtract)."""
+    if running is None:
+        return update
+    merged = running.add(update, fill_value=0)
+    merged["count"] = merged["count"].astype("int64")
+    return merged
+
+
+def stream_aggregates(path: Path, chunk_rows: int) -> tuple[pd.DataFrame, int]:
+    """Aggregate a transaction CSV chunk by chunk.
+
+    Args:
+        path: CSV with 'category', 'amount' and either 'year'/'month' or
+            'date' columns.
+        chunk_rows: Rows held in memory at a time.
+
+    Returns:
+        tuple[pd.DataFrame, int]: The aggregates and the number of rows read.
+
+    Raises:
+        ValueError: If required columns are missing or values cannot be parsed.
+
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    if not {"category", "amount"}.issubset(header):
+        error_message = "Spending data must contain 'category' and 'amount' columns"
+        raise ValueError(error_message)
+    columns = [column for column in TRANSACTION_DTYPES if column in header]
+    dtypes = {column: TRANSACTION_DTYPES[column] for column in columns}
+
+    running: pd.DataFrame | None = None
+    rows = 0
+    try:
+        with pd.read_csv(
+            path, usecols=columns, dtype=dtypes, chunksize=chunk_rows,
+        ) as reader:
+            for chunk in reader:
+                running = merge_aggregates(running, aggregate_transactions(chunk))
+                rows += len(chunk)
+    except (TypeError, ValueError) as e:
+        error_message = f"Error parsing transactions in {path}: {e}"
+        raise ValueError(error_message) from e
+
+    if running is None:
+        empty = {column: pd.Series(dtype=dtype) for column, dtype in dtypes.items()}
+        running = aggregate_transactions(pd.DataFrame(empty))
+    return running.sort_index(), rows
+
+
+def aggregates_path(source: Path) -> Path:
+    """Return where the aggregates of a source file are persisted."""
+    resolved = source.resolve()
+    digest = hashlib.sha256(str(resolved).encode()).hexdigest()[:12]
+    return AGGREGATES_DIR / f"{resolved.stem}-{digest}.csv"
+
+
+def save_aggregates(
+    source: Path, aggregates: pd.DataFrame, fingerprint: Fingerprint,
+) -> Path:
+    """Persist aggregates with the fingerprint of the file they came from.
+
+    Both files are replaced atomically; the fingerprint is written last, so a
+    crash in between leaves stale-looking (and therefore ignored) aggregates.
+    """
+    path = aggregates_path(source)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    aggregates.to_csv(tmp_name)
+    Path(tmp_name).replace(path)
+
+    meta = {
+        "source": str(source.resolve()),
+        "mtime_ns": fingerprint[0],
+        "size": fingerprint[1],
+    }
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(meta, f, indent=2)
+    Path(tmp_name).replace(path.with_suffix(".json"))
+    return path
+
+
+def load_aggregates(source: Path) -> pd.DataFrame | None:
+    """Return persisted aggregates if they match the source file's current state."""
+    path = aggregates_path(source)
+    meta_path = path.with_suffix(".json")
+    if not (path.exists() and meta_path.exists()):
+        return None
+    with meta_path.open() as f:
+        meta = json.load(f)
+    if (meta["mtime_ns"], meta["size"]) != file_fingerprint(source):
+        return None
+    return pd.read_csv(
+        path,
+        index_col=AGGREGATE_KEYS,
+        dtype={"year": "int64", "month": str, "category": str, "amount": "float64"},
+    )
+
+
+def ingest_transactions(
+    source: Path, chunk_rows: int = spending_configs.chunk_rows,
+) -> dict[str, Any]:
+    """Stream a transaction file into persisted aggregates.
+
+    Args:
+        source: Transaction CSV to ingest.
+        chunk_rows: Rows held in memory at a time.
+
+    Returns:
+        dict[str, Any]: Rows read, aggregate groups, output path and timing.
+
+    """
+    fingerprint = file_fingerprint(source)
+    started = time.perf_counter()
+    aggregates, rows = stream_aggregates(source, chunk_rows)
+    path = save_aggregates(source, aggregates, fingerprint)
+    elapsed = time.perf_counter() - started
+    report = {
+        "rows": rows,
+        "groups": len(aggregates),
+        "aggregates_path": str(path),
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    logger.info(f"Ingested {source}: {report}")
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the ingestion CLI."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", type=Path, help="Transaction CSV to ingest.")
+    parser.add_argument("--chunk-rows", type=int, default=spending_configs.chunk_rows)
+    args = parser.parse_args(argv)
+    report = ingest_transactions(args.source, args.chunk_rows)
+    sys.stdout.write(json.dumps(report, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
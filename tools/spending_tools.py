@@ -3,18 +3,22 @@ import sys
 from pathlib import Path
 from typing import Any
 
-import matplotlib.pyplot as plt
 import pandas as pd
 from loguru import logger
 
 # Add project root to sys.path for module imports
 sys.path.append(str(Path(__file__).parent.parent))
+from tools.chart_cache import chart_cache
+from tools.spending_cache import spending_cache
+from tools.tenant_store import tenant_cache
 from utils.logging_setup import setup_logging
 from utils.models import SpendingBreakdownInput  # Import the Pydantic model
+from utils.structured_logging import log_event
+from utils.visualization import plot_pie_chart
 
 # Constants
 PROJECT_ROOT = Path(__file__).parent.parent
-CHART_PATH = PROJECT_ROOT / "ui" / "assets" / "spending_breakdown.png"
+DEFAULT_SPENDING_DATA = PROJECT_ROOT / "data" / "combined_spending_data.csv"
 DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
 
 # Set up logging at module level
@@ -22,11 +26,82 @@ logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
 logger.info("Logging initialized for spending_tools.py")
 
 
+def describe_filters(input_data: SpendingBreakdownInput) -> str:
+    """Describe the requested slice (e.g., 'March 2023, Food') for titles."""
+    period = " ".join(
+        str(part) for part in (input_data.month, input_data.year) if part is not None
+    )
+    return ", ".join(part for part in (period, input_data.category) if part)
+
+
+def load_breakdown(input_data: SpendingBreakdownInput) -> tuple[dict[str, float], str]:
+    """Aggregate spending per category for the requested slice.
+
+    Tenants and CSV sources with periods are answered from a cached spending
+    cube; other sources are grouped directly.
+
+    Args:
+        input_data: Validated input data using Pydantic.
+
+    Returns:
+        tuple[dict[str, float], str]: Amount per category and the source type.
+
+    Raises:
+        ValueError: If the data is invalid or the slice cannot be served.
+        OSError: If the CSV file cannot be read.
+
+    """
+    if input_data.tenant_id:
+        cube = tenant_cache.get_cube(input_data.tenant_id)
+        breakdown = cube.breakdown(
+            input_data.year, input_data.month, input_data.category,
+        )
+        return breakdown, "tenant"
+    if input_data.spending_data and not input_data.data_source:
+        if input_data.year is not None or input_data.month is not None:
+            logger.warning("Ignoring year/month filters for direct spending input")
+        spending_df = pd.DataFrame(
+            list(input_data.spending_data.items()), columns=["category", "amount"],
+        )
+        source = "direct_input"
+    else:
+        # Parsed and pre-aggregated once per process, shared read-only
+        entry = spending_cache.get_entry(
+            input_data.data_source or DEFAULT_SPENDING_DATA,
+        )
+        if entry.cube is not None:
+            breakdown = entry.cube.breakdown(
+                input_data.year, input_data.month, input_data.category,
+            )
+            return breakdown, "csv"
+        if input_data.year is not None or input_data.month is not None:
+            error_message = "Spending data has no 'year' and 'month' columns to filter"
+            raise ValueError(error_message)
+        spending_df = spending_cache.get_frame(
+            input_data.data_source or DEFAULT_SPENDING_DATA,
+        )
+        source = "csv"
+
+    # Ensure 'amount' column contains numeric values
+    if not pd.api.types.is_numeric_dtype(spending_df["amount"]):
+        error_message = "'amount' column must contain numeric values"
+        raise ValueError(error_message)
+
+    if input_data.category:
+        spending_df = spending_df[
+            spending_df["category"].astype(str).str.lower()
+            == input_data.category.lower()
+        ]
+    breakdown = spending_df.groupby("category", observed=True)["amount"].sum()
+    return {str(k): float(v) for k, v in breakdown.items()}, source
+
+
 def get_spending_breakdown(input_data: SpendingBreakdownInput) -> dict[str, Any]:
     """Generate a spending breakdown and create a pie chart.
 
     Args:
-        input_data: Validated input data using Pydantic.
+        input_data: Validated input data using Pydantic. Optional year, month
+            and category fields restrict the breakdown to a slice.
 
     Returns:
         dict: Spending breakdown by category and path to the saved chart.
@@ -35,55 +110,41 @@ def get_spending_breakdown(input_data: SpendingBreakdownInput) -> dict[str, Any]
         ValueError: If the data is invalid or cannot be processed.
 
     """
-    logger.info("Generating spending breakdown")
+    slice_description = describe_filters(input_data)
+    log_event("tool.call", tool="get_spending_breakdown", input=input_data)
     try:
-        # Load spending data
-        if input_data.data_source:
-            # Load data from CSV file
-            spending_df = pd.read_csv(input_data.data_source)
-            source = "csv"
-        elif input_data.spending_data:
-            # Convert dictionary to DataFrame
-            spending_df = pd.DataFrame(
-                list(input_data.spending_data.items()), columns=["category", "amount"],
-            )
-            source = "direct_input"
-
-        # Validate DataFrame columns
-        required_columns = {"category", "amount"}
-        if not required_columns.issubset(spending_df.columns):
-            error_message = "Spending data must contain 'category' and 'amount' columns"
-            raise ValueError(error_message)
-
-        # Ensure 'amount' column contains numeric values
-        if not pd.api.types.is_numeric_dtype(spending_df["amount"]):
-            error_message = "'amount' column must contain numeric values"
+        breakdown, source = load_breakdown(input_data)
+        if not breakdown:
+            error_message = f"No spending data for {slice_description or 'any period'}"
             raise ValueError(error_message)
-
-        # Generate breakdown
-        breakdown = spending_df.groupby("category")["amount"].sum().to_dict()
-        total_spent = sum(breakdown.values())
-
-        # Create pie chart
-        plt.figure(figsize=(8, 8))
-        plt.pie(
-            breakdown.values(),
-            labels=breakdown.keys(),
-            autopct="%1.1f%%",
-            startangle=90,
-        )
-        plt.title(
-            f"Spending Breakdown (Source: {source.capitalize()})", wrap=True,
+        total_spent = round(sum(breakdown.values()), 2)
+
+        # Create pie chart, or reuse the one already rendered for this data
+        title = "Spending Breakdown"
+        if slice_description:
+            title += f" - {slice_description}"
+        chart_path, cached = chart_cache.get_chart(
+            plot_pie_chart,
+            breakdown,
+            {"title": f"{title} (Source: {source.capitalize()})"},
         )
-        plt.axis("equal")
-        plt.savefig(CHART_PATH, bbox_inches="tight")
-        plt.close()
 
-        logger.info(f"Spending breakdown: {breakdown}, chart saved to {CHART_PATH}")
+        log_event(
+            "tool.result",
+            tool="get_spending_breakdown",
+            categories=len(breakdown),
+            total_spent=total_spent,
+            chart_cached=cached,
+            detail={"breakdown": lambda: breakdown},
+        )
         return {
             "breakdown": breakdown,
             "total_spent": total_spent,
-            "chart_path": str(CHART_PATH),
+            "year": input_data.year,
+            "month": input_data.month,
+            "category": input_data.category,
+            "tenant_id": input_data.tenant_id,
+            "chart_path": str(chart_path),
             "source": source,
         }
 
@@ -0,0 +1,99 @@
+"""Stock History Module.
+
+This module fetches daily stock bars for the stock tools and the price
+providers. By default it uses the yfinance library; when
+``[upstreams] yahoo_url`` is set, it calls the Yahoo Finance chart API at
+that URL directly instead (for example the market data stand-in), since
+yfinance cannot be pointed at another host. yfinance results are recorded to
+and replayed from the cassette when cassettes are on.
+"""
+
+import sys
+from functools import partial
+from pathlib import Path
+
+import pandas as pd
+import yfinance as yf
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.cassettes import cassette
+from utils.config_types import UpstreamConfigs
+from utils.http_client import http_session
+from utils.tracing import span
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+BAR_COLUMNS = {
+    "open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume",
+}
+
+upstream_configs = UpstreamConfigs.load_from_path(str(DEFAULT_CONFIG_PATH))
+
+
+def _chart_history(
+    symbol: str, start: str | None, end: str | None, period: str | None,
+) -> pd.DataFrame:
+    """Fetch daily bars from the Yahoo Finance chart API, shaped like yfinance's."""
+    params: dict[str, str | int] = {"interval": "1d"}
+    if start is not None:
+        params["period1"] = int(pd.Timestamp(start, tz="UTC").timestamp())
+        last = pd.Timestamp(end) if end is not None else pd.Timestamp.now()
+        params["period2"] = int(last.tz_localize("UTC").timestamp())
+    else:
+        params["range"] = period or "1mo"
+    response = http_session.get(
+        f"{upstream_configs.yahoo_url}/v8/finance/chart/{symbol}",
+        params=params,
+        timeout=30,
+    )
+    response.raise_for_status()
+    result = (response.json().get("chart", {}).get("result") or [{}])[0]
+    timestamps = result.get("timestamp") or []
+    if not timestamps:
+        return pd.DataFrame(columns=list(BAR_COLUMNS.values()))
+    quote = result["indicators"]["quote"][0]
+    timezone = result.get("meta", {}).get("exchangeTimezoneName", "UTC")
+    index = pd.to_datetime(timestamps, unit="s", utc=True).tz_convert(timezone)
+    return pd.DataFrame(
+        {column: quote[field] for field, column in BAR_COLUMNS.items()},
+        index=index.normalize().rename("Date"),
+    )
+
+
+def _yfinance_history(
+    symbol: str, start: str | None, end: str | None, period: str | None,
+) -> pd.DataFrame:
+    """Fetch daily bars with the yfinance library."""
+    if start is not None:
+        return yf.Ticker(symbol).history(start=start, end=end)
+    return yf.Ticker(symbol).history(period=period or "1mo")
+
+
+def fetch_stock_history(
+    symbol: str,
+    start: str | None = None,
+    end: str | None = None,
+    period: str | None = None,
+) -> pd.DataFrame:
+    """Return the daily bars of a stock, like ``yf.Ticker(symbol).history``.
+
+    Args:
+        symbol: Stock ticker symbol.
+        start: First day ('YYYY-MM-DD'), if fetching a date range.
+        end: Day after the last one ('YYYY-MM-DD', exclusive, as with yfinance).
+        period: Period to fetch instead of a date range (e.g. '5d').
+
+    Returns:
+        pd.DataFrame: Open, High, Low, Close and Volume by trading day (empty
+        if there is no data).
+
+    """
+    with span("http.yfinance", symbol=symbol):
+        if upstream_configs.yahoo_url:
+            return _chart_history(symbol, start, end, period)
+        return cassette.frame(
+            f"yfinance {symbol} start={start} end={end} period={period}",
+            partial(_yfinance_history, symbol, start, end, period),
+        )
@@ -1,16 +1,19 @@
 """Stock Price Checker Tool."""
 import sys
+from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
 import pandas as pd
-import yfinance as yf
 from loguru import logger
 
 # Add project root to sys.path for module imports
 sys.path.append(str(Path(__file__).parent.parent))
+from tools.price_cache import price_cache
+from tools.stock_history import fetch_stock_history
 from utils.logging_setup import setup_logging
 from utils.models import StockPriceInput
+from utils.structured_logging import log_event
 
 # Constants
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -22,7 +25,7 @@ logger.info("Logging initialized for stock_tools.py")
 
 
 def validate_data(
-    data: pd.DataFrame,
+    data: pd.DataFrame | pd.Series,
     symbol: str,
     start_date: str | None = None,
     end_date: str | None = None,
@@ -54,9 +57,66 @@ def validate_data(
         raise ValueError(error_message)
 
 
+def refresh_stock_quote(symbol: str) -> float:
+    """Fetch the latest daily bars for a stock and store them in the price cache.
+
+    Args:
+        symbol: Stock ticker symbol.
+
+    Returns:
+        float: The latest closing (or live) price.
+
+    Raises:
+        ValueError: If no current data is available.
+
+    """
+    recent = fetch_stock_history(symbol, period="5d")
+    validate_data(recent, symbol)
+
+    closes = recent["Close"]
+    first_day = closes.index[0].strftime("%Y-%m-%d")
+    today = datetime.now(tz=UTC).strftime("%Y-%m-%d")
+    price_cache.set_daily_closes("stock", symbol, closes, first_day, today)
+
+    current_price = float(closes.iloc[-1])
+    price_cache.set_quote("stock", symbol, current_price)
+    return current_price
+
+
+def get_historical_closes(symbol: str, start_date: str, end_date: str) -> pd.Series:
+    """Return daily closes for a stock, reading through the price cache.
+
+    Args:
+        symbol: Stock ticker symbol.
+        start_date: Start date (inclusive, 'YYYY-MM-DD').
+        end_date: End date (exclusive, 'YYYY-MM-DD'), as with yfinance.
+
+    Returns:
+        pd.Series: Closing prices indexed by trading day.
+
+    Raises:
+        ValueError: If there is no data for the range.
+
+    """
+    last_day = (pd.Timestamp(end_date) - pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    closes = price_cache.get_daily_closes("stock", symbol, start_date, last_day)
+    if closes is None:
+        hist = fetch_stock_history(symbol, start=start_date, end=end_date)
+        validate_data(hist, symbol, start_date, end_date)
+        price_cache.set_daily_closes(
+            "stock", symbol, hist["Close"], start_date, last_day,
+        )
+        closes = price_cache.get_daily_closes("stock", symbol, start_date, last_day)
+    validate_data(closes, symbol, start_date, end_date)
+    return closes
+
+
 def get_stock_prices(input_data: StockPriceInput) -> dict[str, Any]:
     """Retrieve current and historical stock prices.
 
+    Quotes and closes are served from the price cache when warm, so symbols on
+    the refresh watchlist are answered without a network round trip.
+
     Args:
         input_data (StockPriceInput): Validated input data using Pydantic.
 
@@ -64,31 +124,25 @@ def get_stock_prices(input_data: StockPriceInput) -> dict[str, Any]:
         dict[str, Any]: Current price and historical prices if requested.
 
     """
-    logger.info(f"Fetching stock prices for {input_data.symbol}")
+    log_event("tool.call", tool="get_stock_prices", input=input_data)
     try:
-        stock = yf.Ticker(input_data.symbol)
-
-        # Fetch current data
-        current_data = stock.history(period="1d")
-        validate_data(current_data, input_data.symbol)
-
-        current_price = current_data["Close"].iloc[-1]
+        current_price = price_cache.get_quote("stock", input_data.symbol)
+        if current_price is None:
+            current_price = refresh_stock_quote(input_data.symbol)
 
         # Fetch historical data if dates are provided
         historical_data = None
         if input_data.start_date and input_data.end_date:
-            hist = stock.history(start=input_data.start_date, end=input_data.end_date)
-            validate_data(hist, input_data.symbol, input_data.start_date,
-                          input_data.end_date)
-            historical_data = hist["Close"].to_dict()
+            historical_data = get_historical_closes(
+                input_data.symbol, input_data.start_date, input_data.end_date,
+            ).to_dict()
 
-        logger.info(f"Successfully fetched stock prices for {input_data.symbol}")
+        log_event("tool.result", tool="get_stock_prices", symbol=input_data.symbol)
         return {
             "symbol": input_data.symbol,
             "current_price": float(current_price),
             "historical_data": historical_data,
         }
-
     except ValueError as e:
         logger.error(str(e))
         raise
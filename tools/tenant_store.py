@@ -0,0 +1,427 @@
+"""Tenant Spending Store Module.
+
+This module stores spending data per tenant (user): each tenant has its own
+directory with a year-partitioned Parquet transaction dataset, a
+transaction-id index and precomputed spending aggregates. Lookups are keyed
+by tenant id, so a query only ever touches one tenant's files and costs the
+same no matter how many tenants exist. Hot tenants are kept in an LRU cache
+whose total size stays under a global memory budget.
+
+Example:
+    just import-tenant-spending demo data/combined_spending_data.csv
+
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import pandas as pd
+from loguru import logger
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from tools.columnar_store import (
+    PARTITION_COLUMN,
+    load_spending_dataset,
+    read_partitioned,
+    write_parquet,
+    write_partitioned,
+)
+from tools.spending_cache import BYTES_PER_MB, freeze_frame, load_spending_frame
+from tools.spending_cube import SpendingCube
+from tools.spending_ingest import (
+    AGGREGATE_KEYS,
+    Fingerprint,
+    aggregate_transactions,
+    file_fingerprint,
+    merge_aggregates,
+)
+from utils.config_types import TenantConfigs
+from utils.logging_setup import setup_logging
+from utils.models import TENANT_ID_PATTERN
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+TRANSACTION_COLUMNS = [
+    "transaction_id", "account_id", "date", "name", "category", "amount",
+]
+
+# Set up logging at module level
+logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
+logger.info("Logging initialized for tenant_store.py")
+
+tenant_configs = TenantConfigs.load_from_path(str(DEFAULT_CONFIG_PATH))
+
+
+def validate_tenant_id(tenant_id: str) -> str:
+    """Return a tenant id if it is safe to use as a directory name.
+
+    Raises:
+        ValueError: If the id has characters other than letters, digits, '-'
+            and '_', or is longer than 64 characters.
+
+    """
+    if not re.fullmatch(TENANT_ID_PATTERN, tenant_id):
+        error_message = f"Invalid tenant id: {tenant_id!r}"
+        raise ValueError(error_message)
+    return tenant_id
+
+
+def spending_aggregates(rows: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate the spending (outflow) rows of a set of transactions.
+
+    Amounts are positive when money leaves the account, so inflows such as
+    refunds and deposits are left out of the spending aggregates.
+    """
+    outflows = rows.loc[rows["amount"] > 0, ["category", "amount", "year", "month"]]
+    return aggregate_transactions(outflows)
+
+
+class TenantStore:
+    """Transactions, their id index and spending aggregates per tenant.
+
+    Each tenant directory holds:
+
+    - ``transactions/year=<y>/part-0.parquet``: the transactions;
+    - ``index.parquet``: transaction id -> year, the dedupe index that finds
+      the partition an existing transaction lives in;
+    - ``aggregates.parquet``: spending per (year, month, category);
+    - ``cursors/<item>.json``: the sync cursor of each linked item.
+
+    Applying the same changes twice leaves the store unchanged, so a sync
+    that dies before saving its cursor is repaired by simply syncing again.
+    """
+
+    def __init__(self, root: Path) -> None:
+        """Initialize the store.
+
+        Args:
+            root: Directory holding one sub-directory per tenant.
+
+        """
+        self.root = root
+
+    def tenant_ids(self) -> list[str]:
+        """Return the ids of the tenants that have spending aggregates."""
+        if not self.root.exists():
+            return []
+        return sorted(
+            path.parent.name for path in self.root.glob("*/aggregates.parquet")
+        )
+
+    def tenant_dir(self, tenant_id: str) -> Path:
+        """Return the directory of a tenant."""
+        return self.root / validate_tenant_id(tenant_id)
+
+    def aggregates_path(self, tenant_id: str) -> Path:
+        """Return the file holding a tenant's spending aggregates."""
+        return self.tenant_dir(tenant_id) / "aggregates.parquet"
+
+    def load_cursor(self, tenant_id: str, item_id: str) -> str:
+        """Return the saved sync cursor of an item ('' before the first sync)."""
+        path = self.tenant_dir(tenant_id) / "cursors" / f"{item_id}.json"
+        if not path.exists():
+            return ""
+        with path.open() as f:
+            return json.load(f)["cursor"]
+
+    def save_cursor(self, tenant_id: str, item_id: str, cursor: str) -> None:
+        """Save the sync cursor of an item atomically."""
+        path = self.tenant_dir(tenant_id) / "cursors" / f"{item_id}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"cursor": cursor}, f)
+        Path(tmp_name).replace(path)
+
+    def load_index(self, tenant_id: str) -> pd.Series:
+        """Return the year of every stored transaction, indexed by id."""
+        path = self.tenant_dir(tenant_id) / "index.parquet"
+        if not path.exists():
+            return pd.Series(
+                dtype="int16",
+                index=pd.Index([], name="transaction_id"),
+                name=PARTITION_COLUMN,
+            )
+        index = pd.read_parquet(path)
+        return index.set_index("transaction_id")[PARTITION_COLUMN]
+
+    def load_aggregates(self, tenant_id: str) -> pd.DataFrame | None:
+        """Return the spending aggregates of a tenant, or None if it has none."""
+        path = self.aggregates_path(tenant_id)
+        if not path.exists():
+            return None
+        return pd.read_parquet(path).set_index(AGGREGATE_KEYS)
+
+    def load_transactions(self, tenant_id: str) -> pd.DataFrame:
+        """Return every stored transaction of a tenant."""
+        return read_partitioned(self.tenant_dir(tenant_id) / "transactions")
+
+    def apply(
+        self,
+        tenant_id: str,
+        added: pd.DataFrame,
+        modified: pd.DataFrame,
+        removed: list[str],
+    ) -> dict[str, int]:
+        """Apply one batch of changes to a tenant.
+
+        Only the year partitions holding affected transactions are read and
+        rewritten, and the aggregates change by (new rows - replaced rows).
+
+        Args:
+            tenant_id: Tenant the changes belong to.
+            added: New transactions, with ``TRANSACTION_COLUMNS`` plus 'year'
+                (int16) and 'month' (month name).
+            modified: Changed transactions, same columns.
+            removed: Ids of removed transactions.
+
+        Returns:
+            dict[str, int]: Counts of upserted and removed transactions and of
+            rewritten partitions.
+
+        """
+        tenant_dir = self.tenant_dir(tenant_id)
+        dataset = tenant_dir / "transactions"
+        index = self.load_index(tenant_id)
+        upserts = pd.concat([added, modified]).drop_duplicates(
+            "transaction_id", keep="last",
+        )
+        # A transaction added and removed within the same batch stays removed.
+        upserts = upserts[~upserts["transaction_id"].isin(removed)]
+        touched_ids = pd.Index(upserts["transaction_id"]).union(pd.Index(removed))
+        years = sorted(
+            {int(year) for year in index[index.index.isin(touched_ids)]}
+            | {int(year) for year in upserts[PARTITION_COLUMN]},
+        )
+        if not years:
+            return {"upserted": 0, "removed": 0, "partitions": 0}
+
+        current = (
+            read_partitioned(dataset, filters=[(PARTITION_COLUMN, "in", years)])
+            if dataset.exists()
+            else upserts.iloc[:0]
+        )
+        replaced = current["transaction_id"].isin(touched_ids)
+        updated = pd.concat(
+            [current[~replaced], upserts[current.columns]], ignore_index=True,
+        )
+        write_partitioned(updated, dataset)
+        for year in set(years) - set(updated[PARTITION_COLUMN]):
+            shutil.rmtree(dataset / f"{PARTITION_COLUMN}={year}", ignore_errors=True)
+
+        index = pd.concat(
+            [
+                index[~index.index.isin(touched_ids)],
+                upserts.set_index("transaction_id")[PARTITION_COLUMN],
+            ],
+        ).rename(PARTITION_COLUMN)
+        write_parquet(tenant_dir / "index.parquet", index.reset_index())
+
+        delta = merge_aggregates(
+            spending_aggregates(upserts), -spending_aggregates(current[replaced]),
+        )
+        aggregates = merge_aggregates(self.load_aggregates(tenant_id), delta)
+        aggregates = aggregates[aggregates["count"] > 0]
+        write_parquet(self.aggregates_path(tenant_id), aggregates.reset_index())
+
+        return {
+            "upserted": len(upserts),
+            "removed": int(current.loc[replaced, "transaction_id"].isin(removed).sum()),
+            "partitions": len(years),
+        }
+
+    def import_spending(self, tenant_id: str, source: Path) -> dict[str, Any]:
+        """Import a spending CSV into a tenant.
+
+        Rows get ids derived from the file name and row number, so importing
+        the same file again replaces its rows instead of duplicating them;
+        rows left over from a longer earlier version of the file are removed.
+        Rows without a 'date' are dated on the first day of their month.
+
+        Args:
+            tenant_id: Tenant to import into.
+            source: CSV with 'category', 'amount' and 'year'/'month' or
+                'date' columns.
+
+        Returns:
+            dict[str, Any]: The tenant id, rows imported and the change counts.
+
+        Raises:
+            ValueError: If the file is not valid spending data with periods.
+
+        """
+        spending_df = load_spending_frame(source)
+        if not {"year", "month"}.issubset(spending_df.columns):
+            error_message = "Spending data needs 'year'/'month' or 'date' columns"
+            raise ValueError(error_message)
+        months = spending_df["month"].cat.codes.to_numpy() + 1
+        dates = pd.to_datetime(
+            {"year": spending_df["year"], "month": months, "day": 1},
+        )
+        prefix = f"import-{hashlib.sha256(source.name.encode()).hexdigest()[:8]}-"
+        rows = pd.DataFrame(
+            {
+                "transaction_id": [f"{prefix}{i}" for i in range(len(dates))],
+                "account_id": "import",
+                "date": dates.dt.strftime("%Y-%m-%d"),
+                "name": "",
+                "category": spending_df["category"].astype(str),
+                "amount": spending_df["amount"].astype("float64"),
+                "year": spending_df["year"].astype("int16"),
+                "month": spending_df["month"].astype(str),
+            },
+        )
+        stored_ids = self.load_index(tenant_id).index
+        stale = stored_ids[
+            stored_ids.str.startswith(prefix)
+            & ~stored_ids.isin(rows["transaction_id"])
+        ]
+        applied = self.apply(tenant_id, rows, rows.iloc[:0], stale.tolist())
+        report = {"tenant_id": tenant_id, "rows": len(rows), **applied}
+        logger.info(f"Imported {source} into tenant {tenant_id}: {report}")
+        return report
+
+
+class TenantEntry(NamedTuple):
+    """A cached tenant: its cube, optionally its rows, and their size."""
+
+    fingerprint: Fingerprint
+    cube: SpendingCube
+    frame: pd.DataFrame | None
+    nbytes: int
+
+
+def _entry_nbytes(cube: SpendingCube, frame: pd.DataFrame | None) -> int:
+    """Return the approximate memory held by a cached tenant."""
+    # The cube's marginals together are about as large as the cube itself.
+    cube_bytes = 2 * (cube.amounts.nbytes + cube.counts.nbytes)
+    frame_bytes = 0 if frame is None else int(frame.memory_usage(deep=True).sum())
+    return cube_bytes + frame_bytes
+
+
+class TenantSpendingCache:
+    """LRU cache of tenants' spending cubes and frames under a memory budget.
+
+    A tenant's cube is built from its precomputed aggregates on first use and
+    rebuilt when the aggregates file changes (e.g. after a sync); its rows are
+    only loaded by ``get_frame``. When the cached total exceeds the budget,
+    the least recently used tenants are evicted.
+    """
+
+    def __init__(self, store: TenantStore, memory_budget_mb: float) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            store: Tenant storage to load from.
+            memory_budget_mb: Maximum memory held by cached tenants.
+
+        """
+        self.store = store
+        self.memory_budget = int(memory_budget_mb * BYTES_PER_MB)
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, TenantEntry] = OrderedDict()
+        self._nbytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory currently held by cached tenants."""
+        return self._nbytes
+
+    def get_entry(self, tenant_id: str) -> TenantEntry:
+        """Return the cached entry of a tenant, loading it if needed.
+
+        Raises:
+            ValueError: If the tenant id is invalid or the tenant has no data.
+
+        """
+        path = self.store.aggregates_path(tenant_id)
+        if not path.exists():
+            error_message = f"No spending data for tenant {tenant_id}"
+            raise ValueError(error_message)
+        fingerprint = file_fingerprint(path)
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+            if entry is not None and entry.fingerprint == fingerprint:
+                self._entries.move_to_end(tenant_id)
+                return entry
+
+        logger.info(f"Loading spending aggregates for tenant {tenant_id}")
+        cube = SpendingCube.from_aggregates(self.store.load_aggregates(tenant_id))
+        entry = TenantEntry(fingerprint, cube, None, _entry_nbytes(cube, None))
+        self._put(tenant_id, entry)
+        return entry
+
+    def get_cube(self, tenant_id: str) -> SpendingCube:
+        """Return the spending cube of a tenant."""
+        return self.get_entry(tenant_id).cube
+
+    def get_frame(self, tenant_id: str) -> pd.DataFrame:
+        """Return the shared, read-only transaction rows of a tenant."""
+        entry = self.get_entry(tenant_id)
+        if entry.frame is not None:
+            return entry.frame
+        logger.info(f"Loading transactions for tenant {tenant_id}")
+        spending_df = freeze_frame(
+            load_spending_dataset(self.store.tenant_dir(tenant_id) / "transactions"),
+        )
+        self._put(
+            tenant_id,
+            entry._replace(
+                frame=spending_df, nbytes=_entry_nbytes(entry.cube, spending_df),
+            ),
+        )
+        return spending_df
+
+    def invalidate(self, tenant_id: str | None = None) -> None:
+        """Drop one cached tenant, or every cached tenant if none is given."""
+        with self._lock:
+            if tenant_id is None:
+                self._entries.clear()
+                self._nbytes = 0
+            elif tenant_id in self._entries:
+                self._nbytes -= self._entries.pop(tenant_id).nbytes
+
+    def _put(self, tenant_id: str, entry: TenantEntry) -> None:
+        """Insert an entry as most recently used and evict down to the budget."""
+        with self._lock:
+            previous = self._entries.pop(tenant_id, None)
+            if previous is not None:
+                self._nbytes -= previous.nbytes
+            self._entries[tenant_id] = entry
+            self._nbytes += entry.nbytes
+            # The newest entry always stays, even if it alone exceeds the budget.
+            while self._nbytes > self.memory_budget and len(self._entries) > 1:
+                evicted_id, evicted = self._entries.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+                logger.debug(f"Evicted tenant {evicted_id} from the spending cache")
+
+
+tenant_store = TenantStore(PROJECT_ROOT / tenant_configs.root_dir)
+tenant_cache = TenantSpendingCache(tenant_store, tenant_configs.memory_budget_mb)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the tenant import CLI."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("tenant_id", help="Tenant to import into.")
+    parser.add_argument("source", type=Path, help="Spending CSV to import.")
+    args = parser.parse_args(argv)
+    report = tenant_store.import_spending(args.tenant_id, args.source)
+    sys.stdout.write(json.dumps(report, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
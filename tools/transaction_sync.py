@@ -0,0 +1,303 @@
+"""Transaction Sync Module.
+
+This module keeps local transactions in step with Plaid through cursor-based
+``/transactions/sync``: each run only asks for what changed since the item's
+saved cursor. Added, modified and removed transactions are applied to the
+owning tenant's store (see ``tenant_store``) through its transaction-id
+index, and the tenant's spending aggregates are adjusted by the delta of the
+affected rows instead of being recomputed from the whole history. The
+budget rules are then re-evaluated for the tenants that were synced.
+
+Example:
+    just start-plaid-standin
+    just sync-transactions
+
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import plaid
+import urllib3
+from loguru import logger
+from plaid.api import plaid_api
+from plaid.model.transactions_sync_request import TransactionsSyncRequest
+
+# Add project root to sys.path for module imports
+sys.path.append(str(Path(__file__).parent.parent))
+from tools.budget_rules import budget_engine
+from tools.spending_ingest import add_periods
+from tools.tenant_store import TRANSACTION_COLUMNS, TenantStore, tenant_store
+from utils.config_types import PlaidConfigs
+from utils.logging_setup import setup_logging
+
+# Constants
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+MUTATION_DURING_PAGINATION = "TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION"
+MAX_PAGINATION_RESTARTS = 3
+
+# Set up logging at module level
+logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
+logger.info("Logging initialized for transaction_sync.py")
+
+plaid_configs = PlaidConfigs.load_from_path(str(DEFAULT_CONFIG_PATH))
+
+
+def item_key(access_token: str) -> str:
+    """Return a stable name for an item without storing its token."""
+    return hashlib.sha256(access_token.encode()).hexdigest()[:16]
+
+
+def _category(transaction: dict[str, Any]) -> str:
+    """Return the spending category of a Plaid transaction."""
+    personal_category = transaction.get("personal_finance_category") or {}
+    if personal_category.get("primary"):
+        return str(personal_category["primary"]).replace("_", " ").title()
+    legacy_category = transaction.get("category") or []
+    return str(legacy_category[0]) if legacy_category else "Uncategorized"
+
+
+def normalize_transactions(transactions: list[dict[str, Any]]) -> pd.DataFrame:
+    """Convert Plaid transaction objects into rows of the local dataset.
+
+    Args:
+        transactions: Transactions as returned in 'added' or 'modified'.
+
+    Returns:
+        pd.DataFrame: One row per transaction id (the last one wins), with
+        'year' (int16) and 'month' (month name) columns.
+
+    """
+    rows = pd.DataFrame(
+        {
+            "transaction_id": [t["transaction_id"] for t in transactions],
+            "account_id": [t["account_id"] for t in transactions],
+            "date": [str(t["date"]) for t in transactions],
+            "name": [t.get("name") or "" for t in transactions],
+            "category": [_category(t) for t in transactions],
+            "amount": pd.Series([t["amount"] for t in transactions], dtype="float64"),
+        },
+        columns=TRANSACTION_COLUMNS,
+    ).drop_duplicates("transaction_id", keep="last")
+    dates = pd.to_datetime(rows["date"], format="ISO8601")
+    return add_periods(rows.assign(date=dates)).assign(
+        date=dates.dt.strftime("%Y-%m-%d"),
+        month=lambda frame: frame["month"].astype(str),
+    )
+
+
+class PlaidSyncClient:
+    """Thin wrapper around ``/transactions/sync`` of the Plaid API."""
+
+    def __init__(self, configs: PlaidConfigs = plaid_configs) -> None:
+        """Initialize the client.
+
+        Args:
+            configs: Plaid host and credentials.
+
+        """
+        self.host = configs.host
+        configuration = plaid.Configuration(
+            host=configs.host,
+            api_key={
+                "clientId": os.environ.get("PLAID_CLIENT_ID", configs.client_id),
+                "secret": os.environ.get("PLAID_SECRET", configs.secret),
+            },
+        )
+        self.api = plaid_api.PlaidApi(plaid.ApiClient(configuration))
+
+    def sync_page(self, access_token: str, cursor: str, count: int) -> dict[str, Any]:
+        """Fetch one page of changes after a cursor ('' for the full history).
+
+        Raises:
+            plaid.ApiException: If Plaid rejects the request.
+
+        """
+        request = TransactionsSyncRequest(access_token=access_token, count=count)
+        if cursor:
+            request.cursor = cursor
+        return self.api.transactions_sync(request).to_dict()
+
+
+def _error_code(error: plaid.ApiException) -> str | None:
+    """Return the Plaid error code of a failed request, if it has one."""
+    try:
+        return json.loads(error.body).get("error_code")
+    except (TypeError, ValueError):
+        return None
+
+
+def fetch_changes(
+    client: PlaidSyncClient, access_token: str, cursor: str, page_size: int,
+) -> tuple[dict[str, list], str]:
+    """Page through every change after a cursor.
+
+    If the item changes while paging, Plaid asks for the whole pagination to
+    restart from the original cursor, which is retried a few times.
+
+    Returns:
+        tuple[dict[str, list], str]: The 'added', 'modified' and 'removed'
+        lists, and the cursor to save once they are applied.
+
+    Raises:
+        ValueError: If Plaid keeps failing.
+
+    """
+    for attempt in range(1, MAX_PAGINATION_RESTARTS + 1):
+        changes: dict[str, list] = {"added": [], "modified": [], "removed": []}
+        next_cursor = cursor
+        try:
+            has_more = True
+            while has_more:
+                page = client.sync_page(access_token, next_cursor, page_size)
+                for kind, records in changes.items():
+                    records.extend(page[kind])
+                next_cursor = page["next_cursor"]
+                has_more = page["has_more"]
+        except plaid.ApiException as e:
+            if (
+                _error_code(e) == MUTATION_DURING_PAGINATION
+                and attempt < MAX_PAGINATION_RESTARTS
+            ):
+                logger.warning(f"Item changed during pagination, restart {attempt}")
+                continue
+            error_message = f"Error syncing transactions: {_error_code(e) or e}"
+            logger.error(error_message)
+            raise ValueError(error_message) from e
+        except urllib3.exceptions.HTTPError as e:
+            error_message = f"Error reaching Plaid at {client.host}: {e}"
+            logger.error(error_message)
+            raise ValueError(error_message) from e
+        return changes, next_cursor
+    error_message = "Item kept changing during pagination"
+    raise ValueError(error_message)
+
+
+def sync_item(
+    client: PlaidSyncClient,
+    store: TenantStore,
+    tenant_id: str,
+    access_token: str,
+    page_size: int = plaid_configs.page_size,
+) -> dict[str, Any]:
+    """Sync one item of a tenant from its saved cursor and apply the changes.
+
+    The cursor is saved only after the changes are stored, so a failed run
+    is retried from the same point.
+
+    Returns:
+        dict[str, Any]: The tenant and item ids, change counts and whether it
+        was a full (first) sync.
+
+    Raises:
+        ValueError: If the sync fails.
+
+    """
+    item_id = item_key(access_token)
+    cursor = store.load_cursor(tenant_id, item_id)
+    changes, next_cursor = fetch_changes(client, access_token, cursor, page_size)
+    applied = store.apply(
+        tenant_id,
+        normalize_transactions(changes["added"]),
+        normalize_transactions(changes["modified"]),
+        [removed["transaction_id"] for removed in changes["removed"]],
+    )
+    store.save_cursor(tenant_id, item_id, next_cursor)
+    report = {
+        "tenant_id": tenant_id,
+        "item_id": item_id,
+        "initial_sync": not cursor,
+        "added": len(changes["added"]),
+        "modified": len(changes["modified"]),
+        **applied,
+    }
+    logger.info(f"Synced item {item_id} of tenant {tenant_id}: {report}")
+    return report
+
+
+def sync_tenants(
+    items: dict[str, list[str]],
+    configs: PlaidConfigs = plaid_configs,
+    store: TenantStore = tenant_store,
+) -> list[dict[str, Any]]:
+    """Sync the items of several tenants; one failing item does not stop the rest.
+
+    Tenants are synced concurrently, and the items of one tenant one after
+    another, since they write to the same tenant store.
+
+    Args:
+        items: Access tokens of the linked items, per tenant id.
+        configs: Plaid host, credentials and concurrency.
+        store: Tenant storage to apply the changes to.
+
+    Returns:
+        list[dict[str, Any]]: One report per item; failed items carry an
+        'error' entry instead of change counts.
+
+    """
+    client = PlaidSyncClient(configs)
+
+    def sync_tenant(tenant_id: str) -> list[dict[str, Any]]:
+        reports = []
+        for access_token in items[tenant_id]:
+            try:
+                report = sync_item(
+                    client, store, tenant_id, access_token, configs.page_size,
+                )
+            except ValueError as e:
+                reports.append(
+                    {
+                        "tenant_id": tenant_id,
+                        "item_id": item_key(access_token),
+                        "error": str(e),
+                    },
+                )
+            else:
+                reports.append(report)
+        return reports
+
+    with ThreadPoolExecutor(max_workers=configs.workers) as executor:
+        return [
+            report
+            for reports in executor.map(sync_tenant, items)
+            for report in reports
+        ]
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the sync CLI."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--tenant", help="Tenant to sync; defaults to every configured tenant.",
+    )
+    parser.add_argument(
+        "--access-token",
+        action="append",
+        dest="access_tokens",
+        help="Item of --tenant to sync (repeatable); defaults to its configured items.",
+    )
+    args = parser.parse_args(argv)
+    items = plaid_configs.items
+    if args.tenant:
+        items = {args.tenant: args.access_tokens or items.get(args.tenant, [])}
+    reports = sync_tenants(items)
+    synced = sorted(
+        {report["tenant_id"] for report in reports if "error" not in report},
+    )
+    budgets = budget_engine.run(synced)
+    sys.stdout.write(
+        json.dumps({"sync": reports, "budgets": budgets}, indent=2) + "\n",
+    )
+    return 1 if any("error" in report for report in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
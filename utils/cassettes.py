@@ -0,0 +1,520 @@
+"""Cassettes: record and replay of upstream traffic.
+
+With ``[cassettes] mode = "record"``, every response the app gets from its
+upstreams is saved to a cassette together with how long it took; with
+``mode = "replay"`` the same requests are answered from the cassette without
+touching the network. The boundaries covered are:
+
+- ``http_session`` (CoinGecko, CryptoCompare, the Yahoo chart API), through
+  a ``requests`` transport adapter.
+- ``ChatOllama``, through an httpx transport passed as its client kwargs.
+  Streamed replies are recorded chunk by chunk with their arrival times.
+- yfinance calls, whose DataFrame results are recorded, since the library
+  cannot be given a transport.
+
+A cassette is a directory ``<cassette_dir>/<name>/`` with one gzipped JSON
+lines file per recording process. Each line is one interaction: a key (the
+method, the URL with its query sorted and a digest of the body), the trace id
+it was made under, its latency and the response. Replay serves the recorded
+responses of a key in order, starting over when they run out, and fails for
+requests that were not recorded. Recorded latencies are reproduced scaled by
+``latency_scale`` (0 replays instantly), so a slow trace recorded in
+production can be replayed offline with its original timing.
+
+Example:
+    just cassette-stats
+    just cassette-stats --name slow-btc-query --slowest 20
+
+"""
+
+import argparse
+import asyncio
+import atexit
+import base64
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator, Callable, Iterator
+from datetime import timedelta
+from pathlib import Path
+from typing import IO, Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+import numpy as np
+import pandas as pd
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.config_types import CassetteConfigs
+from utils.logging_setup import DEFAULT_CONFIG_PATH
+from utils.tracing import current_trace_id
+
+PROJECT_ROOT = Path(__file__).parent.parent
+# Headers describing how requests received a body, which no longer apply to
+# the decoded body it recorded.
+ENCODING_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+DIGEST_CHARS = 16
+
+
+def request_key(method: str, url: str, body: bytes | str | None) -> str:
+    """Identify a request by its method, URL (query sorted) and body digest."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    key = f"{method.upper()} {urlunsplit(parts._replace(query=query))}"
+    if body:
+        data = body.encode() if isinstance(body, str) else body
+        key += f" {hashlib.sha256(data).hexdigest()[:DIGEST_CHARS]}"
+    return key
+
+
+def encode_body(data: bytes) -> dict[str, str]:
+    """Store a body as text when it is UTF-8, as base64 otherwise."""
+    try:
+        return {"text": data.decode("utf8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(data).decode("ascii")}
+
+
+def decode_body(body: dict[str, str]) -> bytes:
+    """Return the bytes of a body stored by ``encode_body``."""
+    if "text" in body:
+        return body["text"].encode("utf8")
+    return base64.b64decode(body["base64"])
+
+
+def frame_to_json(frame: pd.DataFrame) -> dict[str, Any]:
+    """Store a DataFrame indexed by (possibly tz-aware) timestamps."""
+    index = pd.DatetimeIndex(frame.index)
+    return {
+        "index": [stamp.isoformat() for stamp in index],
+        "tz": str(index.tz) if index.tz is not None else None,
+        "name": index.name,
+        "columns": {str(column): frame[column].tolist() for column in frame.columns},
+    }
+
+
+def frame_from_json(data: dict[str, Any]) -> pd.DataFrame:
+    """Return the DataFrame stored by ``frame_to_json``."""
+    index = pd.DatetimeIndex(pd.to_datetime(data["index"], utc=data["tz"] is not None))
+    if data["tz"] is not None:
+        index = index.tz_convert(data["tz"])
+    return pd.DataFrame(data["columns"], index=index.rename(data["name"]))
+
+
+class Cassette:
+    """The recorded interactions of one cassette, for recording or replay."""
+
+    def __init__(self, configs: CassetteConfigs) -> None:
+        """Initialize the cassette, loading it when replaying.
+
+        Args:
+            configs: The cassette configuration.
+
+        Raises:
+            ValueError: If replaying a cassette that has no recordings.
+
+        """
+        self.mode = configs.mode
+        self.latency_scale = configs.latency_scale
+        self.directory = PROJECT_ROOT / configs.cassette_dir / configs.name
+        self._lock = threading.Lock()
+        self._file: IO[str] | None = None
+        self._file_pid: int | None = None
+        self._recorded: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        self._played: dict[str, int] = defaultdict(int)
+        if self.mode == "replay":
+            for interaction in load_interactions(self.directory):
+                self._recorded[interaction["key"]].append(interaction)
+            if not self._recorded:
+                error_message = f"No recorded interactions in {self.directory}"
+                raise ValueError(error_message)
+
+    def record(
+        self, kind: str, key: str, elapsed_ms: float, **response: Any,  # noqa: ANN401
+    ) -> None:
+        """Append an interaction to this process's cassette file."""
+        interaction = {
+            "kind": kind,
+            "key": key,
+            "trace_id": current_trace_id(),
+            "recorded_at": round(time.time(), 3),
+            "elapsed_ms": round(elapsed_ms, 3),
+            **response,
+        }
+        line = json.dumps(interaction, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file_pid != os.getpid():
+                # First recording in this process (a forked worker drops the
+                # parent's file rather than writing to it).
+                self.directory.mkdir(parents=True, exist_ok=True)
+                path = self.directory / f"{os.getpid()}.jsonl.gz"
+                self._file = gzip.open(path, "at", encoding="utf8")  # noqa: SIM115
+                self._file_pid = os.getpid()
+                atexit.register(self._file.close)
+            self._file.write(line)
+            self._file.flush()
+
+    def play(self, key: str) -> dict[str, Any]:
+        """Return the next recorded interaction of a request.
+
+        Raises:
+            ValueError: If the request was not recorded.
+
+        """
+        with self._lock:
+            recorded = self._recorded.get(key)
+            if not recorded:
+                error_message = f"No recorded response for {key} in {self.directory}"
+                raise ValueError(error_message)
+            index = self._played[key]
+            self._played[key] = index + 1
+        return recorded[index % len(recorded)]
+
+    def delay(self, elapsed_ms: float) -> float:
+        """Return the seconds to wait to replay a recorded latency."""
+        return elapsed_ms * self.latency_scale / 1000
+
+    def frame(self, key: str, fetch: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """Return the DataFrame of a library call, recording or replaying it.
+
+        Args:
+            key: Identifies the call (e.g. its function and arguments).
+            fetch: Makes the call.
+
+        """
+        if self.mode == "replay":
+            interaction = self.play(key)
+            time.sleep(self.delay(interaction["elapsed_ms"]))
+            return frame_from_json(interaction["frame"])
+        started = time.perf_counter()
+        result = fetch()
+        if self.mode == "record":
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.record("frame", key, elapsed_ms, frame=frame_to_json(result))
+        return result
+
+    def client_kwargs(self) -> dict[str, Any]:
+        """Return the httpx client kwargs routing a client through the cassette."""
+        if self.mode == "off":
+            return {}
+        return {"transport": CassetteTransport(self)}
+
+
+def load_interactions(directory: Path) -> list[dict[str, Any]]:
+    """Return the interactions of a cassette in the order they were recorded."""
+    interactions = []
+    for path in sorted(directory.glob("*.jsonl.gz")):
+        try:
+            with gzip.open(path, "rt", encoding="utf8") as file:
+                interactions.extend(json.loads(line) for line in file)
+        except EOFError:
+            # Still being recorded, or its process did not exit cleanly; the
+            # interactions flushed so far were read.
+            logger.warning(f"Cassette file {path} is incomplete")
+    return sorted(interactions, key=lambda interaction: interaction["recorded_at"])
+
+
+class CassetteAdapter(HTTPAdapter):
+    """Requests transport adapter recording or replaying a session's calls."""
+
+    def __init__(self, cassette: Cassette, **kwargs: Any) -> None:  # noqa: ANN401
+        """Initialize the adapter.
+
+        Args:
+            cassette: Cassette recorded to or replayed from.
+            **kwargs: Connection pool options, used when recording.
+
+        """
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(  # type: ignore[override]
+        self, request: requests.PreparedRequest, **kwargs: Any,  # noqa: ANN401
+    ) -> requests.Response:
+        """Send a request, or answer it from the cassette when replaying."""
+        key = request_key(request.method or "GET", request.url or "", request.body)
+        if self.cassette.mode == "replay":
+            interaction = self.cassette.play(key)
+            time.sleep(self.cassette.delay(interaction["elapsed_ms"]))
+            return self._replayed_response(request, interaction)
+        started = time.perf_counter()
+        response = super().send(request, **kwargs)
+        body = response.content
+        self.cassette.record(
+            "http",
+            key,
+            (time.perf_counter() - started) * 1000,
+            status=response.status_code,
+            reason=response.reason,
+            headers={
+                name: value for name, value in response.headers.items()
+                if name.lower() not in ENCODING_HEADERS
+            },
+            body=encode_body(body),
+        )
+        return response
+
+    @staticmethod
+    def _replayed_response(
+        request: requests.PreparedRequest, interaction: dict[str, Any],
+    ) -> requests.Response:
+        """Build the response of a recorded interaction."""
+        response = requests.Response()
+        response.status_code = interaction["status"]
+        response.reason = interaction["reason"]
+        response.headers = CaseInsensitiveDict(interaction["headers"])
+        response._content = decode_body(interaction["body"])  # noqa: SLF001
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url or ""
+        response.request = request
+        response.elapsed = timedelta(milliseconds=interaction["elapsed_ms"])
+        return response
+
+
+class RecordingStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Response body passing chunks through and recording when they arrived."""
+
+    def __init__(
+        self,
+        stream: Any,  # noqa: ANN401
+        started: float,
+        finish: Callable[[list[list[Any]], float], None],
+    ) -> None:
+        """Wrap the body stream of a response.
+
+        Args:
+            stream: The sync or async body stream.
+            started: ``time.perf_counter()`` when the request was sent.
+            finish: Called once with the chunks and the total milliseconds.
+
+        """
+        self._stream = stream
+        self._started = started
+        self._finish = finish
+        self._chunks: list[list[Any]] = []
+        self._finished = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        """Yield the chunks of a sync body."""
+        for chunk in self._stream:
+            self._keep(chunk)
+            yield chunk
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        """Yield the chunks of an async body."""
+        async for chunk in self._stream:
+            self._keep(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        """Close the body and record the interaction."""
+        self._stream.close()
+        self._record()
+
+    async def aclose(self) -> None:
+        """Close the body and record the interaction."""
+        await self._stream.aclose()
+        self._record()
+
+    def _keep(self, chunk: bytes) -> None:
+        """Record a chunk with the milliseconds since the request was sent."""
+        offset_ms = round((time.perf_counter() - self._started) * 1000, 3)
+        self._chunks.append([offset_ms, encode_body(chunk)])
+
+    def _record(self) -> None:
+        """Hand the recorded chunks over, once."""
+        if not self._finished:
+            self._finished = True
+            self._finish(self._chunks, (time.perf_counter() - self._started) * 1000)
+
+
+class ReplayStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Response body yielding recorded chunks at their (scaled) arrival times."""
+
+    def __init__(self, chunks: list[list[Any]], started: float, scale: float) -> None:
+        """Initialize the stream.
+
+        Args:
+            chunks: Arrival milliseconds and body of each chunk.
+            started: ``time.perf_counter()`` when the request was made.
+            scale: Fraction of the recorded arrival times reproduced.
+
+        """
+        self._chunks = chunks
+        self._started = started
+        self._scale = scale
+
+    def _pause(self, offset_ms: float) -> float:
+        """Return the seconds left until a chunk is due."""
+        due = self._started + offset_ms * self._scale / 1000
+        return max(due - time.perf_counter(), 0.0)
+
+    def __iter__(self) -> Iterator[bytes]:
+        """Yield the chunks, waiting for each to be due."""
+        for offset_ms, body in self._chunks:
+            time.sleep(self._pause(offset_ms))
+            yield decode_body(body)
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        """Yield the chunks, waiting for each to be due."""
+        for offset_ms, body in self._chunks:
+            await asyncio.sleep(self._pause(offset_ms))
+            yield decode_body(body)
+
+
+class CassetteTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """httpx transport recording or replaying calls, for sync and async clients.
+
+    One instance serves both, since ``ChatOllama`` passes the same client
+    kwargs to its sync and async clients.
+    """
+
+    def __init__(self, cassette: Cassette) -> None:
+        """Initialize the transport.
+
+        Args:
+            cassette: Cassette recorded to or replayed from.
+
+        """
+        self.cassette = cassette
+        self._transport = httpx.HTTPTransport()
+        self._async_transport = httpx.AsyncHTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, or answer it from the cassette when replaying."""
+        started = time.perf_counter()
+        key = request_key(request.method, str(request.url), request.read())
+        if self.cassette.mode == "replay":
+            interaction = self.cassette.play(key)
+            time.sleep(self.cassette.delay(interaction["headers_ms"]))
+            return self._replayed_response(interaction, started)
+        response = self._transport.handle_request(request)
+        return self._recording_response(key, response, started)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, or answer it from the cassette when replaying."""
+        started = time.perf_counter()
+        key = request_key(request.method, str(request.url), await request.aread())
+        if self.cassette.mode == "replay":
+            interaction = self.cassette.play(key)
+            await asyncio.sleep(self.cassette.delay(interaction["headers_ms"]))
+            return self._replayed_response(interaction, started)
+        response = await self._async_transport.handle_async_request(request)
+        return self._recording_response(key, response, started)
+
+    def close(self) -> None:
+        """Close the sync connection pool."""
+        self._transport.close()
+
+    async def aclose(self) -> None:
+        """Close the async connection pool."""
+        await self._async_transport.aclose()
+
+    def _replayed_response(
+        self, interaction: dict[str, Any], started: float,
+    ) -> httpx.Response:
+        """Build the response of a recorded interaction."""
+        return httpx.Response(
+            interaction["status"],
+            headers=interaction["headers"],
+            stream=ReplayStream(
+                interaction["chunks"], started, self.cassette.latency_scale,
+            ),
+        )
+
+    def _recording_response(
+        self, key: str, response: httpx.Response, started: float,
+    ) -> httpx.Response:
+        """Wrap a response so its body is recorded as it is read."""
+        headers_ms = (time.perf_counter() - started) * 1000
+        status = response.status_code
+        headers = response.headers.multi_items()
+
+        def finish(chunks: list[list[Any]], elapsed_ms: float) -> None:
+            self.cassette.record(
+                "httpx",
+                key,
+                elapsed_ms,
+                headers_ms=round(headers_ms, 3),
+                status=status,
+                headers=headers,
+                chunks=chunks,
+            )
+
+        return httpx.Response(
+            status,
+            headers=headers,
+            stream=RecordingStream(response.stream, started, finish),
+            extensions=response.extensions,
+        )
+
+
+def upstream_name(interaction: dict[str, Any]) -> str:
+    """Name the upstream of an interaction: its host, or the library called."""
+    first, _, rest = interaction["key"].partition(" ")
+    if interaction["kind"] == "frame":
+        return first
+    return urlsplit(rest.split(" ")[0]).hostname or rest
+
+
+def cassette_stats(
+    interactions: list[dict[str, Any]], slowest: int,
+) -> dict[str, Any]:
+    """Summarize recorded latencies per upstream, and the slowest calls."""
+    latencies: dict[str, list[float]] = defaultdict(list)
+    for interaction in interactions:
+        latencies[upstream_name(interaction)].append(interaction["elapsed_ms"])
+    by_slowest = sorted(interactions, key=lambda item: item["elapsed_ms"], reverse=True)
+    return {
+        "interactions": len(interactions),
+        "by_upstream": {
+            group: {
+                "count": len(values),
+                "p50_ms": round(float(np.percentile(values, 50)), 3),
+                "p95_ms": round(float(np.percentile(values, 95)), 3),
+                "max_ms": max(values),
+            }
+            for group, values in sorted(latencies.items())
+        },
+        "slowest": [
+            {
+                "key": item["key"],
+                "trace_id": item["trace_id"],
+                "elapsed_ms": item["elapsed_ms"],
+            }
+            for item in by_slowest[:slowest]
+        ],
+    }
+
+
+cassette_configs = CassetteConfigs.load_from_path(str(DEFAULT_CONFIG_PATH))
+cassette = Cassette(cassette_configs)
+
+
+def main() -> None:
+    """Print the recorded latencies of a cassette."""
+    parser = argparse.ArgumentParser(description="Summarize a recorded cassette.")
+    parser.add_argument("--name", default=cassette_configs.name)
+    parser.add_argument("--slowest", type=int, default=10)
+    args = parser.parse_args()
+    directory = PROJECT_ROOT / cassette_configs.cassette_dir / args.name
+    interactions = load_interactions(directory)
+    if not interactions:
+        sys.stderr.write(f"No recorded interactions in {directory}\n")
+        sys.exit(1)
+    results = cassette_stats(interactions, args.slowest)
+    sys.stdout.write(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
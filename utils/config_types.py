@@ -1,15 +1,19 @@
-"""Module defining configuration types for unified logging.
+"""Module defining configuration types.
 
-This module provides functions to load TOML configuration and a Pydantic model
-for logging configuration.
+This module provides functions to load TOML configuration and Pydantic models
+for the logging, profiling, upstream, cassette, load testing, benchmark,
+price cache, price refresh, spending, tenant, budget, chart, Monte Carlo and
+Plaid sections.
 """
 
 import tomllib
 from pathlib import Path
-from typing import Literal
+from typing import ClassVar, Literal, Self
 
 from pydantic import BaseModel, ConfigDict
 
+from utils.models import BudgetRule
+
 # Define project root relative to this file (utils/logging/)
 PROJECT_ROOT = Path(__file__).parent.parent  # financial_dashboard/
 
@@ -30,7 +34,29 @@ def load_toml(file_name: Path, section: str | None = None) -> dict:
         return config.get(section, config) if section else config
 
 
-class LoggingConfigs(BaseModel):
+class SectionConfigs(BaseModel):
+    """Base model for a configuration loaded from one section of a TOML file."""
+
+    model_config = ConfigDict(extra="forbid")
+    config_section: ClassVar[str]
+
+    @classmethod
+    def load_from_path(cls, file_path: str) -> Self:
+        """Load the configuration section from a file path.
+
+        Args:
+            file_path (str): The path to the TOML configuration file.
+
+        Returns:
+            Self: The loaded configuration.
+
+        """
+        return cls.model_validate(
+            load_toml(Path(file_path), section=cls.config_section),
+        )
+
+
+class LoggingConfigs(SectionConfigs):
     """Pydantic model for logging configuration.
 
     Attributes:
@@ -40,11 +66,24 @@ class LoggingConfigs(BaseModel):
         client_log_format: Log format for client logs.
         log_rotation: Log rotation time.
         log_file_name: File name for the log file.
-        log_compression: Log file compression type.
+        log_compression: Log file compression type ('zip', 'gz' or '').
+        send_hwm: Messages a client queues before discarding new ones.
+        receive_hwm: Messages the server queues before discarding new ones.
+        batch_size: Most messages the server writes per batch.
+        flush_interval_ms: Longest the server buffers written lines.
+        write_buffer_bytes: Size of the server's log file buffer.
+        stats_interval_seconds: How often the server writes its counters.
+        transport_encoding: 'msgpack' records, or 'text' lines formatted with
+            client_log_format.
+        max_field_chars: Longest text of a structured log field.
+        sample_rates: Fraction of the occurrences of an event that is logged.
+        trace_db_file: SQLite file the server saves request spans to.
+        span_window_seconds: Span of the rolling per-stage percentiles.
+        span_retention_hours: How long saved spans are kept.
 
     """
 
-    model_config = ConfigDict(extra="forbid")
+    config_section: ClassVar[str] = "logging"
     min_log_level: Literal[
         "TRACE", "DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR", "CRITICAL",
     ] = "DEBUG"
@@ -53,19 +92,296 @@ class LoggingConfigs(BaseModel):
     client_log_format: str = "{time:YYYY-MM-DD HH:mm:ss} | {file}: {line} | {message}"
     log_rotation: str = "00:00"
     log_file_name: str = str(PROJECT_ROOT / "utils" / "logs" / "logs.txt")
-    log_compression: str = "zip"
+    log_compression: Literal["zip", "gz", ""] = "zip"
+    send_hwm: int = 10_000
+    receive_hwm: int = 100_000
+    batch_size: int = 1_000
+    flush_interval_ms: int = 200
+    write_buffer_bytes: int = 1 << 20
+    stats_interval_seconds: float = 10.0
+    transport_encoding: Literal["msgpack", "text"] = "msgpack"
+    max_field_chars: int = 200
+    sample_rates: dict[str, float] = {}
+    trace_db_file: str = str(PROJECT_ROOT / "utils" / "logs" / "traces.sqlite3")
+    span_window_seconds: float = 300.0
+    span_retention_hours: float = 24.0
 
-    @staticmethod
-    def load_from_path(file_path: str) -> "LoggingConfigs":
-        """Load logging configuration from a file path.
 
-        Args:
-            file_path (str): The path to the TOML configuration file.
+class ProfilingConfigs(SectionConfigs):
+    """Pydantic model for per-request profiling.
 
-        Returns:
-            LoggingConfigs: The loaded logging configuration.
+    Attributes:
+        enabled: Mount the profiling middleware (nothing is profiled if False).
+        header: Request header asking for a profile ('1', 'true' or 'yes').
+        sample_rate: Fraction (0-1) of the other requests to profile.
+        mode: 'cprofile' (every call) or 'sampling' (stacks at an interval).
+        sampling_interval_ms: Time between stack samples in 'sampling' mode.
+        profile_dir: Directory profiles are written to.
+        max_profiles: Newest profiles kept; older ones are removed.
 
-        """
-        return LoggingConfigs.model_validate(
-            load_toml(Path(file_path), section="logging"),
-        )
+    """
+
+    config_section: ClassVar[str] = "profiling"
+    enabled: bool = False
+    header: str = "X-Profile"
+    sample_rate: float = 0.0
+    mode: Literal["cprofile", "sampling"] = "cprofile"
+    sampling_interval_ms: float = 5.0
+    profile_dir: str = str(PROJECT_ROOT / "utils" / "logs" / "profiles")
+    max_profiles: int = 100
+
+
+class UpstreamConfigs(SectionConfigs):
+    """Pydantic model for the base URLs of the upstream price APIs.
+
+    Attributes:
+        coingecko_url: Base URL of the CoinGecko API.
+        cryptocompare_url: Base URL of the CryptoCompare API.
+        yahoo_url: Base URL of the Yahoo Finance chart API; '' fetches stock
+            prices with the yfinance library instead.
+
+    """
+
+    config_section: ClassVar[str] = "upstreams"
+    coingecko_url: str = "https://api.coingecko.com"
+    cryptocompare_url: str = "https://min-api.cryptocompare.com"
+    yahoo_url: str = ""
+
+
+class CassetteConfigs(SectionConfigs):
+    """Pydantic model for recording and replaying upstream traffic.
+
+    Attributes:
+        mode: 'record' saves upstream responses to the cassette, 'replay'
+            serves them from it, 'off' leaves upstream calls alone.
+        cassette_dir: Directory of the cassettes, relative to the project root.
+        name: Cassette to record to or replay from.
+        latency_scale: Fraction of the recorded latency added to replayed
+            responses (0 replays instantly, 1 at the original speed).
+
+    """
+
+    config_section: ClassVar[str] = "cassettes"
+    mode: Literal["off", "record", "replay"] = "off"
+    cassette_dir: str = "data/cassettes"
+    name: str = "default"
+    latency_scale: float = 0.0
+
+
+class LoadTestingConfigs(SectionConfigs):
+    """Pydantic model for the capacity-finding load tests.
+
+    Attributes:
+        min_wait_seconds: Shortest pause of a simulated user between requests.
+        max_wait_seconds: Longest pause of a simulated user between requests.
+        p95_target_ms: Highest acceptable 95th percentile response time.
+        max_error_rate: Highest acceptable fraction of failed requests.
+        spawn_rate: Users started or stopped per second between stages.
+        warmup_seconds: Start of each stage left out of its measurements.
+        step_start_users: Users of the first step of the 'step' shape.
+        step_users: Users added by each further step.
+        step_seconds: Length of each step.
+        step_max_users: Users of the last step.
+        spike_base_users: Users before and after the spike.
+        spike_users: Users during the spike.
+        spike_seconds: Length of each phase of the 'spike' shape.
+        soak_users: Users of the 'soak' shape.
+        soak_seconds: Length of the 'soak' shape.
+        soak_window_seconds: Length of each measured window of the soak.
+        api_workers: API worker processes under test, to report RPS per worker.
+        results_dir: Directory results are written to.
+        baseline_dir: Directory of the baseline results of each shape.
+        rps_tolerance: Largest acceptable drop of the sustainable RPS.
+        p95_tolerance: Largest acceptable rise of a stage's p95.
+
+    """
+
+    config_section: ClassVar[str] = "load_testing"
+    min_wait_seconds: float = 1.0
+    max_wait_seconds: float = 3.0
+    p95_target_ms: float = 5000.0
+    max_error_rate: float = 0.01
+    spawn_rate: float = 5.0
+    warmup_seconds: float = 10.0
+    step_start_users: int = 5
+    step_users: int = 5
+    step_seconds: float = 60.0
+    step_max_users: int = 200
+    spike_base_users: int = 10
+    spike_users: int = 100
+    spike_seconds: float = 60.0
+    soak_users: int = 20
+    soak_seconds: float = 3600.0
+    soak_window_seconds: float = 300.0
+    api_workers: int = 1
+    results_dir: str = "load_results"
+    baseline_dir: str = "benchmarks/baselines"
+    rps_tolerance: float = 0.1
+    p95_tolerance: float = 0.2
+
+
+class BenchmarkConfigs(SectionConfigs):
+    """Pydantic model for the micro-benchmark suite.
+
+    Attributes:
+        repeat: Timed runs of each benchmark; the median is reported.
+        min_run_seconds: Shortest timed run; fast benchmarks loop until it.
+        row_counts: Sizes of the spending frames the aggregation runs on.
+        results_dir: Directory results are written to.
+        baseline_file: Baseline results, relative to the project root.
+        regression_threshold: Largest acceptable slowdown of a median.
+
+    """
+
+    config_section: ClassVar[str] = "benchmarks"
+    repeat: int = 5
+    min_run_seconds: float = 0.2
+    row_counts: list[int] = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+    results_dir: str = "bench_results"
+    baseline_file: str = "benchmarks/baselines/micro.json"
+    regression_threshold: float = 0.25
+
+
+class PriceCacheConfigs(SectionConfigs):
+    """Pydantic model for the in-memory price cache.
+
+    Attributes:
+        quote_ttl_seconds: Seconds a cached quote (or today's bar) stays fresh.
+        store_dir: Directory of the on-disk daily close store, relative to the
+            project root.
+
+    """
+
+    config_section: ClassVar[str] = "price_cache"
+    quote_ttl_seconds: float = 90.0
+    store_dir: str = "data/prices"
+
+
+class PriceRefreshConfigs(SectionConfigs):
+    """Pydantic model for the background price refresh scheduler.
+
+    Attributes:
+        enabled: Whether the API process starts the scheduler.
+        interval_seconds: Base delay between two refresh rounds.
+        jitter_seconds: Maximum random offset added to each delay.
+        stock_watchlist: Stock tickers kept warm.
+        crypto_watchlist: Crypto names or symbols kept warm.
+        vs_currency: Currency crypto quotes are refreshed in.
+        stock_requests_per_minute: Rate limit for the stock provider.
+        crypto_requests_per_minute: Rate limit for the crypto providers.
+
+    """
+
+    config_section: ClassVar[str] = "price_refresh"
+    enabled: bool = False
+    interval_seconds: float = 30.0
+    jitter_seconds: float = 5.0
+    stock_watchlist: list[str] = []
+    crypto_watchlist: list[str] = []
+    vs_currency: str = "usd"
+    stock_requests_per_minute: int = 60
+    crypto_requests_per_minute: int = 30
+
+
+class SpendingConfigs(SectionConfigs):
+    """Pydantic model for spending data loading.
+
+    Attributes:
+        stream_threshold_mb: Files larger than this are ingested in chunks
+            into aggregates instead of being loaded whole.
+        chunk_rows: Rows per chunk when streaming a transaction file.
+        aggregates_dir: Directory of persisted spending aggregates, relative
+            to the project root.
+
+    """
+
+    config_section: ClassVar[str] = "spending"
+    stream_threshold_mb: float = 64.0
+    chunk_rows: int = 500_000
+    aggregates_dir: str = "data/aggregates"
+
+
+class TenantConfigs(SectionConfigs):
+    """Pydantic model for per-tenant spending storage.
+
+    Attributes:
+        root_dir: Directory holding one sub-directory per tenant, relative to
+            the project root.
+        memory_budget_mb: Memory the cache of hot tenants may hold.
+
+    """
+
+    config_section: ClassVar[str] = "tenants"
+    root_dir: str = "data/tenants"
+    memory_budget_mb: float = 256.0
+
+
+class BudgetConfigs(SectionConfigs):
+    """Pydantic model for the budget rule engine.
+
+    Attributes:
+        state_dir: Directory of the engine's snapshots and alerts, relative
+            to the project root.
+        rules: Budget rules evaluated for every tenant.
+
+    """
+
+    config_section: ClassVar[str] = "budget"
+    state_dir: str = "data/budget"
+    rules: list[BudgetRule] = []
+
+
+class ChartConfigs(SectionConfigs):
+    """Pydantic model for the rendered chart cache.
+
+    Attributes:
+        cache_dir: Directory of the cached charts, relative to the project root.
+        workers: Processes rendering charts that are not cached yet.
+        max_charts: Charts kept on disk; the least recently used are removed.
+        render_timeout_seconds: Longest a request waits for a chart to render.
+
+    """
+
+    config_section: ClassVar[str] = "charts"
+    cache_dir: str = "ui/assets/charts"
+    workers: int = 2
+    max_charts: int = 1000
+    render_timeout_seconds: float = 30.0
+
+
+class MonteCarloConfigs(SectionConfigs):
+    """Pydantic model for the Monte Carlo simulation engine.
+
+    Attributes:
+        workers: Processes running simulation chunks (0 for one per CPU).
+        chunk_paths: Paths simulated per chunk, which bounds worker memory.
+        histogram_bins: Log-spaced bins per year used to merge chunk results.
+
+    """
+
+    config_section: ClassVar[str] = "monte_carlo"
+    workers: int = 0
+    chunk_paths: int = 100_000
+    histogram_bins: int = 8192
+
+
+class PlaidConfigs(SectionConfigs):
+    """Pydantic model for the Plaid transaction sync.
+
+    Attributes:
+        host: Base URL of the Plaid API (or of the local stand-in).
+        client_id: Plaid client id; the PLAID_CLIENT_ID variable overrides it.
+        secret: Plaid secret; the PLAID_SECRET variable overrides it.
+        items: Access tokens of the linked items to sync, per tenant id.
+        page_size: Transactions requested per sync page (at most 500).
+        workers: Items synced concurrently.
+
+    """
+
+    config_section: ClassVar[str] = "plaid"
+    host: str = "https://sandbox.plaid.com"
+    client_id: str = ""
+    secret: str = ""
+    items: dict[str, list[str]] = {}
+    page_size: int = 500
+    workers: int = 8
@@ -0,0 +1,54 @@
+"""Shared HTTP client for upstream APIs.
+
+All calls to upstream HTTP APIs go through ``http_session``, a single
+``requests`` session that keeps connections to each host open between calls,
+so repeated calls to the same API skip the TCP and TLS handshakes. Each call
+runs in an ``http.<host>`` span of the active trace and sends the trace
+headers along. When cassettes are on, calls are recorded to or replayed from
+the cassette (see ``utils/cassettes.py``).
+"""
+
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.cassettes import CassetteAdapter, cassette
+from utils.tracing import span, trace_headers
+
+# Hosts to keep connections to, and connections kept per host.
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 20
+
+
+class TracedSession(requests.Session):
+    """Requests session recording every request as a span of the active trace."""
+
+    def __init__(self) -> None:
+        """Initialize the session with pooled adapters."""
+        super().__init__()
+        pool = {"pool_connections": POOL_CONNECTIONS, "pool_maxsize": POOL_MAXSIZE}
+        adapter = (
+            HTTPAdapter(**pool)
+            if cassette.mode == "off"
+            else CassetteAdapter(cassette, **pool)
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(  # type: ignore[override]
+        self, method: str, url: str, **kwargs: Any,  # noqa: ANN401
+    ) -> requests.Response:
+        """Send a request in a span named after its host."""
+        with span(f"http.{urlsplit(url).hostname}", method=method) as opened:
+            headers = trace_headers()
+            if headers:
+                kwargs["headers"] = {**headers, **(kwargs.get("headers") or {})}
+            response = super().request(method, url, **kwargs)
+            if opened is not None:
+                opened.fields["status_code"] = response.status_code
+            return response
+
+
+http_session = TracedSession()
@@ -2,42 +2,186 @@
 
 This module implements a logging client that sends log messages over the network
 to a logging server, enabling multiple processes to consolidate logs.
+
+Each process has one ZMQ PUB socket and one Loguru sink, however many times
+the client is set up. A process forked from one that already set it up gets
+its own context, socket and sink on the next setup, since ZMQ sockets do not
+survive a fork.
+
+Every message carries the id of its publisher and a sequence number. A PUB
+socket silently discards messages once its high-water mark is reached, so the
+server counts the gaps in each publisher's sequence as dropped messages.
+
+Records are sent as compact msgpack maps (time, file, line, message and the
+bound fields) and laid out as text by the server, so clients spend no time
+formatting lines. The 'text' encoding sends lines formatted with
+``client_log_format`` instead. Records are published directly from the
+logging thread: a non-blocking send costs less than handing the record to
+Loguru's queue, which pickles every record.
 """
 
 from __future__ import annotations
 
+import os
+import struct
+import threading
 from typing import TYPE_CHECKING
 
+import msgpack
 import zmq
-from zmq.log.handlers import PUBHandler
 
 if TYPE_CHECKING:
-    from loguru import Logger
+    from loguru import Logger, Message
 
     from utils.config_types import LoggingConfigs
 
+# Milliseconds a closing socket keeps trying to deliver queued messages.
+CLOSE_LINGER_MS = 1000
+# Third frame of every message: publisher id, sequence number and encoding.
+HEADER_FORMAT = "!8sQB"
+PUBLISHER_ID_BYTES = 8
+ENCODINGS = {"text": 0, "msgpack": 1}
+
+_lock = threading.Lock()
+_state: dict[str, object] = {
+    "pid": None, "socket": None, "sink": None, "handler_id": None,
+}
+
+
+def format_fields(fields: dict[str, object]) -> str:
+    """Render the fields bound to a record as ' | name=value ...' ('' if none)."""
+    if not fields:
+        return ""
+    return " | " + " ".join(
+        f"{name}={value!r}" if isinstance(value, str) else f"{name}={value}"
+        for name, value in fields.items()
+    )
+
+
+def encode_record(message: Message) -> bytes:
+    """Pack a record (formatted as just its message) into a msgpack map."""
+    record = message.record
+    return msgpack.packb(
+        {
+            "time": record["time"].timestamp(),
+            "file": record["file"].name,
+            "line": record["line"],
+            # Includes the traceback of a logged exception.
+            "message": message.rstrip("\n"),
+            "extra": record["extra"],
+        },
+        default=str,
+    )
+
+
+class NetworkSink:
+    """Loguru sink publishing messages as [level, payload, header] frames.
+
+    Loguru calls it under the handler's lock, so one thread at a time uses the
+    socket and the counters need no lock of their own.
+    """
+
+    def __init__(self, socket: zmq.Socket, encoding: str = "msgpack") -> None:
+        """Initialize the sink.
+
+        Args:
+            socket: Connected PUB socket.
+            encoding: 'msgpack' for records, or 'text' for formatted lines.
+
+        """
+        self.socket = socket
+        self.encoding = encoding
+        self.publisher = os.urandom(PUBLISHER_ID_BYTES)
+        self.sequence = 0
+        self.sent = 0
+        self.errors = 0
+
+    def __call__(self, message: Message) -> None:
+        """Publish one message without blocking."""
+        self.sequence += 1
+        header = struct.pack(
+            HEADER_FORMAT, self.publisher, self.sequence, ENCODINGS[self.encoding],
+        )
+        if self.encoding == "msgpack":
+            payload = encode_record(message)
+        else:
+            payload = (
+                message.rstrip("\n") + format_fields(message.record["extra"])
+            ).encode()
+        try:
+            self.socket.send_multipart(
+                [message.record["level"].name.encode(), payload, header],
+                flags=zmq.NOBLOCK,
+            )
+        except zmq.ZMQError:
+            # Leaves a gap in the sequence, so the server counts it as dropped.
+            self.errors += 1
+        else:
+            self.sent += 1
+
 
 def setup_network_logger_client(
     logging_configs: LoggingConfigs, logger: Logger,
-) -> None:
+) -> bool:
     """Set up a network logger client that sends log messages via ZMQ.
 
+    Only the first call in a process does anything; later calls return
+    immediately.
+
     Args:
         logging_configs (LoggingConfigs): The logging configuration.
         logger (Logger): The Loguru logger instance.
 
+    Returns:
+        bool: Whether this call set up the client.
+
     """
-    zmq_socket = zmq.Context().socket(zmq.PUB)
-    zmq_socket.connect(f"tcp://127.0.0.1:{logging_configs.log_server_port}")
-    handler = PUBHandler(zmq_socket)
-
-    # Remove previous settings to prevent logging to stderr and log only to file.
-    logger.remove()
-    logger.add(
-        handler,
-        format=logging_configs.client_log_format,
-        enqueue=True,
-        level=logging_configs.min_log_level,
-        backtrace=True,  # Detailed error traces.
-        diagnose=True,   # Enable exception diagnostics.
-    )
+    with _lock:
+        pid = os.getpid()
+        if _state["pid"] == pid:
+            return False
+        if _state["pid"] is None:
+            # Remove previous settings to prevent logging to stderr and log
+            # only to file.
+            logger.remove()
+        else:
+            # Forked: the parent's sink and socket belong to the parent. The
+            # socket is dropped rather than closed, which ZMQ forbids here.
+            logger.remove(_state["handler_id"])
+
+        # Context.instance() is per process: it makes a new context after a fork.
+        zmq_socket = zmq.Context.instance().socket(zmq.PUB)
+        zmq_socket.setsockopt(zmq.SNDHWM, logging_configs.send_hwm)
+        zmq_socket.connect(f"tcp://127.0.0.1:{logging_configs.log_server_port}")
+        sink = NetworkSink(zmq_socket, logging_configs.transport_encoding)
+        _state["handler_id"] = logger.add(
+            sink,
+            format=(
+                "{message}"
+                if logging_configs.transport_encoding == "msgpack"
+                else logging_configs.client_log_format
+            ),
+            level=logging_configs.min_log_level,
+            backtrace=True,  # Detailed error traces.
+            diagnose=True,   # Enable exception diagnostics.
+        )
+        _state.update(pid=pid, socket=zmq_socket, sink=sink)
+        return True
+
+
+def network_logger_stats() -> dict[str, int]:
+    """Return the messages this process published and failed to publish."""
+    sink = _state["sink"] if _state["pid"] == os.getpid() else None
+    if sink is None:
+        return {"sent": 0, "errors": 0}
+    return {"sent": sink.sent, "errors": sink.errors}
+
+
+def shutdown_network_logger_client(logger: Logger) -> None:
+    """Flush and remove the network sink and close its socket."""
+    with _lock:
+        if _state["pid"] != os.getpid():
+            return
+        logger.remove(_state["handler_id"])
+        _state["socket"].close(linger=CLOSE_LINGER_MS)
+        _state.update(pid=None, socket=None, sink=None, handler_id=None)
@@ -2,65 +2,366 @@
 
 This module implements a logging server that receives log messages over the network
 and logs them to a file.
+
+Messages are drained in batches whenever the socket is readable and appended
+to the log file through a large buffer that is flushed periodically, so a
+burst of messages costs one write instead of one per line. Rotated files are
+compressed by a background thread, off the receive loop. The server counts
+the messages it received, wrote and filtered, and the messages publishers
+dropped (gaps in their sequence numbers), and writes these counters next to
+the log file. Records sent as msgpack are laid out like the default client
+format, followed by their fields. The spans of traced requests (``span.end``
+records) are also saved to the span store, which aggregates their durations
+per stage.
+
+Example:
+    just start-logging-server
+
 """
+import gzip
+import json
+import os
+import queue
+import shutil
+import struct
 import sys
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import datetime, timedelta
 from pathlib import Path
 
+import msgpack
 import zmq
 
 sys.path.append(str(Path(__file__).parent.parent))
 from loguru import logger
 
 from utils.config_types import LoggingConfigs
-from utils.logging_setup import setup_logging
+from utils.logging_client import ENCODINGS, HEADER_FORMAT, format_fields
+from utils.logging_setup import load_logging_configs
+from utils.span_store import SpanStore
 
 # Define project root
 PROJECT_ROOT = Path(__file__).parent.parent  # financial_dashboard/
 DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
+LEVEL_NUMBERS = {
+    "TRACE": 5,
+    "DEBUG": 10,
+    "INFO": 20,
+    "SUCCESS": 25,
+    "WARNING": 30,
+    "ERROR": 40,
+    "CRITICAL": 50,
+}
+SIZE_UNITS = {"KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+FRAMES_WITH_HEADER = 3
+FRAMES_WITHOUT_HEADER = 2
 
-def set_logging_configs(logging_configs: LoggingConfigs) -> None:
-    """Configure the logger with the provided logging settings.
 
-    Args:
-        logging_configs (LoggingConfigs): The logging configuration to apply.
+def parse_rotation(rotation: str) -> tuple[int | None, tuple[int, int] | None]:
+    """Parse a rotation setting: a daily time ('00:00') or a size ('100 MB').
+
+    Returns:
+        tuple: The size limit in bytes and the (hour, minute) of the daily
+        rotation; one of them is None ('' disables rotation).
+
+    Raises:
+        ValueError: If the setting is neither.
 
     """
-    logger.remove()
-    logger.add(
-        logging_configs.log_file_name,
-        rotation=logging_configs.log_rotation,
-        compression=logging_configs.log_compression,
-        format=logging_configs.server_log_format,
-        level=logging_configs.min_log_level,
-        enqueue=True,
-        backtrace=True,
-        diagnose=True,
+    rotation = rotation.strip().upper()
+    if not rotation:
+        return None, None
+    try:
+        if ":" in rotation:
+            daily = datetime.strptime(rotation, "%H:%M")  # noqa: DTZ007
+            return None, (daily.hour, daily.minute)
+        amount, unit = rotation.split()
+        return int(float(amount) * SIZE_UNITS[unit]), None
+    except (KeyError, ValueError) as e:
+        error_message = f"Unsupported log rotation {rotation!r}"
+        raise ValueError(error_message) from e
+
+
+def render_record(record: dict) -> str:
+    """Lay out a msgpack record like the default client format, plus its fields."""
+    time_text = (
+        datetime.fromtimestamp(record["time"]).astimezone().strftime(
+            "%Y-%m-%d %H:%M:%S",
+        )
+    )
+    return (
+        f"{time_text} | {record['file']}: {record['line']} | {record['message']}"
+        f"{format_fields(record['extra'])}"
     )
 
 
-def start_logging_server(logging_configs: LoggingConfigs) -> None:
+def compress_file(path: Path, compression: str) -> Path:
+    """Compress a file next to itself and remove the original.
+
+    Returns:
+        Path: The compressed file.
+
+    """
+    target = path.with_name(f"{path.name}.{compression}")
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    os.close(fd)
+    try:
+        if compression == "zip":
+            with zipfile.ZipFile(tmp_name, "w", zipfile.ZIP_DEFLATED) as archive:
+                archive.write(path, arcname=path.name)
+        else:
+            with path.open("rb") as source, gzip.open(tmp_name, "wb") as compressed:
+                shutil.copyfileobj(source, compressed)
+        Path(tmp_name).replace(target)
+    finally:
+        Path(tmp_name).unlink(missing_ok=True)
+    path.unlink()
+    return target
+
+
+class RotatingLogWriter:
+    """Buffered log file, rotated by time or size and compressed in the background."""
+
+    def __init__(
+        self, path: Path, rotation: str, compression: str, buffer_bytes: int,
+    ) -> None:
+        """Open the log file for appending.
+
+        Args:
+            path: Log file.
+            rotation: Daily time ('00:00') or size ('100 MB') to rotate at.
+            compression: 'zip', 'gz' or '' for rotated files.
+            buffer_bytes: Size of the write buffer.
+
+        """
+        self.path = path
+        self.max_bytes, self.rotation_time = parse_rotation(rotation)
+        self.compression = compression
+        self.buffer_bytes = buffer_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._compress_queue: queue.Queue[Path | None] = queue.Queue()
+        self._compressor = threading.Thread(
+            target=self._compress_rotated, name="log-compressor", daemon=True,
+        )
+        self._compressor.start()
+        self._open()
+
+    def write(self, lines: list[str]) -> None:
+        """Append lines (each ending in a newline), rotating first if due."""
+        if (self.max_bytes is not None and self._size >= self.max_bytes) or (
+            self._rotate_at is not None
+            and datetime.now().astimezone() >= self._rotate_at
+        ):
+            self.rotate()
+        data = "".join(lines)
+        self._file.write(data)
+        self._size += len(data)
+
+    def flush(self) -> None:
+        """Write the buffered lines to the file."""
+        self._file.flush()
+
+    def rotate(self) -> None:
+        """Move the current file aside, queue it for compression and start a new one."""
+        self._file.close()
+        if self.path.stat().st_size:
+            stamp = datetime.now().astimezone().strftime("%Y-%m-%d_%H-%M-%S_%f")
+            rotated = self.path.with_name(f"{self.path.stem}.{stamp}{self.path.suffix}")
+            self.path.replace(rotated)
+            if self.compression:
+                self._compress_queue.put(rotated)
+        self._open()
+
+    def close(self) -> None:
+        """Flush and close the file and wait for pending compressions."""
+        self._file.close()
+        self._compress_queue.put(None)
+        self._compressor.join()
+
+    def _open(self) -> None:
+        """Open the log file and schedule its next time-based rotation."""
+        self._file = self.path.open(
+            "a", encoding="utf8", buffering=self.buffer_bytes,
+        )
+        self._size = self.path.stat().st_size
+        self._rotate_at = None
+        if self.rotation_time is not None:
+            now = datetime.now().astimezone()
+            hour, minute = self.rotation_time
+            self._rotate_at = now.replace(
+                hour=hour, minute=minute, second=0, microsecond=0,
+            )
+            if self._rotate_at <= now:
+                self._rotate_at += timedelta(days=1)
+
+    def _compress_rotated(self) -> None:
+        """Compress rotated files as they are queued (background thread)."""
+        while (path := self._compress_queue.get()) is not None:
+            try:
+                compress_file(path, self.compression)
+            except OSError as e:
+                logger.error(f"Failed to compress rotated log {path}: {e}")
+
+
+class LogServer:
+    """Receives log messages from all processes and writes them in batches."""
+
+    def __init__(
+        self, logging_configs: LoggingConfigs, context: zmq.Context | None = None,
+    ) -> None:
+        """Bind the receiving socket and open the log file.
+
+        Args:
+            logging_configs: The logging configuration including server port.
+            context: ZMQ context to use (default: the process-wide one).
+
+        """
+        self.configs = logging_configs
+        self.min_level = LEVEL_NUMBERS[logging_configs.min_log_level]
+        self.counters = dict.fromkeys(
+            ["received", "written", "filtered", "malformed", "dropped", "batches"], 0,
+        )
+        self.stats_path = Path(logging_configs.log_file_name).with_suffix(
+            ".stats.json",
+        )
+        self._sequences: dict[bytes, int] = {}
+        self.span_store = SpanStore(
+            Path(logging_configs.trace_db_file),
+            logging_configs.span_window_seconds,
+            logging_configs.span_retention_hours,
+        )
+        self.writer = RotatingLogWriter(
+            Path(logging_configs.log_file_name),
+            logging_configs.log_rotation,
+            logging_configs.log_compression,
+            logging_configs.write_buffer_bytes,
+        )
+        self.socket = (context or zmq.Context.instance()).socket(zmq.SUB)
+        self.socket.setsockopt(zmq.RCVHWM, logging_configs.receive_hwm)
+        self.socket.bind(f"tcp://127.0.0.1:{logging_configs.log_server_port}")
+        self.socket.subscribe("")
+
+    def run(self, stop: threading.Event | None = None) -> None:
+        """Receive and write messages until ``stop`` is set (forever if None)."""
+        poller = zmq.Poller()
+        poller.register(self.socket, zmq.POLLIN)
+        flush_interval = self.configs.flush_interval_ms / 1000
+        last_flush = last_stats = time.monotonic()
+        try:
+            while stop is None or not stop.is_set():
+                if poller.poll(self.configs.flush_interval_ms):
+                    self._drain()
+                now = time.monotonic()
+                if now - last_flush >= flush_interval:
+                    self.writer.flush()
+                    last_flush = now
+                if now - last_stats >= self.configs.stats_interval_seconds:
+                    self.write_stats()
+                    last_stats = now
+            self._drain()
+        finally:
+            self.close()
+
+    def stats(self) -> dict[str, int]:
+        """Return the message counters, publishers seen and spans saved."""
+        return {
+            **self.counters,
+            "publishers": len(self._sequences),
+            "spans": self.span_store.spans,
+        }
+
+    def write_stats(self) -> None:
+        """Write the counters next to the log file, and the span percentiles."""
+        self.span_store.write_stats()
+        fd, tmp_name = tempfile.mkstemp(dir=self.stats_path.parent, prefix=".tmp-")
+        with os.fdopen(fd, "w") as file:
+            json.dump(self.stats(), file)
+        Path(tmp_name).replace(self.stats_path)
+
+    def close(self) -> None:
+        """Close the socket and the log file, and write the final counters."""
+        self.socket.close(linger=0)
+        self.writer.close()
+        self.write_stats()
+        self.span_store.close()
+
+    def _drain(self) -> None:
+        """Receive up to a batch of queued messages and write them at once."""
+        lines = []
+        for _ in range(self.configs.batch_size):
+            try:
+                frames = self.socket.recv_multipart(zmq.NOBLOCK)
+            except zmq.Again:
+                break
+            line = self._format(frames)
+            if line is not None:
+                lines.append(line)
+        if lines:
+            self.writer.write(lines)
+            self.counters["written"] += len(lines)
+            self.counters["batches"] += 1
+        self.span_store.flush()
+
+    def _format(self, frames: list[bytes]) -> str | None:
+        """Turn one message into a log line; None if it is not written."""
+        self.counters["received"] += 1
+        encoding = ENCODINGS["text"]
+        if len(frames) == FRAMES_WITH_HEADER and len(frames[2]) == HEADER_SIZE:
+            encoding = self._count_dropped(frames[2])
+        elif len(frames) != FRAMES_WITHOUT_HEADER:
+            self.counters["malformed"] += 1
+            return None
+        level = frames[0].decode("utf8", errors="replace").strip()
+        if LEVEL_NUMBERS.get(level, self.min_level) < self.min_level:
+            self.counters["filtered"] += 1
+            return None
+        if encoding == ENCODINGS["msgpack"]:
+            try:
+                record = msgpack.unpackb(frames[1])
+                if record["message"] == "span.end":
+                    self.span_store.add(record)
+                message = render_record(record)
+            except (ValueError, KeyError, TypeError, msgpack.UnpackException):
+                self.counters["malformed"] += 1
+                return None
+        else:
+            message = frames[1].decode("utf8", errors="replace").strip()
+        line = self.configs.server_log_format.format(level=level, message=message)
+        return f"{line}\n"
+
+    def _count_dropped(self, header: bytes) -> int:
+        """Count the messages missing between a publisher's sequence numbers.
+
+        Returns:
+            int: The encoding of the message.
+
+        """
+        publisher, sequence, encoding = struct.unpack(HEADER_FORMAT, header)
+        last = self._sequences.get(publisher)
+        if last is not None and sequence > last + 1:
+            self.counters["dropped"] += sequence - last - 1
+        self._sequences[publisher] = sequence
+        return encoding
+
+
+def start_logging_server(
+    logging_configs: LoggingConfigs, stop: threading.Event | None = None,
+) -> None:
     """Start the logging server to receive and process log messages.
 
     Args:
         logging_configs (LoggingConfigs): The logging configuration including
         server port.
+        stop: Optional event that stops the server when set.
 
     """
-    socket = zmq.Context().socket(zmq.SUB)
-    socket.bind(f"tcp://127.0.0.1:{logging_configs.log_server_port}")
-    socket.subscribe("")
-    while True:
-        try:
-            ret_val = socket.recv_multipart()
-            log_level_name, message = ret_val
-            log_level_name = log_level_name.decode("utf8").strip()
-            message = message.decode("utf8").strip()
-            logger.log(log_level_name, message)
-        except zmq.ZMQError as e:
-            logger.exception(f"ZMQ error when logging: {e}")
+    LogServer(logging_configs).run(stop)
 
 
 if __name__ == "__main__":
-    logging_configs = setup_logging(str(DEFAULT_CONFIG_PATH))
-    set_logging_configs(logging_configs)
+    logging_configs = load_logging_configs(DEFAULT_CONFIG_PATH.resolve())
     start_logging_server(logging_configs)
@@ -2,22 +2,45 @@
 
 This module provides a function to set up logging using a TOML configuration file.
 It falls back to a default configuration if loading fails.
+
+Every module calls ``setup_logging`` when it is imported, so the call is
+idempotent: configurations are loaded once per path, and the network client
+is set up once per process (again in a forked child).
 """
 
+import atexit
+from functools import lru_cache
 from pathlib import Path
 
 from loguru import logger
 
 from utils.config_types import LoggingConfigs
-from utils.logging_client import setup_network_logger_client
+from utils.logging_client import (
+    setup_network_logger_client,
+    shutdown_network_logger_client,
+)
 
 # Define project root relative to this file (unified_logging/)
 PROJECT_ROOT = Path(__file__).parent.parent
 DEFAULT_CONFIG_PATH = PROJECT_ROOT / "utils" / "configs.toml"
 
+
+@lru_cache(maxsize=8)
+def load_logging_configs(config_path: Path) -> LoggingConfigs:
+    """Load the logging configuration of a file, once per resolved path."""
+    try:
+        return LoggingConfigs.load_from_path(config_path)
+    except (FileNotFoundError, ValueError) as e:
+        logger.error(f"Failed to load logging config from {config_path}: {e}")
+        return LoggingConfigs()  # Fallback to defaults
+
+
 def setup_logging(config_path: str = str(DEFAULT_CONFIG_PATH)) -> LoggingConfigs:
     """Set up unified network logging with a specified config file.
 
+    The first call in a process sets up the network client; later calls only
+    return the (cached) configuration of their file.
+
     Args:
         config_path (str): Path to the logging config file (default:
             project_root/unified_logging/configs.toml).
@@ -26,19 +49,16 @@ def setup_logging(config_path: str = str(DEFAULT_CONFIG_PATH)) -> LoggingConfigs
         LoggingConfigs: Loaded logging configuration.
 
     """
-    try:
-        config_file = Path(config_path)
-        logging_configs = LoggingConfigs.load_from_path(config_file)
-    except (FileNotFoundError, ValueError) as e:
-        logger.error(f"Failed to load logging config from {config_path}: {e}")
-        logging_configs = LoggingConfigs()  # Fallback to defaults
+    logging_configs = load_logging_configs(Path(config_path).resolve())
 
     # Set up network logging.
-    setup_network_logger_client(logging_configs, logger)
-
-    logger.info(f"Unified logging initialized with config from {config_path}")
+    if setup_network_logger_client(logging_configs, logger):
+        logger.info(f"Unified logging initialized with config from {config_path}")
     return logging_configs
 
+
+atexit.register(shutdown_network_logger_client, logger)
+
 if __name__ == "__main__":
     setup_logging()
     logger.debug("Test debug message")
@@ -1,9 +1,12 @@
 """Pydantic models for data validation."""
 
+import calendar
 from datetime import UTC, datetime
-from typing import Any, ClassVar
+from typing import ClassVar, Literal
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+TENANT_ID_PATTERN = r"^[A-Za-z0-9_-]{1,64}$"
 
 
 class EmergencyFundInput(BaseModel):
@@ -44,6 +47,77 @@ class EmergencyFundInput(BaseModel):
         return value
 
 
+class EmergencyFundProjectionInput(BaseModel):
+    """Pydantic model for validating inputs to the emergency fund projection."""
+
+    MAX_SCENARIOS: ClassVar[int] = 20
+
+    tenant_id: str | None = Field(
+        None,
+        pattern=TENANT_ID_PATTERN,
+        description=(
+            "Optional tenant (user) id whose stored spending to use; takes "
+            "precedence over data_source."
+        ),
+    )
+    data_source: str | None = Field(
+        None,
+        description=(
+            "Optional path to a CSV file or Parquet dataset with 'category', "
+            "'amount', 'year' and 'month' columns. Defaults to the bundled "
+            "spending history."
+        ),
+    )
+    year: int | None = Field(
+        None,
+        description="Optional year whose months to base expenses on (default all).",
+    )
+    expense_basis: Literal["mean", "p90"] = Field(
+        "p90",
+        description=(
+            "Monthly expenses to cover: the average month, or the 90th-percentile "
+            "month so that expensive months are covered too."
+        ),
+    )
+    financial_obligations: float = Field(
+        0.0,
+        ge=0,
+        description="Additional monthly financial obligations (e.g., debt payments).",
+    )
+    months_coverage: int = Field(
+        6, ge=1, le=60, description="Desired coverage period in months.",
+    )
+    current_savings: float = Field(
+        0.0, ge=0, description="Amount already saved for emergencies.",
+    )
+    monthly_contributions: list[float] = Field(
+        [250.0, 500.0, 1000.0],
+        min_length=1,
+        description="Monthly savings amounts to project, one scenario each.",
+    )
+    annual_interest_rate: float = Field(
+        0.0,
+        ge=0,
+        le=20,
+        description="Interest earned on the fund as a percentage (e.g., 4 for 4%).",
+    )
+    horizon_months: int = Field(
+        60, ge=1, le=600, description="Months to project the savings over.",
+    )
+
+    @field_validator("monthly_contributions")
+    @classmethod
+    def validate_contributions(cls, value: list[float]) -> list[float]:
+        """Ensure a bounded number of non-negative contribution scenarios."""
+        if len(value) > cls.MAX_SCENARIOS:
+            error_message = f"At most {cls.MAX_SCENARIOS} contribution scenarios"
+            raise ValueError(error_message)
+        if any(amount < 0 for amount in value):
+            error_message = "Monthly contributions cannot be negative."
+            raise ValueError(error_message)
+        return value
+
+
 class StockPriceInput(BaseModel):
     """Pydantic model for validating inputs to the stock price checker."""
 
@@ -103,6 +177,172 @@ class InvestmentReturnInput(BaseModel):
         return value
 
 
+class ParameterRange(BaseModel):
+    """Evenly spaced values from ``start`` to ``stop``, both included."""
+
+    start: float = Field(..., description="First value.")
+    stop: float = Field(..., description="Last value.")
+    num: int = Field(..., ge=1, le=10_000, description="Number of values.")
+
+
+class InvestmentGridInput(BaseModel):
+    """Pydantic model for a what-if grid of investment returns.
+
+    Each parameter is either a list of values or a range; every combination
+    of the three is evaluated.
+    """
+
+    MAX_CELLS: ClassVar[int] = 1_000_000
+    initial_amounts: list[float] | ParameterRange = Field(
+        ..., description="Initial investment amounts in dollars.",
+    )
+    years: list[float] | ParameterRange = Field(
+        ..., description="Investment periods in years.",
+    )
+    annual_returns: list[float] | ParameterRange = Field(
+        ..., description="Annual return rates as percentages (e.g., 5 for 5%).",
+    )
+
+    @model_validator(mode="after")
+    def validate_grid(self) -> "InvestmentGridInput":
+        """Ensure the grid is not empty or too large and values are in range."""
+        sizes = [
+            value.num if isinstance(value, ParameterRange) else len(value)
+            for value in (self.initial_amounts, self.years, self.annual_returns)
+        ]
+        if 0 in sizes:
+            error_message = "Every grid parameter needs at least one value."
+            raise ValueError(error_message)
+        if sizes[0] * sizes[1] * sizes[2] > self.MAX_CELLS:
+            error_message = f"The grid cannot have more than {self.MAX_CELLS} cells."
+            raise ValueError(error_message)
+        bounds = [
+            (value.start, value.stop) if isinstance(value, ParameterRange) else value
+            for value in (self.initial_amounts, self.years, self.annual_returns)
+        ]
+        if min(bounds[0]) <= 0 or min(bounds[1]) <= 0:
+            error_message = "Initial amounts and years must be positive."
+            raise ValueError(error_message)
+        if min(bounds[2]) < InvestmentReturnInput.MIN_ANNUAL_RETURN:
+            error_message = "Annual return cannot be less than -100%."
+            raise ValueError(error_message)
+        return self
+
+
+class MonteCarloInput(BaseModel):
+    """Pydantic model for a Monte Carlo simulation of investment outcomes."""
+
+    initial_amount: float = Field(
+        ..., gt=0, description="Initial investment amount in dollars.",
+    )
+    years: int = Field(..., ge=1, le=100, description="Years to simulate.")
+    annual_contribution: float = Field(
+        0.0, ge=0, description="Amount added at the end of every year.",
+    )
+    distribution: Literal["normal", "lognormal", "bootstrap"] = Field(
+        "lognormal",
+        description=(
+            "How yearly returns are drawn: 'normal' or 'lognormal' with the given "
+            "mean and volatility, or 'bootstrap' from the stored price history "
+            "of 'symbol'."
+        ),
+    )
+    mean_return: float = Field(
+        7.0,
+        gt=-100,
+        description="Expected annual return as a percentage (e.g., 7 for 7%).",
+    )
+    volatility: float = Field(
+        15.0, ge=0, le=1000, description="Annual volatility as a percentage.",
+    )
+    symbol: str | None = Field(
+        None, description="Asset whose historical returns are bootstrapped.",
+    )
+    asset_class: Literal["stock", "crypto"] = Field(
+        "stock", description="Asset class of 'symbol'.",
+    )
+    simulations: int = Field(
+        100_000, ge=100, le=5_000_000, description="Number of simulated paths.",
+    )
+    percentiles: list[float] = Field(
+        [5, 10, 25, 50, 75, 90, 95],
+        min_length=1,
+        description="Percentiles of the outcome to report (0-100).",
+    )
+    seed: int | None = Field(
+        None, ge=0, description="Seed for reproducible results (random if None).",
+    )
+
+    @model_validator(mode="after")
+    def validate_simulation(self) -> "MonteCarloInput":
+        """Ensure bootstrap runs name a symbol and percentiles are in range."""
+        if self.distribution == "bootstrap" and not self.symbol:
+            error_message = "Bootstrapping returns needs a 'symbol'."
+            raise ValueError(error_message)
+        if not all(0 <= percentile <= 100 for percentile in self.percentiles):  # noqa: PLR2004
+            error_message = "Percentiles must be between 0 and 100."
+            raise ValueError(error_message)
+        return self
+
+
+class BacktestInput(BaseModel):
+    """Pydantic model for backtesting a portfolio over stored price history."""
+
+    allocations: dict[str, float] = Field(
+        ...,
+        min_length=1,
+        description=(
+            "Target weight per asset, e.g. {'AAPL': 60, 'crypto:BTC': 40}; "
+            "weights are normalized to sum to 1. Crypto symbols take a "
+            "'crypto:' prefix."
+        ),
+    )
+    initial_amount: float = Field(
+        ..., gt=0, description="Amount invested on the first day.",
+    )
+    start_date: str = Field(..., description="First day of the backtest (YYYY-MM-DD).")
+    end_date: str | None = Field(
+        None, description="Last day of the backtest (YYYY-MM-DD); latest if None.",
+    )
+    rebalance: Literal["none", "monthly", "quarterly", "yearly"] = Field(
+        "monthly", description="How often holdings are reset to the target weights.",
+    )
+    contribution: float = Field(
+        0.0, ge=0, description="Amount added at the start of each contribution period.",
+    )
+    contribution_frequency: Literal["monthly", "quarterly", "yearly"] = Field(
+        "monthly", description="How often the contribution is added.",
+    )
+    transaction_cost_bps: float = Field(
+        10.0, ge=0, le=1000, description="Cost of every trade in basis points.",
+    )
+    currency: str = Field("usd", min_length=1, description="Quote currency.")
+    curve_points: int = Field(
+        250, ge=2, le=10_000, description="Points of the returned equity curve.",
+    )
+
+    @field_validator("start_date", "end_date")
+    @classmethod
+    def validate_date_format(cls, value: str | None) -> str | None:
+        """Validate that the date is in the correct format (YYYY-MM-DD)."""
+        if value:
+            try:
+                datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=UTC)
+            except ValueError as e:
+                error_message = f"Invalid date format: {value}. Expected YYYY-MM-DD."
+                raise ValueError(error_message) from e
+        return value
+
+    @field_validator("allocations")
+    @classmethod
+    def validate_allocations(cls, value: dict[str, float]) -> dict[str, float]:
+        """Ensure every weight is positive."""
+        if any(weight <= 0 for weight in value.values()):
+            error_message = "Allocation weights must be positive."
+            raise ValueError(error_message)
+        return value
+
+
 class CryptoInput(BaseModel):
     """Pydantic model for validating inputs to the cryptocurrency tracker."""
 
@@ -144,11 +384,20 @@ class CryptoInput(BaseModel):
 class SpendingBreakdownInput(BaseModel):
     """Pydantic model for validating inputs to the spending breakdown tool."""
 
+    tenant_id: str | None = Field(
+        None,
+        pattern=TENANT_ID_PATTERN,
+        description=(
+            "Optional tenant (user) id whose stored spending to use; takes "
+            "precedence over data_source."
+        ),
+    )
     data_source: str | None = Field(
         None,
         description=(
-            "Optional path to a CSV file containing spending data. "
-            "The file must have 'category' and 'amount' columns."
+            "Optional path to a CSV file or Parquet dataset containing "
+            "spending data. It must have 'category' and 'amount' columns. "
+            "Defaults to the bundled spending history."
         ),
     )
     spending_data: dict[str, float] | None = Field(
@@ -156,36 +405,137 @@ class SpendingBreakdownInput(BaseModel):
         description="""Optional dictionary of
         spending data where keys are categories and values are amounts.""",
     )
+    year: int | None = Field(
+        None, description="Optional year to restrict the breakdown to (e.g., 2023).",
+    )
+    month: str | None = Field(
+        None,
+        description="Optional month to restrict the breakdown to (e.g., 'March').",
+    )
+    category: str | None = Field(
+        None,
+        description="Optional spending category to restrict to (e.g., 'Food').",
+    )
 
-    @field_validator("data_source", "spending_data")
+    @field_validator("month")
     @classmethod
-    def validate_inputs(
-        cls,
-        value: str | dict | None,
-        values: dict[str, Any],
-    ) -> str | dict | None:
-        """Ensure that at least one of `data_source` or `spending_data` is provided.
-
-        Args:
-        ----
-            value: Current field being validated.
-            values: Dictionary of all previously validated fields.
-
-        Raises:
-        ------
-            ValueError: If neither `data_source` nor `spending_data` is provided.
-
-        Returns:
-        -------
-            The validated value.
-
-        """
-        # Check if both fields are missing
-        if (
-            not value
-            and not values.get("data_source")
-            and not values.get("spending_data")
-        ):
-            error_message = "Either 'data_source' or 'spending_data' must be provided."
-            raise ValueError(error_message)
-        return value
+    def validate_month(cls, value: str | None) -> str | None:
+        """Normalize a month name, abbreviation or number to its full name."""
+        if value is None or not value.strip():
+            return None
+        month = value.strip().lower()
+        for number, name in enumerate(calendar.month_name[1:], start=1):
+            if month in {name.lower(), name[:3].lower(), str(number), f"{number:02d}"}:
+                return name
+        error_message = f"Invalid month: {value}. Expected a month name or 1-12."
+        raise ValueError(error_message)
+
+
+class SpendingTrendsInput(BaseModel):
+    """Pydantic model for validating inputs to the spending trends tool."""
+
+    tenant_id: str | None = Field(
+        None,
+        pattern=TENANT_ID_PATTERN,
+        description=(
+            "Optional tenant (user) id whose stored spending to use; takes "
+            "precedence over data_source."
+        ),
+    )
+    data_source: str | None = Field(
+        None,
+        description=(
+            "Optional path to a CSV file or Parquet dataset with 'category', "
+            "'amount', 'year' and 'month' columns. Defaults to the bundled "
+            "spending history."
+        ),
+    )
+    year: int | None = Field(
+        None, description="Optional year to report monthly trends for (e.g., 2023).",
+    )
+    category: str | None = Field(
+        None,
+        description="Optional category to analyse (e.g., 'Food'); default is total.",
+    )
+    window: int = Field(
+        3, ge=1, le=24, description="Months in the rolling average.",
+    )
+
+
+class SpendingAnomaliesInput(BaseModel):
+    """Pydantic model for validating inputs to the spending anomalies tool."""
+
+    tenant_id: str | None = Field(
+        None,
+        pattern=TENANT_ID_PATTERN,
+        description=(
+            "Optional tenant (user) id whose stored spending to use; takes "
+            "precedence over data_source."
+        ),
+    )
+    data_source: str | None = Field(
+        None,
+        description=(
+            "Optional path to a CSV file or Parquet dataset with 'category', "
+            "'amount', 'year' and 'month' columns. Defaults to the bundled "
+            "spending history."
+        ),
+    )
+    year: int | None = Field(
+        None, description="Optional year to report anomalies in (e.g., 2023).",
+    )
+    category: str | None = Field(
+        None, description="Optional category to report anomalies for (e.g., 'Food').",
+    )
+    method: Literal["zscore", "iqr"] = Field(
+        "zscore",
+        description=(
+            "'zscore' flags months far from the category mean in standard "
+            "deviations; 'iqr' flags months outside the interquartile fences."
+        ),
+    )
+    threshold: float | None = Field(
+        None,
+        gt=0,
+        description=(
+            "Flagging threshold: z-score (default 2.5) or IQR multiple "
+            "(default 1.5)."
+        ),
+    )
+    limit: int = Field(10, ge=1, le=100, description="Maximum anomalies returned.")
+
+
+class BudgetRule(BaseModel):
+    """Pydantic model for a declarative budget rule.
+
+    Examples:
+        Dining over $500 in a month: ``{'name': 'dining', 'category':
+        'Food', 'threshold': 500}``. Shopping up 30% on the same month last
+        year: ``{'name': 'shopping-yoy', 'category': 'Shopping', 'metric':
+        'change_pct', 'threshold': 30}``.
+
+    """
+
+    name: str = Field(..., min_length=1, description="Name reported with alerts.")
+    category: str | None = Field(
+        None,
+        description="Category the rule watches (case-insensitive); None is total.",
+    )
+    metric: Literal["amount", "change_pct"] = Field(
+        "amount",
+        description=(
+            "'amount' alerts when spending exceeds the threshold; 'change_pct' "
+            "when it grew by more than the threshold percent."
+        ),
+    )
+    period: Literal["month", "year"] = Field(
+        "month", description="Period the spending is summed over.",
+    )
+    compare_to: Literal["previous_period", "previous_year"] = Field(
+        "previous_year",
+        description="Baseline of 'change_pct' rules; same period last year by default.",
+    )
+    threshold: float = Field(
+        ..., description="Amount or percent that triggers an alert.",
+    )
+
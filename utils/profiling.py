@@ -0,0 +1,241 @@
+"""Per-request profiling.
+
+``ProfilingMiddleware`` is an ASGI middleware, mounted by the FastAPI app and
+the BentoML service only when ``[profiling] enabled`` is set, so requests pay
+nothing for it otherwise. It profiles a request when the request carries the
+profiling header (``X-Profile: 1``) or is picked at the configured sample
+rate, and writes the profile to the profile directory, named after the time,
+the path and the request id (the request's trace id when it sends one). The
+file name is returned in the ``X-Profile-Id`` response header. Only the
+newest ``max_profiles`` files are kept.
+
+Two kinds of profile can be captured:
+
+- 'cprofile': a deterministic profile of every function call (``.prof``,
+  readable with ``pstats`` or snakeviz). Calls cost noticeably more while it
+  runs.
+- 'sampling': the stacks of all threads sampled every
+  ``sampling_interval_ms`` (``.folded``, one 'frame;frame;... count' line per
+  stack, readable by flamegraph.pl and speedscope). Much cheaper, but only
+  shows where time is spent, not call counts.
+
+Both see the work of every thread, including the thread pools endpoints and
+tools run in, so work of concurrent requests shows up too. One request is
+profiled at a time; requests arriving meanwhile are not profiled.
+"""
+
+import cProfile
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+from loguru import logger
+
+from utils.config_types import ProfilingConfigs
+from utils.structured_logging import log_event
+from utils.tracing import TRACE_HEADER
+
+PROFILE_SUFFIXES = {"cprofile": ".prof", "sampling": ".folded"}
+PROFILE_ID_HEADER = "X-Profile-Id"
+# Deepest stack recorded by the sampling profiler.
+MAX_STACK_DEPTH = 200
+
+
+def _file_safe(text: str) -> str:
+    """Replace the characters of text that are unsafe in a file name."""
+    return "".join(char if char.isalnum() else "-" for char in text)
+
+
+def _folded_stack(frame: FrameType | None) -> str:
+    """Return a stack as 'outermost;...;innermost' function names."""
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_qualname} ({Path(code.co_filename).name})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """Samples the stacks of all other threads on a background thread."""
+
+    def __init__(self, interval_seconds: float) -> None:
+        """Initialize the sampler.
+
+        Args:
+            interval_seconds: Time between samples.
+
+        """
+        self.interval_seconds = interval_seconds
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True,
+        )
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the last sample."""
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: Path) -> None:
+        """Write the sampled stacks in folded format, most frequent first."""
+        with path.open("w", encoding="utf8") as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+    def _run(self) -> None:
+        """Record the stack of every other thread until stopped."""
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while not self._stop.wait(self.interval_seconds):
+            for thread_id, frame in sys._current_frames().items():  # noqa: SLF001
+                if thread_id == own_id:
+                    continue
+                if thread_id not in names:
+                    names = {
+                        thread.ident: thread.name for thread in threading.enumerate()
+                    }
+                thread_name = names.get(thread_id, str(thread_id))
+                self.stacks[f"{thread_name};{_folded_stack(frame)}"] += 1
+
+
+class RequestProfiler:
+    """Decides which requests to profile and saves their profiles."""
+
+    def __init__(self, configs: ProfilingConfigs) -> None:
+        """Initialize the profiler and create the profile directory.
+
+        Args:
+            configs: The profiling configuration.
+
+        """
+        self.configs = configs
+        self.profile_dir = Path(configs.profile_dir)
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def wanted(self, header_value: str | None) -> bool:
+        """Return whether to profile a request, given its profiling header."""
+        if header_value is not None:
+            return header_value.strip().lower() in {"1", "true", "yes"}
+        return random.random() < self.configs.sample_rate  # noqa: S311
+
+    @contextmanager
+    def profile(self, request_id: str, name: str) -> Iterator[str | None]:
+        """Profile a block and save the profile.
+
+        Yields:
+            str | None: File name of the profile, or None if another request
+            is being profiled.
+
+        """
+        if not self._lock.acquire(blocking=False):
+            log_event("profile.skipped", request_id=request_id, reason="busy")
+            yield None
+            return
+        stamp = datetime.now().astimezone().strftime("%Y%m%d-%H%M%S-%f")
+        path = self.profile_dir / (
+            f"{stamp}_{_file_safe(name.strip('/'))}_{_file_safe(request_id)}"
+            f"{PROFILE_SUFFIXES[self.configs.mode]}"
+        )
+        started = time.perf_counter()
+        try:
+            if self.configs.mode == "cprofile":
+                with cProfile.Profile() as profile:
+                    yield path.name
+                profile.dump_stats(path)
+            else:
+                sampler = StackSampler(self.configs.sampling_interval_ms / 1000)
+                sampler.start()
+                try:
+                    yield path.name
+                finally:
+                    sampler.stop()
+                sampler.write(path)
+        finally:
+            self._lock.release()
+        log_event(
+            "profile.saved",
+            request_id=request_id,
+            file=path.name,
+            duration_ms=round((time.perf_counter() - started) * 1000, 3),
+        )
+        self._prune()
+
+    def _prune(self) -> None:
+        """Remove the oldest profiles beyond ``max_profiles``."""
+        profiles = sorted(
+            (
+                path for path in self.profile_dir.iterdir()
+                if path.suffix in PROFILE_SUFFIXES.values()
+            ),
+            key=lambda path: path.name,
+        )
+        for path in profiles[: max(len(profiles) - self.configs.max_profiles, 0)]:
+            try:
+                path.unlink()
+            except OSError as e:
+                logger.error(f"Failed to remove old profile {path}: {e}")
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling the requests a ``RequestProfiler`` picks."""
+
+    def __init__(self, app: Any, profiler: RequestProfiler) -> None:  # noqa: ANN401
+        """Wrap an ASGI app.
+
+        Args:
+            app: The ASGI app.
+            profiler: Decides which requests to profile and saves them.
+
+        """
+        self.app = app
+        self.profiler = profiler
+        self.header = profiler.configs.header.lower().encode()
+        self.trace_header = TRACE_HEADER.lower().encode()
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:  # noqa: ANN401
+        """Handle a request, profiling it if it is picked."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        header_value = headers.get(self.header)
+        if not self.profiler.wanted(
+            header_value.decode("latin-1") if header_value is not None else None,
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        trace_id = headers.get(self.trace_header)
+        if trace_id is None:
+            # Have the request traced under the profile's id.
+            trace_id = uuid.uuid4().hex[:16].encode()
+            scope = {
+                **scope, "headers": [*scope["headers"], (self.trace_header, trace_id)],
+            }
+        with self.profiler.profile(trace_id.decode("latin-1"), scope["path"]) as name:
+
+            async def send_with_profile_id(message: dict) -> None:
+                if name is not None and message["type"] == "http.response.start":
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (PROFILE_ID_HEADER.lower().encode(), name.encode()),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_with_profile_id)
@@ -0,0 +1,211 @@
+"""Span store module.
+
+The logging server hands every ``span.end`` record it receives to a
+``SpanStore``, which saves the spans in a SQLite file and keeps the durations
+of the last ``span_window_seconds`` per stage in memory. At every stats
+interval it writes the rolling p50/p95/p99 of each stage to the
+``span_stats`` table, and removes spans older than ``span_retention_hours``.
+
+Tables:
+    spans(trace_id, span_id, parent_id, stage, end_time, duration_ms, status)
+    span_stats(stage, window_end, count, p50_ms, p95_ms, p99_ms, max_ms)
+
+The file can be queried with any SQLite client, or summarized with this
+module's command line.
+
+Example:
+    just trace-stats
+    just trace-stats --trace 3f2a9c0d1e4b5a69
+
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.logging_setup import DEFAULT_CONFIG_PATH, load_logging_configs
+
+PERCENTILES = (50, 95, 99)
+# Most durations kept per stage, bounding memory under heavy load.
+MAX_WINDOW_SPANS = 100_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS spans (
+    trace_id TEXT NOT NULL,
+    span_id TEXT NOT NULL,
+    parent_id TEXT,
+    stage TEXT NOT NULL,
+    end_time REAL NOT NULL,
+    duration_ms REAL NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS spans_trace ON spans (trace_id);
+CREATE INDEX IF NOT EXISTS spans_end_time ON spans (end_time);
+CREATE TABLE IF NOT EXISTS span_stats (
+    stage TEXT NOT NULL,
+    window_end REAL NOT NULL,
+    count INTEGER NOT NULL,
+    p50_ms REAL NOT NULL,
+    p95_ms REAL NOT NULL,
+    p99_ms REAL NOT NULL,
+    max_ms REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS span_stats_stage ON span_stats (stage, window_end);
+"""
+
+
+class SpanStore:
+    """Saves spans to SQLite and aggregates their durations per stage."""
+
+    def __init__(
+        self, db_path: Path, window_seconds: float, retention_hours: float,
+    ) -> None:
+        """Open (or create) the span database.
+
+        Args:
+            db_path: SQLite file.
+            window_seconds: Span of the rolling percentiles.
+            retention_hours: How long raw spans are kept.
+
+        """
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.executescript(SCHEMA)
+        self.window_seconds = window_seconds
+        self.retention_seconds = retention_hours * 3600
+        self.spans = 0
+        self._pending: list[tuple] = []
+        self._windows: dict[str, deque[tuple[float, float]]] = {}
+
+    def add(self, record: dict[str, Any]) -> None:
+        """Queue the span of a ``span.end`` record for saving and aggregation."""
+        extra = record["extra"]
+        end_time = record["time"]
+        duration = float(extra["duration_ms"])
+        self._pending.append(
+            (
+                extra["trace_id"],
+                extra["span_id"],
+                extra.get("parent_id"),
+                extra["stage"],
+                end_time,
+                duration,
+                extra.get("status", "ok"),
+            ),
+        )
+        window = self._windows.get(extra["stage"])
+        if window is None:
+            window = self._windows[extra["stage"]] = deque(maxlen=MAX_WINDOW_SPANS)
+        window.append((end_time, duration))
+
+    def flush(self) -> None:
+        """Save the queued spans in one transaction."""
+        if not self._pending:
+            return
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO spans VALUES (?, ?, ?, ?, ?, ?, ?)", self._pending,
+            )
+        self.spans += len(self._pending)
+        self._pending.clear()
+
+    def window_stats(self, now: float | None = None) -> dict[str, dict[str, float]]:
+        """Return the count and percentiles of each stage over the window."""
+        now = time.time() if now is None else now
+        cutoff = now - self.window_seconds
+        stats = {}
+        for stage, window in self._windows.items():
+            while window and window[0][0] < cutoff:
+                window.popleft()
+            if not window:
+                continue
+            durations = np.fromiter((duration for _, duration in window), float)
+            p50, p95, p99 = np.percentile(durations, PERCENTILES)
+            stats[stage] = {
+                "count": len(durations),
+                "p50_ms": round(float(p50), 3),
+                "p95_ms": round(float(p95), 3),
+                "p99_ms": round(float(p99), 3),
+                "max_ms": round(float(durations.max()), 3),
+            }
+        return stats
+
+    def write_stats(self) -> None:
+        """Save the current percentiles and remove spans past retention."""
+        self.flush()
+        now = time.time()
+        rows = [
+            (
+                stage, now, stage_stats["count"], stage_stats["p50_ms"],
+                stage_stats["p95_ms"], stage_stats["p99_ms"], stage_stats["max_ms"],
+            )
+            for stage, stage_stats in self.window_stats(now).items()
+        ]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO span_stats VALUES (?, ?, ?, ?, ?, ?, ?)", rows,
+            )
+            cutoff = now - self.retention_seconds
+            self.connection.execute("DELETE FROM spans WHERE end_time < ?", (cutoff,))
+            self.connection.execute(
+                "DELETE FROM span_stats WHERE window_end < ?", (cutoff,),
+            )
+
+    def close(self) -> None:
+        """Save the queued spans and close the database."""
+        self.flush()
+        self.connection.close()
+
+
+def latest_stage_stats(db_path: Path) -> list[dict[str, Any]]:
+    """Return the most recent percentiles of every stage, slowest p95 first."""
+    with sqlite3.connect(db_path) as connection:
+        connection.row_factory = sqlite3.Row
+        rows = connection.execute(
+            """
+            SELECT * FROM span_stats AS s
+            WHERE window_end = (
+                SELECT MAX(window_end) FROM span_stats WHERE stage = s.stage
+            )
+            ORDER BY p95_ms DESC
+            """,
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def trace_spans(db_path: Path, trace_id: str) -> list[dict[str, Any]]:
+    """Return the spans of one trace in the order they ended."""
+    with sqlite3.connect(db_path) as connection:
+        connection.row_factory = sqlite3.Row
+        rows = connection.execute(
+            "SELECT * FROM spans WHERE trace_id = ? ORDER BY end_time",
+            (trace_id,),
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def main() -> None:
+    """Print the latest stage percentiles, or the spans of one trace."""
+    parser = argparse.ArgumentParser(description="Show request tracing statistics.")
+    parser.add_argument("--trace", help="Show the spans of this trace id instead.")
+    args = parser.parse_args()
+    db_path = Path(load_logging_configs(DEFAULT_CONFIG_PATH.resolve()).trace_db_file)
+    if not db_path.exists():
+        sys.stderr.write(f"No trace database at {db_path}\n")
+        sys.exit(1)
+    results = (
+        trace_spans(db_path, args.trace) if args.trace else latest_stage_stats(db_path)
+    )
+    sys.stdout.write(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Structured logging for the request hot path.
+
+``log_event`` logs a named event with its payload bound as fields of the
+record, which the network client ships as a msgpack map instead of a
+formatted line:
+
+- Nothing is built, formatted or sent when the event's level is disabled.
+- Text fields are cut to ``max_field_chars``; other objects are abbreviated
+  with ``reprlib``, which never walks more than a few items of a container.
+- ``detail`` fields are callables run only when DEBUG records are enabled, for
+  payloads too expensive to build on every request.
+- Events with a sample rate in ``[logging.sample_rates]`` are logged for only
+  that (evenly spaced) fraction of their occurrences, and their records carry
+  the rate so counts can be scaled back up.
+"""
+
+import reprlib
+import threading
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any
+
+from loguru import logger
+
+from utils.logging_setup import DEFAULT_CONFIG_PATH, load_logging_configs
+
+SCALAR_TYPES = (int, float, bool, type(None))
+
+logging_configs = load_logging_configs(DEFAULT_CONFIG_PATH.resolve())
+
+
+def truncate(text: str, limit: int) -> str:
+    """Cut text to ``limit`` characters, noting how much was cut."""
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [{len(text) - limit} more chars]"
+
+
+class Sampler:
+    """Keeps a fixed fraction of the occurrences of each sampled event."""
+
+    def __init__(self, rates: dict[str, float]) -> None:
+        """Initialize the sampler.
+
+        Args:
+            rates: Fraction (0-1) of the occurrences to keep, per event.
+
+        """
+        self.rates = rates
+        self._counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def keep(self, event: str) -> bool:
+        """Return whether this occurrence of an event should be logged."""
+        rate = self.rates.get(event)
+        if rate is None or rate >= 1:
+            return True
+        with self._lock:
+            count = self._counts.get(event, 0) + 1
+            self._counts[event] = count
+        # Keep the occurrences where count * rate reaches the next integer.
+        return int(count * rate) > int((count - 1) * rate)
+
+
+_abbreviator = reprlib.Repr(
+    maxlevel=2,
+    maxdict=8,
+    maxlist=8,
+    maxtuple=8,
+    maxset=8,
+    maxstring=logging_configs.max_field_chars,
+    maxother=logging_configs.max_field_chars,
+)
+_sampler = Sampler(logging_configs.sample_rates)
+
+
+@lru_cache(maxsize=16)
+def level_enabled(level: str) -> bool:
+    """Return whether records of a level reach the configured sinks."""
+    return logger.level(level).no >= logger.level(logging_configs.min_log_level).no
+
+
+def compact(value: Any) -> Any:  # noqa: ANN401
+    """Return a log field small and cheap to encode: scalars or cut text."""
+    if isinstance(value, SCALAR_TYPES):
+        return value
+    if isinstance(value, str):
+        return truncate(value, logging_configs.max_field_chars)
+    return truncate(_abbreviator.repr(value), logging_configs.max_field_chars)
+
+
+def log_event(
+    event: str,
+    level: str = "INFO",
+    *,
+    detail: dict[str, Callable[[], Any]] | None = None,
+    **fields: Any,  # noqa: ANN401
+) -> None:
+    """Log an event with its payload as structured fields.
+
+    Args:
+        event: Dotted event name, also used as the message (e.g. 'agent.query').
+        level: Log level of the record.
+        detail: Fields computed (by calling them) only when DEBUG is enabled.
+        **fields: Payload fields; made compact with ``compact``.
+
+    """
+    if not level_enabled(level) or not _sampler.keep(event):
+        return
+    record = {name: compact(value) for name, value in fields.items()}
+    if detail and level_enabled("DEBUG"):
+        record.update({name: compact(build()) for name, build in detail.items()})
+    rate = logging_configs.sample_rates.get(event, 1.0)
+    if rate < 1:
+        record["sample_rate"] = rate
+    logger.opt(depth=1).bind(**record).log(level, event)
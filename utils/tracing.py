@@ -0,0 +1,265 @@
+"""Request tracing for the Financial Dashboard.
+
+A trace is started for every API request, and everything the request does
+(agent, LLM calls, tools, upstream HTTP calls) runs in spans nested under it.
+The current trace and span live in context variables, so they follow the
+request through function calls, ``asyncio`` tasks and the copied contexts
+LangChain runs tools in, without being passed around.
+
+Each span is logged as a ``span.start`` and a ``span.end`` event over the
+regular logging channel; the end event carries the span's duration and
+status, and the logging server aggregates these per stage. While a trace is
+active, every log record also carries its ``trace_id``, so the log lines of
+one request can be found together.
+"""
+
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from loguru import logger
+
+from utils.structured_logging import log_event
+
+TRACE_HEADER = "X-Trace-Id"
+PARENT_SPAN_HEADER = "X-Parent-Span-Id"
+ID_CHARS = 16
+
+_current_trace: ContextVar[str | None] = ContextVar("trace_id", default=None)
+_current_span: ContextVar["Span | None"] = ContextVar("span", default=None)
+
+
+class Span:
+    """A timed stage of a trace."""
+
+    __slots__ = ("_started", "fields", "parent_id", "span_id", "stage", "trace_id")
+
+    def __init__(
+        self, stage: str, trace_id: str, parent_id: str | None, fields: dict[str, Any],
+    ) -> None:
+        """Start timing a span.
+
+        Args:
+            stage: Name of the stage, which spans are aggregated by.
+            trace_id: Trace the span belongs to.
+            parent_id: Span it is nested in, if any.
+            fields: Extra fields logged with the span.
+
+        """
+        self.stage = stage
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.span_id = _new_id()
+        self.fields = fields
+        self._started = time.perf_counter()
+
+    def elapsed_ms(self) -> float:
+        """Return the milliseconds since the span started."""
+        return (time.perf_counter() - self._started) * 1000
+
+
+def _new_id() -> str:
+    """Return a random hexadecimal id."""
+    return uuid.uuid4().hex[:ID_CHARS]
+
+
+def current_trace_id() -> str | None:
+    """Return the id of the active trace, if any."""
+    return _current_trace.get()
+
+
+def trace_headers() -> dict[str, str]:
+    """Return HTTP headers propagating the active trace (empty if none)."""
+    trace_id = _current_trace.get()
+    if trace_id is None:
+        return {}
+    headers = {TRACE_HEADER: trace_id}
+    parent = _current_span.get()
+    if parent is not None:
+        headers[PARENT_SPAN_HEADER] = parent.span_id
+    return headers
+
+
+def start_span(stage: str, **fields: Any) -> Span | None:  # noqa: ANN401
+    """Start a span under the current one; None when no trace is active.
+
+    The span is not made current; ``span`` does that for a block.
+
+    Args:
+        stage: Name of the stage.
+        **fields: Extra fields logged with the span.
+
+    """
+    trace_id = _current_trace.get()
+    if trace_id is None:
+        return None
+    parent = _current_span.get()
+    opened = Span(stage, trace_id, parent.span_id if parent else None, fields)
+    log_event(
+        "span.start",
+        stage=stage,
+        trace_id=trace_id,
+        span_id=opened.span_id,
+        parent_id=opened.parent_id,
+        **fields,
+    )
+    return opened
+
+
+def end_span(opened: Span | None, status: str = "ok", **fields: Any) -> None:  # noqa: ANN401
+    """End a span, logging its duration and status."""
+    if opened is None:
+        return
+    log_event(
+        "span.end",
+        stage=opened.stage,
+        trace_id=opened.trace_id,
+        span_id=opened.span_id,
+        parent_id=opened.parent_id,
+        duration_ms=round(opened.elapsed_ms(), 3),
+        status=status,
+        **opened.fields,
+        **fields,
+    )
+
+
+@contextmanager
+def span(stage: str, **fields: Any) -> Iterator[Span | None]:  # noqa: ANN401
+    """Run a block as a span of the active trace (a no-op without one)."""
+    opened = start_span(stage, **fields)
+    if opened is None:
+        yield None
+        return
+    token = _current_span.set(opened)
+    try:
+        yield opened
+    except BaseException:
+        _current_span.reset(token)
+        end_span(opened, "error")
+        raise
+    _current_span.reset(token)
+    end_span(opened)
+
+
+@contextmanager
+def trace(
+    stage: str, trace_id: str | None = None, **fields: Any,  # noqa: ANN401
+) -> Iterator[Span | None]:
+    """Run a block as a new trace, with a root span for the block.
+
+    Args:
+        stage: Name of the root span.
+        trace_id: Id to continue (e.g. from an incoming header); new if None.
+        **fields: Extra fields logged with the root span.
+
+    """
+    trace_token = _current_trace.set(trace_id or _new_id())
+    span_token = _current_span.set(None)
+    try:
+        with span(stage, **fields) as root:
+            yield root
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Records LLM calls and tool calls of a LangChain run as spans.
+
+    A tool span is made current while the tool runs, so the HTTP calls the
+    tool makes nest under it.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the handler."""
+        # Open span and the span that was current before it, per run.
+        self._spans: dict[UUID, tuple[Span, Span | None]] = {}
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],  # noqa: ARG002
+        messages: list,  # noqa: ARG002
+        *,
+        run_id: UUID,
+        **kwargs: Any,  # noqa: ANN401, ARG002
+    ) -> None:
+        """Start an LLM span."""
+        self._start(run_id, "llm", activate=False)
+
+    def on_llm_start(
+        self,
+        serialized: dict[str, Any],  # noqa: ARG002
+        prompts: list[str],  # noqa: ARG002
+        *,
+        run_id: UUID,
+        **kwargs: Any,  # noqa: ANN401, ARG002
+    ) -> None:
+        """Start an LLM span."""
+        self._start(run_id, "llm", activate=False)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:  # noqa: ANN401, ARG002
+        """End an LLM span."""
+        self._end(run_id, "ok")
+
+    def on_llm_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any,  # noqa: ANN401, ARG002
+    ) -> None:
+        """End an LLM span as failed."""
+        self._end(run_id, "error")
+
+    def on_tool_start(
+        self,
+        serialized: dict[str, Any],
+        input_str: str,  # noqa: ARG002
+        *,
+        run_id: UUID,
+        **kwargs: Any,  # noqa: ANN401, ARG002
+    ) -> None:
+        """Start a tool span and make it current."""
+        self._start(run_id, f"tool.{serialized.get('name', 'unknown')}", activate=True)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:  # noqa: ANN401, ARG002
+        """End a tool span."""
+        self._end(run_id, "ok")
+
+    def on_tool_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any,  # noqa: ANN401, ARG002
+    ) -> None:
+        """End a tool span as failed."""
+        self._end(run_id, "error")
+
+    def _start(self, run_id: UUID, stage: str, *, activate: bool) -> None:
+        """Start a span for a LangChain run."""
+        previous = _current_span.get()
+        opened = start_span(stage)
+        if opened is None:
+            return
+        self._spans[run_id] = (opened, previous)
+        if activate:
+            # LangChain runs the tool in a copy of this context, made after
+            # this callback, so the tool sees its span as the current one.
+            _current_span.set(opened)
+
+    def _end(self, run_id: UUID, status: str) -> None:
+        """End the span of a LangChain run and restore the previous span."""
+        opened, previous = self._spans.pop(run_id, (None, None))
+        if opened is None:
+            return
+        if _current_span.get() is opened:
+            _current_span.set(previous)
+        end_span(opened, status)
+
+
+def _add_trace_id(record: dict) -> None:
+    """Add the active trace id to a log record (Loguru patcher)."""
+    trace_id = _current_trace.get()
+    if trace_id is not None:
+        record["extra"].setdefault("trace_id", trace_id)
+
+
+logger.configure(patcher=_add_trace_id)
@@ -1,21 +1,187 @@
-"""Visualization helper functions for the Financial Dashboard."""
+"""Visualization helper functions for the Financial Dashboard.
 
+Charts are drawn on their own ``Figure`` with the Agg canvas rather than
+through the global ``pyplot`` state, so they can be rendered from several
+threads at once, and are returned as PNG or SVG bytes. Long line series are
+downsampled with Largest-Triangle-Three-Buckets (LTTB) before plotting, which
+keeps their visual shape while drawing only a few hundred points.
+"""
+
+import io
 from pathlib import Path
-from typing import TypedDict
+from typing import Literal, TypedDict
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
+DEFAULT_MAX_POINTS = 1000
+MIN_LTTB_POINTS = 3
 
-class PlotConfig(TypedDict):
-    """Configuration for the line chart."""
+ImageFormat = Literal["png", "svg"]
+
+
+class LineStyle(TypedDict):
+    """Titles of the line chart."""
 
     title: str
     xlabel: str
     ylabel: str
+
+
+class PlotConfig(LineStyle):
+    """Configuration for the line chart."""
+
+    output_path: Path
+
+
+class PieStyle(TypedDict):
+    """Title of the pie chart."""
+
+    title: str
+
+
+class PieConfig(PieStyle):
+    """Configuration for the pie chart."""
+
     output_path: Path
 
 
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Pick the points of a series that best preserve its shape (LTTB).
+
+    The first and last points are always kept; every bucket in between keeps
+    the point forming the largest triangle with the previously kept point and
+    the average of the next bucket.
+
+    Args:
+        x: Numeric x values, sorted ascending.
+        y: Y values.
+        max_points: Number of points to keep.
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points (all of them if the
+        series is not longer than ``max_points``).
+
+    """
+    n = len(x)
+    if max_points >= n or max_points < MIN_LTTB_POINTS:
+        return np.arange(n)
+    # Bucket b covers [edges[b], edges[b + 1]); the last "bucket" is the last point.
+    edges = np.append(np.linspace(1, n - 1, max_points - 1).astype(np.intp), n)
+    sizes = np.diff(edges)
+    average_x = np.add.reduceat(x, edges[:-1]) / sizes
+    average_y = np.add.reduceat(y, edges[:-1]) / sizes
+    # Buckets padded to equal width by repeating their last point, so each
+    # step is one small vectorized expression.
+    starts, ends = edges[:-2], edges[1:-1]
+    positions = np.minimum(
+        starts[:, None] + np.arange(sizes[:-1].max()), ends[:, None] - 1,
+    )
+    bucket_x, bucket_y = x[positions], y[positions]
+
+    selected = np.empty(max_points, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    previous_x, previous_y = x[0], y[0]
+    for bucket in range(max_points - 2):
+        next_x, next_y = average_x[bucket + 1], average_y[bucket + 1]
+        areas = np.abs(
+            (previous_x - next_x) * (bucket_y[bucket] - previous_y)
+            - (previous_x - bucket_x[bucket]) * (next_y - previous_y),
+        )
+        chosen = positions[bucket, areas.argmax()]
+        selected[bucket + 1] = chosen
+        previous_x, previous_y = x[chosen], y[chosen]
+    return selected
+
+
+def _numeric_x(values: pd.Series) -> np.ndarray:
+    """Return x values as numbers for downsampling (dates as nanoseconds)."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(float)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=float)
+    return np.arange(len(values), dtype=float)
+
+
+def _to_bytes(figure: Figure, image_format: ImageFormat) -> bytes:
+    """Render a figure into an in-memory image."""
+    FigureCanvasAgg(figure)
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format=image_format, bbox_inches="tight")
+    return buffer.getvalue()
+
+
+def _image_format(path: Path) -> ImageFormat:
+    """Return the image format matching a file suffix."""
+    return "svg" if path.suffix.lower() == ".svg" else "png"
+
+
+def render_line_chart(  # noqa: PLR0913
+    data: pd.DataFrame,
+    x_col: str,
+    y_cols: list[str],
+    style: LineStyle,
+    *,
+    image_format: ImageFormat = "png",
+    max_points: int = DEFAULT_MAX_POINTS,
+) -> bytes:
+    """Render a line chart into PNG or SVG bytes.
+
+    Args:
+        data: DataFrame with data to plot, sorted by ``x_col``.
+        x_col: Column name for the x-axis.
+        y_cols: List of column names for the y-axis.
+        style: Title and axis labels.
+        image_format: 'png' or 'svg'.
+        max_points: Points drawn per series; longer series are downsampled.
+
+    Returns:
+        bytes: The encoded image.
+
+    """
+    figure = Figure(figsize=(10, 6))
+    axes = figure.add_subplot()
+    x_numeric = _numeric_x(data[x_col])
+    for y_col in y_cols:
+        y = data[y_col].to_numpy(dtype=float)
+        present = np.flatnonzero(~np.isnan(y))
+        kept = present[lttb_indices(x_numeric[present], y[present], max_points)]
+        axes.plot(data[x_col].iloc[kept], y[kept], label=y_col)
+
+    axes.set_title(style["title"])
+    axes.set_xlabel(style["xlabel"])
+    axes.set_ylabel(style["ylabel"])
+    axes.legend()
+    axes.grid(visible=True)
+    return _to_bytes(figure, image_format)
+
+
+def render_pie_chart(
+    data: dict[str, float], style: PieStyle, *, image_format: ImageFormat = "png",
+) -> bytes:
+    """Render a pie chart of amounts per label into PNG or SVG bytes.
+
+    Args:
+        data: Amount per slice label.
+        style: Chart title.
+        image_format: 'png' or 'svg'.
+
+    Returns:
+        bytes: The encoded image.
+
+    """
+    figure = Figure(figsize=(8, 8))
+    axes = figure.add_subplot()
+    axes.pie(
+        list(data.values()), labels=list(data.keys()), autopct="%1.1f%%", startangle=90,
+    )
+    axes.set_title(style["title"], wrap=True)
+    axes.axis("equal")
+    return _to_bytes(figure, image_format)
+
+
 def plot_line_chart(
     data: pd.DataFrame,
     x_col: str,
@@ -29,22 +195,28 @@ def plot_line_chart(
         x_col: Column name for the x-axis.
         y_cols: List of column names for the y-axis.
         config: Configuration dictionary for the chart (title, labels, output path).
+            A '.svg' output path is saved as SVG, anything else as PNG.
 
     """
-    # Create the plot
-    plt.figure(figsize=(10, 6))
-    for y_col in y_cols:
-        plt.plot(data[x_col], data[y_col], label=y_col)
+    image = render_line_chart(
+        data,
+        x_col,
+        y_cols,
+        config,
+        image_format=_image_format(config["output_path"]),
+    )
+    Path(config["output_path"]).write_bytes(image)
 
-    # Add labels, title, and legend
-    plt.title(config["title"])
-    plt.xlabel(config["xlabel"])
-    plt.ylabel(config["ylabel"])
-    plt.legend()
 
-    # Enable grid with explicit keyword argument
-    plt.grid(visible=True)
+def plot_pie_chart(data: dict[str, float], config: PieConfig) -> None:
+    """Plot a pie chart of amounts per label and save it to a file.
 
-    # Save the plot to the specified output path
-    plt.savefig(config["output_path"], bbox_inches="tight")
-    plt.close()
+    Args:
+        data: Amount per slice label.
+        config: Configuration dictionary for the chart (title, output path).
+
+    """
+    image = render_pie_chart(
+        data, config, image_format=_image_format(config["output_path"]),
+    )
+    Path(config["output_path"]).write_bytes(image)